@@ -8,7 +8,9 @@ import streamlit as st
 # Importar módulos locales
 from modules.ui_components import apply_custom_css, show_main_header, show_footer
 from modules.sidebar import show_sidebar
-from modules.pages import show_home_page, show_extract_page, show_process_page, show_config_page
+from modules.pages import show_home_page, show_extract_page, show_process_page, show_batch_page, show_config_page
+from modules.metrics import start_metrics_exporter
+from modules.health import start_health_prober
 
 # Configuración de la página
 st.set_page_config(
@@ -20,6 +22,12 @@ st.set_page_config(
 
 def main():
     """Función principal de la aplicación"""
+    # Exportar métricas (METRICS_PORT / METRICS_DUMP_PATH), una sola vez por proceso
+    start_metrics_exporter()
+    
+    # Sondear /health en segundo plano (HEALTH_PROBE_INTERVAL), una sola vez por proceso
+    start_health_prober()
+    
     # Aplicar estilos CSS personalizados
     apply_custom_css()
     
@@ -36,6 +44,8 @@ def main():
         show_extract_page()
     elif option == "🚀 Procesar Completo":
         show_process_page()
+    elif option == "📦 Procesamiento por Lotes":
+        show_batch_page()
     elif option == "⚙️ Configuración":
         show_config_page()
     
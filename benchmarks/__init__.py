@@ -0,0 +1 @@
+# Benchmarks del frontend de pensiones 
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+Benchmark de generación de Excel y post-procesado de resultados
+Genera carreras sintéticas a partir de template/process_output.json y mide cada etapa
+
+Uso:
+    python -m benchmarks.bench_excel
+    python -m benchmarks.bench_excel --sizes 300 3000 --engines xlsxwriter --output resultados.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Border, Side
+
+from modules import excel_generator, excel_streaming
+from modules.bases_table import BasesTable
+from modules.local_engine import recompute_result
+
+from .synthetic import load_template, synthetic_result
+
+DEFAULT_SIZES = (300, 3000, 30000, 300000)
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "bench_excel.json")
+
+def _rss_bytes():
+    """Pico de memoria residente del proceso (ru_maxrss está en KB en Linux y en bytes en macOS)"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _run_stages(stages, trace):
+    """
+    Ejecutar etapas en orden midiendo tiempo y memoria
+
+    Args:
+        stages (list): (nombre, función) que reciben y devuelven el estado compartido
+        trace (bool): Medir el pico de memoria asignada con tracemalloc
+
+    Returns:
+        list: Una medida por etapa
+    """
+    state = {}
+    medidas = []
+    for nombre, funcion in stages:
+        if trace:
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        salida = funcion(state)
+        elapsed = time.perf_counter() - inicio
+        medida = {"stage": nombre, "seconds": elapsed, "rss_peak_bytes": _rss_bytes()}
+        if trace:
+            medida["alloc_peak_bytes"] = tracemalloc.get_traced_memory()[1] - antes
+        if isinstance(salida, (bytes, str)):
+            medida["output_bytes"] = len(salida.encode("utf-8") if isinstance(salida, str) else salida)
+        medidas.append(medida)
+    return medidas
+
+
+def openpyxl_stages(result):
+    """Etapas del motor openpyxl (modelo completo en memoria)"""
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    border = Border(left=Side(style="thin"), right=Side(style="thin"), top=Side(style="thin"), bottom=Side(style="thin"))
+
+    def filtrar(state):
+        state["rev"], state["no_rev"] = excel_generator._split_bases_por_periodo(result["bases_procesadas"])
+        state["wb"] = Workbook()
+        state["wb"].remove(state["wb"].active)
+
+    def hoja_rev(state):
+        state["ws_rev"] = excel_generator._create_bases_revalorizadas_sheet(
+            state["wb"], state["rev"], header_font, header_fill, border, autofit=False
+        )
+
+    def hoja_no_rev(state):
+        state["ws_no_rev"] = excel_generator._create_bases_no_revalorizadas_sheet(
+            state["wb"], state["no_rev"], header_font, header_fill, border, autofit=False
+        )
+
+    def autofit(state):
+        excel_generator._autofit_columns(state["ws_rev"])
+        excel_generator._autofit_columns(state["ws_no_rev"])
+
+    def resumen(state):
+        excel_generator._create_resumen_sheet(
+            state["wb"], result, state["rev"], state["no_rev"], header_font, header_fill, border
+        )
+
+    def guardar(state):
+        buffer = io.BytesIO()
+        state["wb"].save(buffer)
+        return buffer.getvalue()
+
+    return [
+        ("filter", filtrar), ("sheet_revalorizadas", hoja_rev), ("sheet_no_revalorizadas", hoja_no_rev),
+        ("autofit", autofit), ("sheet_resumen", resumen), ("save", guardar)
+    ]
+
+
+def xlsxwriter_stages(result):
+    """Etapas del motor xlsxwriter en streaming (el ajuste de columnas va dentro de cada hoja)"""
+
+    def filtrar(state):
+        tabla = BasesTable.from_records(result["bases_procesadas"])
+        state["rev"] = tabla.filter_periodo("revalorizado")
+        state["no_rev"] = tabla.filter_periodo("no_revalorizado")
+        state["buffer"] = io.BytesIO()
+        state["wb"] = xlsxwriter.Workbook(state["buffer"], {"constant_memory": True, "in_memory": False})
+        state["formats"] = excel_streaming._build_formats(state["wb"])
+
+    def hoja_rev(state):
+        excel_streaming._write_bases_revalorizadas_sheet(state["wb"], state["rev"], state["formats"])
+
+    def hoja_no_rev(state):
+        excel_streaming._write_bases_no_revalorizadas_sheet(state["wb"], state["no_rev"], state["formats"])
+
+    def resumen(state):
+        excel_streaming._write_resumen_sheet(state["wb"], result, state["rev"], state["no_rev"], state["formats"])
+
+    def guardar(state):
+        state["wb"].close()
+        return state["buffer"].getvalue()
+
+    return [
+        ("filter", filtrar), ("sheet_revalorizadas", hoja_rev), ("sheet_no_revalorizadas", hoja_no_rev),
+        ("sheet_resumen", resumen), ("save", guardar)
+    ]
+
+
+def postprocess_stages(result):
+    """Etapas de post-procesado que hacen las páginas con un resultado"""
+    return [
+        ("dataframe", lambda state: pd.DataFrame(result["bases_procesadas"])),
+        ("bases_table", lambda state: state.setdefault("tabla", BasesTable.from_records(result["bases_procesadas"]))),
+        ("recompute_estadisticas", lambda state: recompute_result(result)),
+    ]
+
+
+def json_serializers():
+    """Serializadores JSON disponibles (orjson es opcional)"""
+    serializers = {
+        "json": lambda data: json.dumps(data, ensure_ascii=False),
+        "json_compact": lambda data: json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+        "json_indent": lambda data: json.dumps(data, ensure_ascii=False, indent=2),
+    }
+    try:
+        import orjson
+        serializers["orjson"] = orjson.dumps
+    except ImportError:
+        pass
+    return serializers
+
+
+def bench_size(template, n_bases, engines, trace):
+    """Medir todas las etapas para un tamaño de carrera"""
+    result = synthetic_result(template, n_bases)
+    pipelines = {"postprocess": postprocess_stages(result)}
+    if "openpyxl" in engines:
+        pipelines["excel_openpyxl"] = openpyxl_stages(result)
+    if "xlsxwriter" in engines:
+        pipelines["excel_xlsxwriter"] = xlsxwriter_stages(result)
+    for nombre, serializer in json_serializers().items():
+        pipelines[f"json_{nombre}"] = [("serialize", lambda state, s=serializer: s(result))]
+
+    # Los tiempos se toman sin tracemalloc; la memoria asignada se mide en una segunda pasada
+    medidas = {}
+    for nombre, stages in pipelines.items():
+        print(f"  {nombre}...", flush=True)
+        medidas[nombre] = _run_stages(stages, trace=False)
+        if trace:
+            tracemalloc.start()
+            for medida, trazada in zip(medidas[nombre], _run_stages(stages, trace=True)):
+                medida["alloc_peak_bytes"] = trazada["alloc_peak_bytes"]
+            tracemalloc.stop()
+    return medidas
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de generación de Excel y post-procesado")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Número de bases por carrera")
+    parser.add_argument("--engines", nargs="+", default=list(excel_generator.EXCEL_ENGINES), choices=excel_generator.EXCEL_ENGINES)
+    parser.add_argument("--no-trace", action="store_true", help="No medir memoria asignada (tracemalloc ralentiza)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    trace = not args.no_trace
+    template = load_template()
+    informe = {
+        "benchmark": "excel",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": {"numpy": np.__version__, "pandas": pd.__version__, "xlsxwriter": xlsxwriter.__version__},
+        "tracemalloc": trace,
+        "sizes": {}
+    }
+
+    for n_bases in args.sizes:
+        print(f"{n_bases} bases", flush=True)
+        informe["sizes"][str(n_bases)] = bench_size(template, n_bases, args.engines, trace)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2)
+
+    print()
+    print(f"{'bases':>8}  {'pipeline':<22}{'etapa':<24}{'segundos':>10}{'pico MB':>10}{'salida KB':>12}")
+    for n_bases, pipelines in informe["sizes"].items():
+        for nombre, medidas in pipelines.items():
+            for medida in medidas:
+                salida = f"{medida['output_bytes'] / 1024:.1f}" if "output_bytes" in medida else ""
+                pico = f"{medida['alloc_peak_bytes'] / 1024 ** 2:.1f}" if "alloc_peak_bytes" in medida else ""
+                print(f"{n_bases:>8}  {nombre:<22}{medida['stage']:<24}{medida['seconds']:>10.4f}{pico:>10}{salida:>12}")
+    print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
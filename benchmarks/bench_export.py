@@ -0,0 +1,153 @@
+"""
+Benchmark de exportación: Parquet frente a JSON
+Compara tamaño y tiempo de serialización y lectura, y el coste de llevar las bases a st.dataframe
+
+Uso:
+    python -m benchmarks.bench_export
+    python -m benchmarks.bench_export --sizes 300 3000 --compressions zstd snappy --runs 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from streamlit import type_util
+
+from modules import arrow_export
+
+from .synthetic import load_template, synthetic_result
+
+DEFAULT_SIZES = (300, 3000, 30000)
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "bench_export.json")
+
+
+def _timed(fn, runs):
+    """Mediana de segundos de fn() y su último resultado"""
+    tiempos = []
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        valor = fn()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos), valor
+
+
+def bench_formats(result, compressions, runs):
+    """
+    Serializar el resultado como JSON y como Parquet y volver a leerlo
+
+    El JSON es el resultado completo; el Parquet, las tres tablas de arrow_export
+    (bases_procesadas, estadisticas y comparativa_calculos), un fichero por tabla.
+
+    Returns:
+        dict: formato -> bytes, write_seconds y read_seconds
+    """
+    formatos = {}
+    for nombre, kwargs in (("json_indent", {"indent": 2}), ("json_compact", {"separators": (",", ":")})):
+        segundos, texto = _timed(lambda: json.dumps(result, ensure_ascii=False, **kwargs).encode("utf-8"), runs)
+        lectura, _ = _timed(lambda: json.loads(texto), runs)
+        formatos[nombre] = {"bytes": len(texto), "write_seconds": segundos, "read_seconds": lectura}
+
+    conversion, tablas = _timed(lambda: arrow_export.result_tables(result), runs)
+    for compresion in compressions:
+        arrow_export.PARQUET_COMPRESSION = compresion
+        escritura, ficheros = _timed(lambda: {n: arrow_export.parquet_bytes(t) for n, t in tablas.items()}, runs)
+        # Lectura desde un buffer de Arrow (sin pasar por un objeto archivo de Python)
+        lectura, _ = _timed(lambda: [pq.read_table(pa.BufferReader(datos)) for datos in ficheros.values()], runs)
+        formatos[f"parquet_{compresion}"] = {
+            "bytes": sum(len(datos) for datos in ficheros.values()),
+            "bases_bytes": len(ficheros["bases_procesadas"]),
+            "arrow_seconds": conversion,
+            "write_seconds": conversion + escritura,
+            "read_seconds": lectura
+        }
+    return formatos
+
+
+def bench_dataframe(result, runs):
+    """
+    Coste de preparar las bases para st.dataframe (hasta los bytes Arrow que se envían)
+
+    Returns:
+        dict: Segundos de cada camino; "pandas" es el DataFrame de filas dict (en cada
+              reejecución) y "arrow" la tabla de arrow_export (la primera vez y ya cacheada)
+    """
+    bases = result["bases_procesadas"]
+    pandas, _ = _timed(
+        lambda: type_util.data_frame_to_bytes(pd.DataFrame(bases).drop(columns=["pluriactividad"], errors="ignore")),
+        runs
+    )
+    arrow, tabla = _timed(lambda: arrow_export.bases_display_table(result), runs)
+    envio, _ = _timed(lambda: type_util.pyarrow_table_to_bytes(tabla), runs)
+    return {
+        "pandas_seconds": pandas,
+        "arrow_seconds": arrow + envio,
+        # En las reejecuciones la tabla sale de la caché de artefactos y solo se serializa
+        "arrow_cached_seconds": envio,
+        "speedup": pandas / (arrow + envio) if arrow + envio else 0.0,
+        "cached_speedup": pandas / envio if envio else 0.0
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de exportación Parquet frente a JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Número de bases por carrera")
+    parser.add_argument("--compressions", nargs="+", default=["zstd", "snappy"], help="Compresiones de Parquet")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones por medida (se informa la mediana)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    template = load_template()
+    resultados = {}
+    for n_bases in args.sizes:
+        print(f"{n_bases} bases...", flush=True)
+        result = synthetic_result(template, n_bases)
+        resultados[str(n_bases)] = {
+            "formats": bench_formats(result, args.compressions, args.runs),
+            "dataframe": bench_dataframe(result, args.runs)
+        }
+
+    informe = {
+        "benchmark": "export",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pyarrow": pa.__version__,
+        "runs": args.runs,
+        "results": resultados
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    for n_bases, medidas in resultados.items():
+        print(f"\n{n_bases} bases")
+        print(f"{'formato':<18}{'KB':>10}{'escritura ms':>14}{'lectura ms':>12}")
+        for nombre, fila in medidas["formats"].items():
+            print(f"{nombre:<18}{fila['bytes'] / 1024:>10.1f}{fila['write_seconds'] * 1000:>14.1f}{fila['read_seconds'] * 1000:>12.1f}")
+        df = medidas["dataframe"]
+        print(f"st.dataframe: pandas {df['pandas_seconds'] * 1000:.1f} ms, arrow {df['arrow_seconds'] * 1000:.1f} ms "
+              f"({df['speedup']:.1f}x), arrow cacheada {df['arrow_cached_seconds'] * 1000:.1f} ms ({df['cached_speedup']:.0f}x)")
+    print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark de la extracción en fragmentos
+Mide el tiempo de /api/extract para un PDF largo según el número de fragmentos enviados en paralelo
+
+Uso:
+    python -m benchmarks.bench_sharding
+    python -m benchmarks.bench_sharding --bases 6000 --shards 1 2 4 8 --seconds-per-page 0.05
+
+Arranca en el propio proceso el backend simulado con --parse-pdf, de modo que cada
+fragmento devuelve sus propias bases y tarda en proporción a sus páginas. Con 1
+fragmento se envía el PDF entero (el comportamiento sin fragmentación). El backend
+simulado usa el parser local, así que mide tiempos; la exactitud frente al backend
+real se comprueba con compare_extraction --sharded.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer
+
+from modules import api_client, local_extraction, sharded_extraction
+
+from .stub_backend import StubHandler, StubState, build_parser
+from .synthetic import load_template, synthetic_result, synthetic_extraction, synthetic_informe_pdf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "bench_sharding.json")
+
+
+def start_stub(seconds_per_page, latency):
+    """Arrancar el backend simulado en un hilo y devolver su URL"""
+    args = build_parser().parse_args([
+        "--port", "0", "--quiet", "--parse-pdf",
+        "--seconds-per-page", str(seconds_per_page), "--latency", f"extract=fixed:{latency}"
+    ])
+    StubHandler.state = StubState(args)
+    server = ThreadingHTTPServer((args.host, 0), StubHandler)
+    server.daemon_threads = True
+    server.quiet = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://{args.host}:{server.server_address[1]}"
+
+
+def _claves(result):
+    return Counter((b["mes_anyo"], b["empresa"], b["regimen"], b["base"]) for b in result["bases"])
+
+
+def run(pdf, shards):
+    """
+    Extraer el PDF con un número máximo de fragmentos
+
+    Args:
+        pdf (bytes): Contenido del PDF
+        shards (int): Fragmentos máximos (1: PDF entero)
+
+    Returns:
+        tuple: (segundos, resultado)
+    """
+    sharded_extraction.EXTRACT_MAX_SHARDS = shards
+    archivo = io.BytesIO(pdf)
+    archivo.name = "informe.pdf"
+    inicio = time.perf_counter()
+    success, result = sharded_extraction.extract_bases_sharded(archivo)
+    segundos = time.perf_counter() - inicio
+    if not success:
+        raise RuntimeError(f"La extracción con {shards} fragmentos falló: {result}")
+    return segundos, result
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la extracción en fragmentos")
+    parser.add_argument("--bases", type=int, default=3000, help="Bases del informe sintético")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8], help="Fragmentos máximos a medir")
+    parser.add_argument("--seconds-per-page", type=float, default=0.02, help="Coste por página del backend simulado")
+    parser.add_argument("--latency", type=float, default=0.1, help="Latencia fija por petición del backend simulado")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones por medida (se informa la mediana)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    if not local_extraction.pypdf_installed():
+        parser.error("pypdf no está instalado (pip install pypdf)")
+    if max(args.shards) > sharded_extraction.EXTRACT_SHARD_WORKERS:
+        parser.error(f"como máximo EXTRACT_SHARD_WORKERS={sharded_extraction.EXTRACT_SHARD_WORKERS} fragmentos")
+
+    extraccion = synthetic_extraction(synthetic_result(load_template(), args.bases))
+    pdf = synthetic_informe_pdf(extraccion)
+    api_client.API_BASE_URL = start_stub(args.seconds_per_page, args.latency)
+    sharded_extraction.EXTRACT_SHARDING = True
+    sharded_extraction.EXTRACT_SHARD_MIN_PAGES = 1
+    esperadas = _claves(extraccion)
+
+    filas = []
+    for shards in args.shards:
+        medidas = [run(pdf, shards) for _ in range(args.runs)]
+        segundos = statistics.median(s for s, _ in medidas)
+        result = medidas[0][1]
+        fragmentada = result["metadata"].get("extraccion_fragmentada", {})
+        filas.append({
+            "shards": fragmentada.get("fragmentos", 1),
+            "seconds": segundos,
+            "total_bases": result["total_bases"],
+            "exact": _claves(result) == esperadas,
+            "shard_seconds": fragmentada.get("segundos_fragmentos")
+        })
+    for fila in filas:
+        fila["speedup"] = filas[0]["seconds"] / fila["seconds"]
+
+    informe = {
+        "benchmark": "sharding",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "bases": args.bases,
+        "pdf_bytes": len(pdf),
+        "seconds_per_page": args.seconds_per_page,
+        "latency": args.latency,
+        "runs": args.runs,
+        "results": filas
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    print(f"PDF sintético: {args.bases} bases, {len(pdf) / 1024:.0f} KB")
+    print(f"{'fragmentos':>10}{'segundos':>10}{'aceleración':>13}{'bases':>8}{'exacta':>8}")
+    for fila in filas:
+        print(f"{fila['shards']:>10}{fila['seconds']:>10.2f}{fila['speedup']:>12.1f}x{fila['total_bases']:>8}"
+              f"{'sí' if fila['exact'] else 'no':>8}")
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark de arranque en frío de la app
+Desglosa el coste de importación por módulo y mide el tiempo hasta el primer render de la página de inicio
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.stub_backend --port 8000 --quiet &
+    API_BASE_URL=http://127.0.0.1:8000 python -m benchmarks.bench_startup --runs 5 --top 30
+
+Cada medida se toma en un proceso nuevo (sin módulos ya importados ni cachés de
+Streamlit), como tras reiniciar el dyno. El health check de la barra lateral
+llama a API_BASE_URL: conviene usar el backend simulado para no medir la red.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "bench_startup.json")
+
+# Dependencias pesadas que no deberían cargarse para mostrar la página de inicio
+# (pandas, numpy y pyarrow los importa ya el propio Streamlit)
+HEAVY_MODULES = ("altair", "openpyxl", "xlsxwriter")
+
+# Importa Streamlit (coste fijo del runtime) y después la app sin ejecutar main()
+_IMPORT_SCRIPT = """
+import sys
+import streamlit
+sys.stderr.write("__APP_IMPORTS__\\n")
+import app
+"""
+
+# Primer render de la página de inicio con el runtime de pruebas de Streamlit
+_RENDER_SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+importado = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=60).run()
+fin = time.perf_counter()
+print(json.dumps({
+    "import_seconds": importado - inicio,
+    "first_render_seconds": fin - importado,
+    "total_seconds": fin - inicio,
+    "exceptions": [str(e.value) for e in at.exception],
+    "heavy_loaded": [m for m in %r if m in sys.modules]
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Interpretar la salida de `python -X importtime`
+
+    Args:
+        stderr (str): Salida de error del proceso
+
+    Returns:
+        tuple: (streamlit, app) con listas de (módulo, propio µs, acumulado µs)
+    """
+    bloques = ([], [])
+    actual = 0
+    for linea in stderr.splitlines():
+        if linea == "__APP_IMPORTS__":
+            actual = 1
+            continue
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, acumulado, modulo = (campo.strip() for campo in linea[len("import time:"):].split("|"))
+        bloques[actual].append((modulo, int(propio), int(acumulado)))
+    return bloques
+
+
+def import_report(top):
+    """
+    Coste de importación de la app desglosado por paquete y por módulo
+
+    Args:
+        top (int): Número de módulos con mayor coste acumulado a incluir
+
+    Returns:
+        dict: Totales, coste propio por paquete y módulos más caros
+    """
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    streamlit_rows, app_rows = parse_importtime(proceso.stderr)
+
+    # El tiempo propio de cada módulo se atribuye a su paquete de primer nivel
+    paquetes = {}
+    for modulo, propio, _ in app_rows:
+        paquete = modulo.split(".", 1)[0]
+        paquetes[paquete] = paquetes.get(paquete, 0) + propio
+
+    return {
+        "streamlit_seconds": sum(propio for _, propio, _ in streamlit_rows) / 1e6,
+        "app_seconds": sum(propio for _, propio, _ in app_rows) / 1e6,
+        "packages": {
+            paquete: segundos / 1e6
+            for paquete, segundos in sorted(paquetes.items(), key=lambda item: -item[1])
+        },
+        "modules": [
+            {"module": modulo, "self_seconds": propio / 1e6, "cumulative_seconds": acumulado / 1e6}
+            for modulo, propio, acumulado in sorted(app_rows, key=lambda row: -row[2])[:top]
+        ],
+        "heavy_loaded": sorted({m.split(".", 1)[0] for m, _, _ in app_rows} & set(HEAVY_MODULES))
+    }
+
+
+def first_render():
+    """Medir en un proceso nuevo el primer render de la página de inicio"""
+    proceso = subprocess.run(
+        [sys.executable, "-c", _RENDER_SCRIPT % (HEAVY_MODULES,)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío de la app")
+    parser.add_argument("--runs", type=int, default=3, help="Procesos nuevos por medida (se informa la mediana)")
+    parser.add_argument("--top", type=int, default=20, help="Módulos más caros a listar")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    imports = [import_report(args.top) for _ in range(args.runs)]
+    renders = [first_render() for _ in range(args.runs)]
+    mediana = statistics.median
+
+    informe = {
+        "benchmark": "startup",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "api_base_url": os.environ.get("API_BASE_URL"),
+        "runs": args.runs,
+        "imports": {
+            "streamlit_seconds": mediana(r["streamlit_seconds"] for r in imports),
+            "app_seconds": mediana(r["app_seconds"] for r in imports),
+            "packages": imports[len(imports) // 2]["packages"],
+            "modules": imports[len(imports) // 2]["modules"],
+            "heavy_loaded": imports[0]["heavy_loaded"]
+        },
+        "first_render": {
+            "import_seconds": mediana(r["import_seconds"] for r in renders),
+            "first_render_seconds": mediana(r["first_render_seconds"] for r in renders),
+            "total_seconds": mediana(r["total_seconds"] for r in renders),
+            "heavy_loaded": renders[0]["heavy_loaded"],
+            "exceptions": renders[0]["exceptions"]
+        }
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    imports, render = informe["imports"], informe["first_render"]
+    print(f"Importación de streamlit:    {imports['streamlit_seconds'] * 1000:8.1f} ms")
+    print(f"Importación de la app:       {imports['app_seconds'] * 1000:8.1f} ms")
+    print(f"Primer render (inicio):      {render['first_render_seconds'] * 1000:8.1f} ms")
+    print(f"Arranque hasta primer render:{render['total_seconds'] * 1000:8.1f} ms")
+    print(f"Dependencias pesadas tras el primer render: {', '.join(render['heavy_loaded']) or 'ninguna'}")
+    if render["exceptions"]:
+        print(f"Excepciones en el render: {render['exceptions']}")
+
+    print(f"\n{'paquete':<28}{'ms (propio)':>12}")
+    for paquete, segundos in list(imports["packages"].items())[:args.top]:
+        print(f"{paquete:<28}{segundos * 1000:>12.1f}")
+
+    print(f"\n{'módulo':<48}{'ms propio':>11}{'ms acumulado':>14}")
+    for fila in imports["modules"]:
+        print(f"{fila['module'].strip():<48}{fila['self_seconds'] * 1000:>11.1f}{fila['cumulative_seconds'] * 1000:>14.1f}")
+    print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
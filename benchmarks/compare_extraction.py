@@ -0,0 +1,277 @@
+"""
+Comparación de la extracción local con la del backend
+Mide precisión, exhaustividad y tiempo del motor local sobre un corpus de informes de bases
+
+Uso:
+    python -m benchmarks.compare_extraction --synthetic 20
+    python -m benchmarks.compare_extraction --corpus informes/
+    API_BASE_URL=http://127.0.0.1:8000 python -m benchmarks.compare_extraction --corpus informes/ --backend
+    API_BASE_URL=http://127.0.0.1:8000 python -m benchmarks.compare_extraction --corpus informes/ --backend --sharded
+
+La referencia de cada PDF es el JSON de /api/extract guardado a su lado
+(`informe.pdf.json`); con --backend se pide al backend (y se guarda) cuando no
+existe. Con --synthetic se genera un corpus a partir de template/process_output.json;
+el generador y el parser comparten disposición, así que solo prueba coherencia.
+Con --sharded se compara la extracción en fragmentos del backend (sharded_extraction)
+en lugar del motor local.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from modules import local_extraction, sharded_extraction
+
+from .synthetic import load_template, synthetic_result, synthetic_extraction, synthetic_informe_pdf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "compare_extraction.json")
+
+
+def _clave(base):
+    return (base["mes_anyo"], base["empresa"].strip().upper(), base["regimen"], round(float(base["base"]), 2))
+
+
+def compare(referencia, local):
+    """
+    Comparar dos extracciones base a base
+
+    Se cuentan las coincidencias de (mes, empresa, régimen, importe) como multiconjunto,
+    ya que un mismo mes puede repetirse con varios contratos.
+
+    Args:
+        referencia (dict): Respuesta de /api/extract
+        local (dict): Respuesta del motor local
+
+    Returns:
+        dict: precision, recall, exact (mismas bases), coincidencias y metadatos que difieren
+    """
+    esperadas = Counter(_clave(b) for b in referencia.get("bases", []))
+    obtenidas = Counter(_clave(b) for b in local.get("bases", []))
+    aciertos = sum((esperadas & obtenidas).values())
+    total_esperadas, total_obtenidas = sum(esperadas.values()), sum(obtenidas.values())
+
+    meta_ref, meta_local = referencia.get("metadata", {}), local.get("metadata", {})
+    metadatos = [
+        campo for campo in ("total_empresas", "periodo_bases")
+        if campo in meta_ref and meta_ref[campo] != meta_local.get(campo)
+    ]
+    if referencia.get("total_bases") != local.get("total_bases"):
+        metadatos.append("total_bases")
+
+    return {
+        "expected": total_esperadas,
+        "extracted": total_obtenidas,
+        "matched": aciertos,
+        "precision": aciertos / total_obtenidas if total_obtenidas else 0.0,
+        "recall": aciertos / total_esperadas if total_esperadas else 0.0,
+        "exact": esperadas == obtenidas,
+        "metadata_mismatches": metadatos
+    }
+
+
+def synthetic_corpus(directory, count, seed=0):
+    """
+    Generar un corpus sintético de PDFs con su JSON de referencia
+
+    Args:
+        directory (str): Carpeta de destino
+        count (int): Número de informes
+        seed (int): Semilla inicial
+
+    Returns:
+        list: Rutas de los PDFs generados
+    """
+    template = load_template()
+    rutas = []
+    for i in range(count):
+        # Carreras de entre 300 y 3.000 bases (informes de unas 10 a 60 páginas)
+        extraccion = synthetic_extraction(synthetic_result(template, 300 + (i * 997) % 2700, seed=seed + i))
+        ruta = os.path.join(directory, f"informe_{i:03d}.pdf")
+        with open(ruta, "wb") as f:
+            f.write(synthetic_informe_pdf(extraccion))
+        with open(ruta + ".json", "w", encoding="utf-8") as f:
+            json.dump(extraccion, f, ensure_ascii=False)
+        rutas.append(ruta)
+    return rutas
+
+
+def _reference(ruta, backend):
+    """Referencia de un PDF y segundos del backend (None si se leyó del JSON guardado)"""
+    sidecar = ruta + ".json"
+    if os.path.exists(sidecar):
+        with open(sidecar, encoding="utf-8") as f:
+            return json.load(f), None
+    if not backend:
+        return None, None
+
+    from modules.api_client import extract_bases
+
+    with open(ruta, "rb") as f:
+        archivo = io.BytesIO(f.read())
+    archivo.name = os.path.basename(ruta)
+    inicio = time.perf_counter()
+    success, result = extract_bases(archivo)
+    segundos = time.perf_counter() - inicio
+    if not success:
+        print(f"{ruta}: el backend falló ({result})")
+        return None, segundos
+    with open(sidecar, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False)
+    return result, segundos
+
+
+def _extract_sharded(archivo):
+    """Extracción en fragmentos con el backend (confianza 1 si se fragmentó, 0 si no)"""
+    sharded_extraction.EXTRACT_SHARDING = True
+    success, result = sharded_extraction.extract_bases_sharded(archivo)
+    if not success:
+        raise RuntimeError(f"La extracción en fragmentos falló: {result}")
+    fragmentada = result.get("metadata", {}).get("extraccion_fragmentada")
+    if fragmentada:
+        return 1.0, result, fragmentada["paginas"]
+    from pypdf import PdfReader
+
+    archivo.seek(0)
+    return 0.0, result, len(PdfReader(archivo).pages)
+
+
+def _extract_local(archivo):
+    confianza, result = local_extraction.extract_bases_local(archivo)
+    return confianza, result, result["metadata"]["extraccion_local"]["paginas"]
+
+
+def evaluate(ruta, backend=False, sharded=False):
+    """
+    Extraer un PDF en local (o en fragmentos con el backend) y compararlo con su referencia
+
+    Args:
+        ruta (str): Ruta del PDF
+        backend (bool): Pedir la referencia al backend si no hay JSON guardado
+        sharded (bool): Usar sharded_extraction en lugar del motor local
+
+    Returns:
+        dict: Resultado de compare más confianza, páginas y tiempos (None sin referencia).
+              En modo fragmentado, "accepted" indica que el PDF se llegó a fragmentar
+    """
+    referencia, segundos_backend = _reference(ruta, backend)
+    if referencia is None:
+        return None
+
+    with open(ruta, "rb") as f:
+        archivo = io.BytesIO(f.read())
+    archivo.name = os.path.basename(ruta)
+    inicio = time.perf_counter()
+    confianza, extraido, paginas = (_extract_sharded if sharded else _extract_local)(archivo)
+    segundos_local = time.perf_counter() - inicio
+
+    fila = {"file": os.path.basename(ruta), "bytes": archivo.getbuffer().nbytes}
+    fila.update(compare(referencia, extraido))
+    fila.update({
+        "pages": paginas,
+        "confidence": confianza,
+        "accepted": confianza >= (1.0 if sharded else local_extraction.LOCAL_EXTRACTION_MIN_CONFIDENCE),
+        "local_seconds": segundos_local,
+        "backend_seconds": segundos_backend
+    })
+    return fila
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=ROOT
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparación de la extracción local con la del backend")
+    parser.add_argument("--corpus", help="Carpeta con los PDFs (y su .pdf.json de referencia)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Generar N informes sintéticos")
+    parser.add_argument("--backend", action="store_true", help="Pedir al backend las referencias que falten")
+    parser.add_argument("--sharded", action="store_true",
+                        help="Comparar la extracción en fragmentos del backend en lugar del motor local")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Fichero JSON de resultados")
+    args = parser.parse_args(argv)
+
+    if not local_extraction.pypdf_installed():
+        parser.error("pypdf no está instalado (pip install pypdf)")
+    if not args.corpus and not args.synthetic:
+        parser.error("indica --corpus o --synthetic")
+
+    temporal = None
+    if args.synthetic:
+        if not args.corpus:
+            temporal = tempfile.TemporaryDirectory()
+            args.corpus = temporal.name
+        os.makedirs(args.corpus, exist_ok=True)
+        synthetic_corpus(args.corpus, args.synthetic)
+
+    rutas = sorted(
+        os.path.join(args.corpus, nombre) for nombre in os.listdir(args.corpus) if nombre.lower().endswith(".pdf")
+    )
+    filas = [fila for fila in (evaluate(ruta, args.backend, args.sharded) for ruta in rutas) if fila]
+    if temporal:
+        temporal.cleanup()
+    if not filas:
+        parser.error("ningún PDF del corpus tiene referencia")
+
+    esperadas = sum(f["expected"] for f in filas)
+    obtenidas = sum(f["extracted"] for f in filas)
+    aciertos = sum(f["matched"] for f in filas)
+    con_backend = [f for f in filas if f["backend_seconds"] is not None]
+    informe = {
+        "benchmark": "compare_extraction",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": "sharded" if args.sharded else "local",
+        "min_confidence": local_extraction.LOCAL_EXTRACTION_MIN_CONFIDENCE,
+        "summary": {
+            "files": len(filas),
+            "precision": aciertos / obtenidas if obtenidas else 0.0,
+            "recall": aciertos / esperadas if esperadas else 0.0,
+            "exact_files": sum(f["exact"] for f in filas),
+            "metadata_mismatch_files": sum(bool(f["metadata_mismatches"]) for f in filas),
+            "accepted_files": sum(f["accepted"] for f in filas),
+            # Aceptadas en local con alguna base distinta: el fallo que no debe ocurrir
+            "accepted_wrong_files": sum(f["accepted"] and not f["exact"] for f in filas),
+            "local_seconds": sum(f["local_seconds"] for f in filas),
+            "backend_seconds": sum(f["backend_seconds"] for f in con_backend) if con_backend else None
+        },
+        "files": filas
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    print(f"{'fichero':<24}{'págs':>6}{'bases':>8}{'precisión':>11}{'recall':>9}{'exacta':>8}{'confianza':>11}{'local ms':>10}{'backend ms':>12}")
+    for f in filas:
+        backend_ms = f"{f['backend_seconds'] * 1000:.0f}" if f["backend_seconds"] is not None else "-"
+        print(
+            f"{f['file']:<24}{f['pages']:>6}{f['expected']:>8}{f['precision']:>11.4f}{f['recall']:>9.4f}"
+            f"{'sí' if f['exact'] else 'no':>8}{f['confidence']:>11.4f}{f['local_seconds'] * 1000:>10.1f}{backend_ms:>12}"
+        )
+    resumen = informe["summary"]
+    print(f"\nPrecisión {resumen['precision']:.4f} · recall {resumen['recall']:.4f} · "
+          f"{resumen['exact_files']}/{resumen['files']} exactas · {resumen['accepted_files']} "
+          f"{'fragmentadas' if args.sharded else 'aceptadas en local'} "
+          f"({resumen['accepted_wrong_files']} con errores)")
+    print(f"Resultados guardados en {args.output}")
+    return 0 if not resumen["accepted_wrong_files"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
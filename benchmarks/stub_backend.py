@@ -0,0 +1,292 @@
+"""
+Backend simulado para pruebas de carga
+Implementa /health, /api/extract, /api/process y /api/config/* con latencia y fallos configurables
+
+Uso:
+    python -m benchmarks.stub_backend --port 8000
+    python -m benchmarks.stub_backend --latency default=lognormal:0.2:0.5 --latency process=uniform:1:3 \\
+        --error-rate process=0.05 --timeout-rate 0.01 --bases 3000
+
+    API_BASE_URL=http://127.0.0.1:8000 streamlit run app.py
+
+Con --parse-pdf, /api/extract lee el PDF recibido (requiere pypdf) y tarda además
+--seconds-per-page por página, como un backend cuyo coste crece con el informe.
+
+Distribuciones de latencia (segundos):
+    fixed:S, uniform:A:B, normal:MEDIA:DESVIACION, lognormal:MEDIANA:SIGMA, exp:MEDIA
+
+Las opciones por endpoint aceptan "endpoint=valor" (health, extract, process,
+config) o "default=valor"; un valor sin nombre equivale a default.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from modules import local_extraction
+
+from .synthetic import load_template, synthetic_result, synthetic_extraction
+
+ENDPOINTS = ("health", "extract", "process", "config")
+
+# Estados devueltos al inyectar errores
+_ERROR_STATUS = (500, 502, 503)
+
+
+def parse_latency(spec):
+    """
+    Convertir una especificación de latencia en una función que devuelve segundos
+
+    Args:
+        spec (str): fixed:S, uniform:A:B, normal:MEDIA:DESV, lognormal:MEDIANA:SIGMA o exp:MEDIA
+
+    Returns:
+        callable: Función sin argumentos que devuelve la latencia de una petición
+    """
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(random.gauss(values[0], values[1]), 0.0)
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: random.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+    if kind == "exp" and len(values) == 1:
+        return lambda: random.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    raise argparse.ArgumentTypeError(f"Distribución de latencia no válida: {spec}")
+
+
+def _per_endpoint(values, parse, default):
+    """Resolver opciones "endpoint=valor" en un diccionario por endpoint"""
+    resolved = {"default": default}
+    for value in values or []:
+        name, _, spec = value.rpartition("=")
+        name = name or "default"
+        if name not in ENDPOINTS and name != "default":
+            raise SystemExit(f"Endpoint desconocido: {name} (usa {', '.join(ENDPOINTS)} o default)")
+        resolved[name] = parse(spec)
+    return {name: resolved.get(name, resolved["default"]) for name in ENDPOINTS}
+
+
+def build_config_payloads(template):
+    """
+    Construir las respuestas de /api/config/* coherentes con la plantilla
+
+    Returns:
+        dict: Ruta -> cuerpo JSON
+    """
+    indices = {
+        b["mes_anyo"]: b["indice_revalorizacion"]
+        for b in template["bases_procesadas"]
+        if "indice_revalorizacion" in b
+    }
+    parametros = {
+        str(anyo): {
+            "bases_incluidas": 300 + (anyo - 2025) * 2,
+            "periodo_meses": 300 + (anyo - 2025) * 4,
+            "divisor_base_reguladora": round(350 + (anyo - 2025) * 2.33, 2)
+        }
+        for anyo in range(2025, 2045)
+    }
+    topes = {
+        str(anyo): {
+            "base_minima_mensual": round(1000 + (anyo - 2000) * 1.0, 2),
+            "base_maxima_mensual": round(4000 + (anyo - 2000) * 10.0, 2)
+        }
+        for anyo in range(2000, 2027)
+    }
+    return {
+        "/api/config/parametros": {"success": True, "data": {"parametros_computo_anual": parametros}},
+        "/api/config/indices": {"success": True, "data": {"indices_revalorizacion": indices}},
+        "/api/config/topes": {"success": True, "data": {"topes_cotizacion": topes}}
+    }
+
+
+class StubState:
+    """Respuestas precalculadas, parámetros de fallo y contadores del servidor"""
+
+    def __init__(self, args):
+        template = load_template()
+        process = synthetic_result(template, args.bases) if args.bases else template
+        self.bodies = {
+            "/health": json.dumps({"status": "healthy", "services": {"stub": "ok"}}).encode(),
+            "/api/process": json.dumps(process, ensure_ascii=False).encode("utf-8"),
+            "/api/extract": json.dumps(synthetic_extraction(process), ensure_ascii=False).encode("utf-8")
+        }
+        for path, payload in build_config_payloads(template).items():
+            self.bodies[path] = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.etags = {path: f'"{hashlib.sha1(body).hexdigest()[:16]}"' for path, body in self.bodies.items()}
+
+        self.latency = _per_endpoint(args.latency, parse_latency, parse_latency("fixed:0"))
+        self.error_rate = _per_endpoint(args.error_rate, float, 0.0)
+        self.timeout_rate = _per_endpoint(args.timeout_rate, float, 0.0)
+        self.timeout_seconds = args.timeout_seconds
+        self.parse_pdf = args.parse_pdf
+        self.seconds_per_page = args.seconds_per_page
+
+        self._lock = threading.Lock()
+        self.stats = {name: {"requests": 0, "errors": 0, "timeouts": 0, "not_modified": 0} for name in ENDPOINTS}
+
+    def count(self, endpoint, field):
+        with self._lock:
+            self.stats[endpoint][field] += 1
+
+
+def parse_uploaded_pdf(body):
+    """
+    Extraer las bases del PDF de un cuerpo multipart con el motor local
+
+    Args:
+        body (bytes): Cuerpo de la petición
+
+    Returns:
+        tuple: (páginas, respuesta con el formato de /api/extract)
+    """
+    inicio, fin = body.find(b"%PDF"), body.rfind(b"%%EOF")
+    bases, info = local_extraction.parse_lines(local_extraction.iter_page_lines(io.BytesIO(body[inicio:fin + 5])))
+    result = local_extraction.build_extraction(bases, info)
+    del result["metadata"]["extraccion_local"]
+    result["message"] = f"PDF procesado: {len(bases)} bases extraídas"
+    return info["paginas"], result
+
+
+def _endpoint(path):
+    """Nombre lógico del endpoint de una ruta"""
+    if path == "/health":
+        return "health"
+    if path.startswith("/api/config/"):
+        return "config"
+    if path in ("/api/extract", "/api/process"):
+        return path.rsplit("/", 1)[1]
+    return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP del backend simulado"""
+
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _handle(self, method):
+        path = self.path.split("?", 1)[0]
+        if path == "/__stats":
+            self._send(200, json.dumps(self.state.stats).encode())
+            return
+
+        endpoint = _endpoint(path)
+        expected = "GET" if endpoint in ("health", "config") else "POST"
+        if endpoint is None or path not in self.state.bodies or method != expected:
+            self._send(404, json.dumps({"detail": "Not Found"}).encode())
+            return
+
+        state = self.state
+        body = None
+        paginas = 0
+        if method == "POST":
+            upload = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if endpoint == "extract" and state.parse_pdf:
+                paginas, result = parse_uploaded_pdf(upload)
+                body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+
+        state.count(endpoint, "requests")
+
+        if random.random() < state.timeout_rate[endpoint]:
+            state.count(endpoint, "timeouts")
+            time.sleep(state.timeout_seconds)
+            self.close_connection = True
+            return
+
+        time.sleep(state.latency[endpoint]() + paginas * state.seconds_per_page)
+
+        if random.random() < state.error_rate[endpoint]:
+            state.count(endpoint, "errors")
+            status = random.choice(_ERROR_STATUS)
+            self._send(status, json.dumps({"detail": f"Error simulado ({status})"}).encode())
+            return
+
+        etag = state.etags[path]
+        if endpoint == "config" and self.headers.get("If-None-Match") == etag:
+            state.count(endpoint, "not_modified")
+            self._send(304, headers={"ETag": etag})
+            return
+
+        self._send(200, body or state.bodies[path], {"ETag": etag} if endpoint == "config" else None)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Backend simulado de la API de bases de cotización")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", action="append", metavar="[ENDPOINT=]DIST",
+                        help="Distribución de latencia, p. ej. process=lognormal:1.5:0.4")
+    parser.add_argument("--error-rate", action="append", metavar="[ENDPOINT=]P",
+                        help="Probabilidad de responder 500/502/503")
+    parser.add_argument("--timeout-rate", action="append", metavar="[ENDPOINT=]P",
+                        help="Probabilidad de no responder hasta --timeout-seconds")
+    parser.add_argument("--timeout-seconds", type=float, default=130.0,
+                        help="Espera de las peticiones que simulan un timeout")
+    parser.add_argument("--bases", type=int, default=0,
+                        help="Bases de la respuesta de /api/process (0: la plantilla tal cual)")
+    parser.add_argument("--parse-pdf", action="store_true",
+                        help="Extraer en /api/extract las bases del PDF recibido (requiere pypdf)")
+    parser.add_argument("--seconds-per-page", type=float, default=0.0,
+                        help="Latencia adicional de /api/extract por página del PDF (con --parse-pdf)")
+    parser.add_argument("--seed", type=int, default=None, help="Semilla para latencias y fallos")
+    parser.add_argument("--quiet", action="store_true", help="No registrar cada petición")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Sin pypdf cada /api/extract fallaría: se avisa al arrancar
+    if args.parse_pdf and not local_extraction.pypdf_installed():
+        parser.error("--parse-pdf requiere pypdf (pip install pypdf)")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    StubHandler.state = StubState(args)
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    server.quiet = args.quiet
+
+    sizes = ", ".join(f"{path} {len(body) / 1024:.1f} KB" for path, body in StubHandler.state.bodies.items())
+    print(f"Backend simulado en http://{args.host}:{args.port} ({sizes})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
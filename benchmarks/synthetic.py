@@ -0,0 +1,215 @@
+"""
+Generación de respuestas sintéticas a partir de template/process_output.json
+Compartido por los benchmarks y el backend simulado
+"""
+
+import copy
+import json
+
+import numpy as np
+
+from modules.local_engine import TEMPLATE_PATH, mes_anyo_to_ordinal, ordinal_to_mes_anyo
+
+# Meses de la carrera sintética (50 años); con más bases se repiten meses (pluriempleo)
+_MESES_CARRERA = 600
+_MESES_NO_REVALORIZADOS = 24
+
+
+def load_template():
+    """Cargar la respuesta de referencia"""
+    with open(TEMPLATE_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def synthetic_result(template, n_bases, seed=0):
+    """
+    Construir un resultado con n_bases bases a partir de la plantilla
+
+    Las bases se reparten en los 600 meses anteriores a la jubilación, con varias
+    empresas por mes cuando hay más bases que meses. Los importes e índices se
+    muestrean de la plantilla y los 24 meses más recientes quedan sin revalorizar.
+
+    Args:
+        template (dict): Respuesta de referencia
+        n_bases (int): Número de bases a generar
+        seed (int): Semilla del generador aleatorio
+
+    Returns:
+        dict: Resultado con el formato de /api/process
+    """
+    rng = np.random.default_rng(seed)
+    originales = np.array(
+        [b.get("base_original", b["base"]) for b in template["bases_procesadas"]], dtype=np.float64
+    )
+    indices = np.array(
+        [b["indice_revalorizacion"] for b in template["bases_procesadas"] if "indice_revalorizacion" in b],
+        dtype=np.float64
+    )
+    n_empresas = max(8, n_bases // 50)
+    empresas = [f"EMPRESA SINTETICA {i:05d} S.L." for i in range(n_empresas)]
+
+    jubilacion = int(mes_anyo_to_ordinal([template["fecha_jubilacion"]])[0])
+    meses = jubilacion - 1 - (np.arange(n_bases) * _MESES_CARRERA // n_bases)
+    base_original = np.round(rng.choice(originales, n_bases) * rng.uniform(0.9, 1.1, n_bases), 2)
+    indice = rng.choice(indices, n_bases)
+    empresa = rng.integers(0, n_empresas, n_bases)
+    revalorizado = meses < jubilacion - _MESES_NO_REVALORIZADOS
+
+    bases = []
+    for i in range(n_bases):
+        fila = {
+            "mes_anyo": ordinal_to_mes_anyo(meses[i]),
+            "base": round(float(base_original[i] * indice[i]), 2) if revalorizado[i] else float(base_original[i]),
+            "empresa": empresas[empresa[i]],
+            "regimen": "GENERAL",
+            "periodo": "revalorizado" if revalorizado[i] else "no_revalorizado"
+        }
+        if revalorizado[i]:
+            fila["base_original"] = float(base_original[i])
+            fila["indice_revalorizacion"] = float(indice[i])
+        bases.append(fila)
+
+    result = copy.deepcopy({k: v for k, v in template.items() if k != "bases_procesadas"})
+    result["bases_procesadas"] = bases
+    return result
+
+
+def synthetic_extraction(result):
+    """
+    Construir una respuesta de /api/extract coherente con un resultado de /api/process
+
+    Las bases vuelven a su importe original y la pluriactividad se desagrega.
+
+    Args:
+        result (dict): Resultado con el formato de /api/process
+
+    Returns:
+        dict: Respuesta con el formato de /api/extract
+    """
+    bases = []
+    for fila in result["bases_procesadas"]:
+        if "pluriactividad" in fila:
+            bases.extend(fila["pluriactividad"].get("bases_individuales", []))
+        else:
+            bases.append({
+                "mes_anyo": fila["mes_anyo"],
+                "base": fila.get("base_original", fila["base"]),
+                "empresa": fila["empresa"],
+                "regimen": fila["regimen"]
+            })
+
+    ordinales = mes_anyo_to_ordinal([b["mes_anyo"] for b in bases]) if bases else np.zeros(1, dtype=np.int32)
+    return {
+        "success": True,
+        "message": f"PDF procesado exitosamente: {len(bases)} bases extraídas",
+        "total_bases": len(bases),
+        "bases": bases,
+        "metadata": {
+            "total_empresas": len({b["empresa"] for b in bases}),
+            "periodo_bases": {
+                "desde": ordinal_to_mes_anyo(ordinales.min()),
+                "hasta": ordinal_to_mes_anyo(ordinales.max())
+            }
+        }
+    }
+
+
+def _importe_es(valor):
+    """Formatear un importe como en el informe: 1.653,75"""
+    return f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _pdf_text(texto):
+    """Escapar una línea para un operador Tj (WinAnsiEncoding)"""
+    escaped = texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("cp1252", errors="replace")
+
+
+def synthetic_informe_lines(extraction):
+    """
+    Líneas de texto de un informe de bases con la disposición que interpreta local_extraction
+
+    Secciones por régimen y empresa, con una fila "MM/YYYY  importe" por mes.
+
+    Args:
+        extraction (dict): Respuesta con el formato de /api/extract
+
+    Returns:
+        list: Líneas del informe
+    """
+    secciones = {}
+    for base in extraction["bases"]:
+        secciones.setdefault((base["regimen"], base["empresa"]), []).append(base)
+
+    lineas = ["INFORME DE BASES DE COTIZACIÓN", "TESORERÍA GENERAL DE LA SEGURIDAD SOCIAL", ""]
+    for numero, ((regimen, empresa), bases) in enumerate(sorted(secciones.items())):
+        lineas += [
+            f"RÉGIMEN: {regimen}",
+            f"EMPRESA: {empresa}    C.C.C.: 08/{1000000 + numero:07d}/{numero % 100:02d}",
+            "PERIODO      BASE CONTINGENCIAS COMUNES"
+        ]
+        for base in sorted(bases, key=lambda b: mes_anyo_to_ordinal([b["mes_anyo"]])[0]):
+            lineas.append(f"{base['mes_anyo']}      {_importe_es(base['base'])}")
+        lineas.append("")
+    return lineas
+
+
+def _paginate(lineas, lines_per_page):
+    """Repartir las líneas en páginas repitiendo la cabecera de la sección que continúa"""
+    paginas = [[]]
+    cabecera = []
+    for linea in lineas:
+        if linea.startswith("RÉGIMEN:"):
+            cabecera = [linea]
+        elif linea.startswith(("EMPRESA:", "PERIODO")):
+            cabecera.append(linea)
+        if len(paginas[-1]) >= lines_per_page:
+            paginas.append([])
+            if linea[:1].isdigit() and len(cabecera) == 3:
+                paginas[-1] += [cabecera[0], cabecera[1].replace("    C.C.C.", " (continuación)    C.C.C."), cabecera[2]]
+        paginas[-1].append(linea)
+    return paginas
+
+
+def synthetic_informe_pdf(extraction, lines_per_page=60):
+    """
+    Construir un PDF mínimo con capa de texto a partir de una extracción
+
+    Como en el informe real, una sección que continúa en la página siguiente
+    repite allí su cabecera marcada como "(continuación)".
+
+    Args:
+        extraction (dict): Respuesta con el formato de /api/extract
+        lines_per_page (int): Líneas de texto por página
+
+    Returns:
+        bytes: Contenido del PDF
+    """
+    paginas = _paginate(synthetic_informe_lines(extraction), lines_per_page)
+
+    # Objetos: 1 catálogo, 2 árbol de páginas, 3 fuente y después página + contenido por cada página
+    objetos = [None, None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for numero, pagina in enumerate(paginas, start=1):
+        texto = [f"Página {numero} de {len(paginas)}"] + pagina
+        stream = b"BT /F1 9 Tf 11 TL 40 810 Td " + b" ".join(b"(" + _pdf_text(t) + b") Tj T*" for t in texto) + b" ET"
+        objetos.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        contenido = len(objetos)
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {contenido} 0 R >>".encode()
+        )
+        kids.append(f"{len(objetos)} 0 R")
+    objetos[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objetos[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    salida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for numero, cuerpo in enumerate(objetos, start=1):
+        offsets.append(len(salida))
+        salida += f"{numero} 0 obj\n".encode() + cuerpo + b"\nendobj\n"
+    xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    salida += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    salida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(salida)
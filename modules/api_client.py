@@ -3,46 +3,306 @@ Módulo cliente para la API de pensiones
 Maneja todas las comunicaciones con la API backend
 """
 
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
 import requests
-import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+from .health import breaker, CircuitOpenError, get_health_status
+from .latency import tracker as latency
+from .multipart import MultipartEncoder
+from .single_flight import SingleFlight
+
+# URL base de la API (API_BASE_URL permite apuntar a otro backend, p. ej. benchmarks.stub_backend)
+DEFAULT_API_BASE_URL = "https://pension-bases-api-e707c1384c99.herokuapp.com"
+API_BASE_URL = os.environ.get("API_BASE_URL", DEFAULT_API_BASE_URL).rstrip("/")
+
+# Pool de conexiones HTTP compartido por todo el proceso
+API_POOL_SIZE = int(os.environ.get("API_POOL_SIZE", "10"))
+API_MAX_RETRIES = int(os.environ.get("API_MAX_RETRIES", "3"))
+API_BACKOFF_FACTOR = float(os.environ.get("API_BACKOFF_FACTOR", "0.5"))
+
+# Solo se reintentan métodos idempotentes ante estos códigos (dyno dormido, router de Heroku)
+_RETRY_METHODS = frozenset({"GET", "HEAD"})
+_RETRY_STATUS = (502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+# Caché de configuración compartida entre sesiones (segundos de validez)
+CONFIG_CACHE_TTL = int(os.environ.get("CONFIG_CACHE_TTL", "300"))
+
+_CONFIG_ENDPOINTS = {
+    "parametros": "/api/config/parametros",
+    "indices": "/api/config/indices",
+    "topes": "/api/config/topes"
+}
+
+_config_cache = {}
+_config_lock = threading.Lock()
+_config_flight = SingleFlight("config")
+_config_executor = ThreadPoolExecutor(max_workers=len(_CONFIG_ENDPOINTS), thread_name_prefix="config")
+
+# Hilos de los GET con hedging: original y copia de cada configuración y del health check
+_hedge_executor = ThreadPoolExecutor(max_workers=2 * (len(_CONFIG_ENDPOINTS) + 1), thread_name_prefix="hedge")
+
+
+class _JitteredRetry(Retry):
+    """Retry con backoff exponencial y jitter completo para no sincronizar reintentos"""
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
 
-# URL base de la API
-API_BASE_URL = "https://pension-bases-api-e707c1384c99.herokuapp.com"
+def _build_session():
+    """
+    Crear la sesión HTTP con pool de conexiones keep-alive y política de reintentos
+    
+    Returns:
+        requests.Session: Sesión configurada
+    """
+    retry = _JitteredRetry(
+        total=API_MAX_RETRIES,
+        allowed_methods=_RETRY_METHODS,
+        status_forcelist=_RETRY_STATUS,
+        backoff_factor=API_BACKOFF_FACTOR,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=API_POOL_SIZE,
+        pool_maxsize=API_POOL_SIZE,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive"})
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Obtener la sesión HTTP compartida (se crea una sola vez por proceso)
+    
+    Returns:
+        requests.Session: Sesión con pool de conexiones
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def get_pool_stats():
+    """
+    Obtener contadores de reutilización del pool de conexiones
+    
+    Returns:
+        dict: Peticiones, conexiones nuevas (fallos) y reutilizadas (aciertos)
+    """
+    adapter = get_session().get_adapter(API_BASE_URL)
+    pools = adapter.poolmanager.pools
+    total_requests = 0
+    new_connections = 0
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        total_requests += pool.num_requests
+        new_connections += pool.num_connections
+    
+    hits = max(total_requests - new_connections, 0)
+    return {
+        "pool_size": API_POOL_SIZE,
+        "requests": total_requests,
+        "misses": new_connections,
+        "hits": hits,
+        "hit_rate": hits / total_requests if total_requests else 0.0
+    }
+
+
+def _request(endpoint, method, url, probe=False, **kwargs):
+    """
+    Hacer una petición con la sesión compartida registrando sus métricas
+    
+    Las llamadas pasan por el circuit breaker: con el circuito abierto fallan al
+    instante con CircuitOpenError en lugar de esperar al timeout.
+    
+    Args:
+        endpoint (str): Nombre del endpoint en las métricas
+        method (str): Método HTTP
+        url (str): URL completa
+        probe (bool): Sondeo de salud: se hace aunque el circuito esté abierto
+        **kwargs: Argumentos de requests.Session.request
+        
+    Returns:
+        requests.Response: Respuesta del backend (las excepciones se propagan)
+    """
+    if not probe and not breaker.allow():
+        metrics.api_requests.inc(endpoint=endpoint, status="circuit_open")
+        raise CircuitOpenError(
+            f"El backend no está disponible (circuito abierto, nuevo intento en {breaker.retry_in():.0f} s)"
+        )
+    
+    body = kwargs.get("data")
+    bytes_sent = len(body) if body is not None and hasattr(body, "__len__") else 0
+    
+    inicio = time.perf_counter()
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except requests.exceptions.Timeout:
+        elapsed = time.perf_counter() - inicio
+        breaker.record_failure()
+        # Muestra censurada: la latencia real fue al menos el timeout
+        latency.observe(endpoint, elapsed, bytes_sent)
+        metrics.observe_api_call(endpoint, elapsed, "timeout", timeout=True)
+        raise
+    except Exception:
+        breaker.record_failure()
+        metrics.observe_api_call(endpoint, time.perf_counter() - inicio, "error")
+        raise
+    elapsed = time.perf_counter() - inicio
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    latency.observe(endpoint, elapsed, bytes_sent)
+    metrics.observe_api_call(
+        endpoint,
+        elapsed,
+        str(response.status_code),
+        bytes_sent=bytes_sent,
+        bytes_received=len(response.content)
+    )
+    return response
+
+
+def _hedged_get(endpoint, url, probe=False, **kwargs):
+    """
+    GET idempotente con hedging: si no responde antes del p95 observado se
+    lanza una copia y se usa la primera respuesta que llegue
+    
+    La petición que pierde no se cancela (requests no lo permite) y su
+    respuesta se descarta.
+    
+    Args:
+        endpoint (str): Nombre del endpoint en las métricas
+        url (str): URL completa
+        probe (bool): Sondeo de salud (ver _request)
+        **kwargs: Argumentos de requests.Session.request
+        
+    Returns:
+        requests.Response: Primera respuesta recibida
+    """
+    delay = latency.hedge_delay(endpoint)
+    if delay is None:
+        return _request(endpoint, "GET", url, probe=probe, **kwargs)
+    
+    original = _hedge_executor.submit(_request, endpoint, "GET", url, probe=probe, **kwargs)
+    try:
+        response = original.result(timeout=delay)
+        latency.record_hedge(endpoint)
+        return response
+    except FutureTimeoutError:
+        pass
+    
+    metrics.api_hedges.inc(endpoint=endpoint)
+    copia = _hedge_executor.submit(_request, endpoint, "GET", url, probe=probe, **kwargs)
+    pending = {original, copia}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                won = future is copia
+                latency.record_hedge(endpoint, hedged=True, won=won)
+                if won:
+                    metrics.api_hedge_wins.inc(endpoint=endpoint)
+                return future.result()
+            error = future.exception()
+    latency.record_hedge(endpoint, hedged=True)
+    raise error
 
 
-def check_api_health():
+def _post_file(endpoint, path, file, fields=None, timeout=60, progress=None):
+    """
+    Enviar un PDF en streaming midiendo por separado la subida y el procesamiento
+    
+    Args:
+        endpoint (str): Nombre del endpoint en las métricas
+        path (str): Ruta del endpoint
+        file: Archivo PDF (UploadedFile o cualquier objeto archivo con nombre)
+        fields (dict): Campos de formulario adicionales
+        timeout (int): Timeout por defecto, que se adapta a la latencia observada y al tamaño
+        progress (callable): progress(bytes_enviados, total) durante la subida (opcional)
+        
+    Returns:
+        requests.Response: Respuesta del backend
+    """
+    filename = os.path.basename(getattr(file, "name", "") or "documento.pdf")
+    encoder = MultipartEncoder(fields, {"file": (filename, file, "application/pdf")}, callback=progress)
+    inicio = time.perf_counter()
+    response = _request(
+        endpoint, "POST", f"{API_BASE_URL}{path}",
+        data=encoder, headers={"Content-Type": encoder.content_type},
+        timeout=latency.timeout_for(endpoint, timeout, len(encoder))
+    )
+    fin = time.perf_counter()
+    subida = (encoder.finished_at or fin) - inicio
+    metrics.api_phase.observe(subida, endpoint=endpoint, phase="upload")
+    metrics.api_phase.observe(fin - inicio - subida, endpoint=endpoint, phase="server")
+    return response
+
+
+def check_api_health(timeout=10):
     """
     Verificar el estado de la API
     
+    Args:
+        timeout (float): Timeout por defecto, que se adapta a la latencia observada
+    
     Returns:
         tuple: (is_healthy: bool, response_data: dict)
     """
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=10)
+        response = _hedged_get(
+            "health", f"{API_BASE_URL}/health", probe=True, timeout=latency.timeout_for("health", timeout)
+        )
         return response.status_code == 200, response.json() if response.status_code == 200 else None
     except Exception as e:
         return False, str(e)
 
 
-def extract_bases(file):
+def extract_bases(file, progress=None):
     """
     Extraer bases de cotización de un PDF
     
     Args:
         file: Archivo PDF subido
+        progress (callable): progress(bytes_enviados, total) durante la subida (opcional)
         
     Returns:
         tuple: (success: bool, result: dict)
     """
     try:
-        files = {"file": file}
-        response = requests.post(f"{API_BASE_URL}/api/extract", files=files, timeout=60)
+        response = _post_file("extract", "/api/extract", file, timeout=60, progress=progress)
         return response.status_code == 200, response.json()
     except Exception as e:
         return False, {"error": str(e)}
 
 
-def process_complete(file, fecha_jubilacion, regimen_acceso, sexo):
+def process_complete(file, fecha_jubilacion, regimen_acceso, sexo, progress=None):
     """
     Procesar PDF completo (extraer + simular)
     
@@ -51,54 +311,155 @@ def process_complete(file, fecha_jubilacion, regimen_acceso, sexo):
         fecha_jubilacion (str): Fecha en formato MM/YYYY
         regimen_acceso (str): GENERAL o AUTONOMO
         sexo (str): MASCULINO o FEMENINO
+        progress (callable): progress(bytes_enviados, total) durante la subida (opcional)
         
     Returns:
         tuple: (success: bool, result: dict)
     """
     try:
-        files = {"file": file}
         data = {
             "fecha_jubilacion": fecha_jubilacion,
             "regimen_acceso": regimen_acceso,
             "sexo": sexo
         }
-        response = requests.post(f"{API_BASE_URL}/api/process", files=files, data=data, timeout=120)
+        response = _post_file("process", "/api/process", file, fields=data, timeout=120, progress=progress)
         return response.status_code == 200, response.json()
     except Exception as e:
         return False, {"error": str(e)}
 
 
-def get_configuration():
+def _fetch_config_endpoint(name, path):
+    """
+    Obtener un endpoint de configuración usando la caché con TTL
+    
+    Si la entrada ha caducado se revalida con una petición condicional
+    (If-None-Match / If-Modified-Since); un 304 reutiliza el cuerpo cacheado.
+    
+    Args:
+        name (str): Clave de la configuración (parametros, indices, topes)
+        path (str): Ruta del endpoint
+        
+    Returns:
+        dict or None: Cuerpo JSON del endpoint, o None si no está disponible
+    """
+    with _config_lock:
+        entry = _config_cache.get(name)
+    
+    if entry and time.monotonic() - entry["fetched_at"] < CONFIG_CACHE_TTL:
+        return entry["data"]
+    
+    # Las sesiones que encuentran la entrada caducada a la vez comparten una sola revalidación
+    return _config_flight.do(name, _revalidate_config_endpoint, name, path, entry)
+
+
+def _revalidate_config_endpoint(name, path, entry):
+    """
+    Descargar o revalidar un endpoint de configuración y actualizar la caché
+    
+    Args:
+        name (str): Clave de la configuración
+        path (str): Ruta del endpoint
+        entry (dict or None): Entrada caducada de la caché
+        
+    Returns:
+        dict or None: Cuerpo JSON del endpoint
+    """
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    
+    try:
+        endpoint = f"config_{name}"
+        response = _hedged_get(
+            endpoint, f"{API_BASE_URL}{path}", headers=headers, timeout=latency.timeout_for(endpoint, 10)
+        )
+    except Exception:
+        if entry:
+            # Servir la copia caducada antes que dejar la página sin configuración
+            return entry["data"]
+        raise
+    
+    if response.status_code == 304 and entry:
+        with _config_lock:
+            entry["fetched_at"] = time.monotonic()
+        return entry["data"]
+    
+    if response.status_code == 200:
+        new_entry = {
+            "data": response.json(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "digest": hashlib.sha1(response.content).hexdigest(),
+            "fetched_at": time.monotonic()
+        }
+        with _config_lock:
+            _config_cache[name] = new_entry
+        return new_entry["data"]
+    
+    return entry["data"] if entry else None
+
+
+def get_configuration(force_refresh=False):
     """
     Obtener configuración de la API
     
+    Los tres endpoints se consultan en paralelo y se guardan en una caché
+    compartida por todas las sesiones durante CONFIG_CACHE_TTL segundos.
+    
+    Args:
+        force_refresh (bool): Revalidar con el backend aunque la caché esté vigente
+    
     Returns:
         tuple: (success: bool, configs: dict)
     """
+    if force_refresh:
+        with _config_lock:
+            for entry in _config_cache.values():
+                entry["fetched_at"] = float("-inf")
+    
     try:
-        configs = {}
-        
-        # Parámetros de cómputo
-        response = requests.get(f"{API_BASE_URL}/api/config/parametros", timeout=10)
-        if response.status_code == 200:
-            configs["parametros"] = response.json()
-        
-        # Índices de revalorización
-        response = requests.get(f"{API_BASE_URL}/api/config/indices", timeout=10)
-        if response.status_code == 200:
-            configs["indices"] = response.json()
+        futures = {
+            name: _config_executor.submit(_fetch_config_endpoint, name, path)
+            for name, path in _CONFIG_ENDPOINTS.items()
+        }
         
-        # Topes de cotización
-        response = requests.get(f"{API_BASE_URL}/api/config/topes", timeout=10)
-        if response.status_code == 200:
-            configs["topes"] = response.json()
+        configs = {}
+        for name, future in futures.items():
+            data = future.result()
+            if data is not None:
+                configs[name] = data
         
         return True, configs
     except Exception as e:
         return False, {"error": str(e)}
 
 
-@st.cache_data
+def get_config_version():
+    """
+    Obtener un identificador de la versión de configuración cacheada
+    
+    Returns:
+        str or None: Huella de los cuerpos de configuración, None si no hay caché
+    """
+    with _config_lock:
+        digests = [
+            f"{name}:{_config_cache[name]['digest']}"
+            for name in sorted(_config_cache)
+        ]
+    if not digests:
+        return None
+    return hashlib.sha1("|".join(digests).encode()).hexdigest()[:16]
+
+
 def check_api_health_cached():
-    """Versión cacheada de check_api_health para mejorar rendimiento"""
-    return check_api_health() 
\ No newline at end of file
+    """
+    Estado de la API según el último sondeo en segundo plano (no hace ninguna petición)
+    
+    Returns:
+        tuple: (is_healthy: bool or None, status: dict de health.get_health_status)
+    """
+    status = get_health_status()
+    return status["healthy"], status
@@ -0,0 +1,253 @@
+"""
+Módulo de exportación Arrow/Parquet
+Convierte bases_procesadas, estadisticas y comparativa_calculos en tablas Arrow tipadas y las empaqueta como Parquet
+"""
+
+import io
+import os
+import zipfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .bases_table import BasesTable
+from .local_engine import ordinal_to_mes_anyo
+
+# Compresión de los Parquet (zstd, snappy, gzip o none)
+PARQUET_COMPRESSION = os.environ.get("PARQUET_COMPRESSION", "zstd")
+
+# Tablas que se exportan y nombre de su fichero dentro del ZIP
+PARQUET_TABLES = ("bases_procesadas", "estadisticas", "comparativa_calculos")
+
+# Campos enteros de estadisticas y parametros; el resto son importes o divisores
+_RECUENTOS = ("total_bases", "bases_revalorizadas", "bases_no_revalorizadas")
+_ENTEROS = _RECUENTOS + ("bases_incluidas", "periodo_meses")
+
+# Ordinal del mes de enero de 1970 (origen de datetime64)
+_ORDINAL_1970 = 1970 * 12
+
+
+def _dictionary(values):
+    """Columna de texto codificada por diccionario"""
+    return pa.array(values, pa.string()).dictionary_encode()
+
+
+def _constant(value, rows):
+    """Columna de diccionario con el mismo valor en todas las filas (índices int32, como el resto)"""
+    return pa.DictionaryArray.from_arrays(pa.array(np.zeros(rows, dtype=np.int32)), pa.array([value], pa.string()))
+
+
+def bases_table(result, cliente=None):
+    """
+    Tabla Arrow de bases_procesadas
+
+    Columnas: ordinal (int32, año * 12 + mes - 1), mes (date32, día 1), base,
+    base_original e indice_revalorizacion (float64, nulo si no aplica), empresa,
+    regimen y periodo (diccionario) y pluriactividad (bool).
+
+    Args:
+        result (dict): Resultado de /api/process (bases como lista o BasesTable)
+        cliente (str): Valor de una columna "cliente" adicional (opcional)
+
+    Returns:
+        pyarrow.Table: Una fila por base
+    """
+    bases = result.get("bases_procesadas") or []
+    tabla = bases if isinstance(bases, BasesTable) else BasesTable.from_records(bases)
+    # to_arrow deja NaN como nulo, para que Parquet guarde los importes ausentes
+    arrow = tabla.to_arrow()
+
+    meses = (tabla.ordinal.astype(np.int64) - _ORDINAL_1970).astype("datetime64[M]").astype("datetime64[D]")
+    arrow = arrow.add_column(1, "mes", pa.array(meses, pa.date32()))
+    pluriactividad = np.zeros(len(tabla), dtype=bool)
+    for fila, extra in tabla.extras.items():
+        pluriactividad[fila] = "pluriactividad" in extra
+    arrow = arrow.append_column("pluriactividad", pa.array(pluriactividad))
+    if cliente is not None:
+        arrow = arrow.add_column(0, "cliente", _constant(cliente, len(tabla)))
+    return arrow
+
+
+def estadisticas_table(result, cliente=None):
+    """
+    Tabla Arrow de una fila con las estadísticas del cálculo elegido
+
+    Args:
+        result (dict): Resultado de /api/process
+        cliente (str): Valor de una columna "cliente" adicional (opcional)
+
+    Returns:
+        pyarrow.Table: Recuentos como int64 e importes como float64
+    """
+    stats = result.get("estadisticas", {})
+    columnas = {
+        "fecha_jubilacion": _dictionary([result.get("fecha_jubilacion")]),
+        "regimen_acceso": _dictionary([result.get("regimen_acceso")]),
+        "sexo": _dictionary([result.get("sexo")]),
+        "calculo_elegido": _dictionary([result.get("calculo_elegido")])
+    }
+    for campo, valor in stats.items():
+        columnas[campo] = pa.array([valor], pa.int64() if campo in _RECUENTOS else pa.float64())
+    tabla = pa.table(columnas)
+    if cliente is not None:
+        tabla = tabla.add_column(0, "cliente", _constant(cliente, 1))
+    return tabla
+
+
+def comparativa_table(result, cliente=None):
+    """
+    Tabla Arrow con una fila por cálculo de comparativa_calculos
+
+    Los parámetros y estadísticas anidados se aplanan en columnas tipadas.
+
+    Args:
+        result (dict): Resultado de /api/process
+        cliente (str): Valor de una columna "cliente" adicional (opcional)
+
+    Returns:
+        pyarrow.Table: calculo, elegido, parámetros (int64 y float64) y estadísticas
+    """
+    comparativa = result.get("comparativa_calculos", {})
+    elegido = f"calculo_{result.get('calculo_elegido')}"
+    filas = []
+    for nombre, calculo in comparativa.items():
+        fila = {"calculo": nombre, "elegido": nombre == elegido}
+        fila.update(calculo.get("parametros", {}))
+        fila.update(calculo.get("estadisticas", {}))
+        filas.append(fila)
+
+    campos = list(dict.fromkeys(campo for fila in filas for campo in fila))
+    columnas = {}
+    for campo in campos:
+        valores = [fila.get(campo) for fila in filas]
+        if campo == "calculo":
+            columnas[campo] = _dictionary(valores)
+        elif campo == "elegido":
+            columnas[campo] = pa.array(valores, pa.bool_())
+        else:
+            columnas[campo] = pa.array(valores, pa.int64() if campo in _ENTEROS else pa.float64())
+    tabla = pa.table(columnas)
+    if cliente is not None:
+        tabla = tabla.add_column(0, "cliente", _constant(cliente, len(filas)))
+    return tabla
+
+
+def result_tables(result, cliente=None):
+    """
+    Las tres tablas exportables de un resultado
+
+    Returns:
+        dict: Nombre de PARQUET_TABLES -> pyarrow.Table
+    """
+    return {
+        "bases_procesadas": bases_table(result, cliente),
+        "estadisticas": estadisticas_table(result, cliente),
+        "comparativa_calculos": comparativa_table(result, cliente)
+    }
+
+
+def parquet_bytes(table):
+    """
+    Serializar una tabla Arrow como Parquet
+
+    Args:
+        table (pyarrow.Table): Tabla a escribir
+
+    Returns:
+        bytes: Contenido del fichero Parquet
+    """
+    buffer = pa.BufferOutputStream()
+    pq.write_table(table, buffer, compression=PARQUET_COMPRESSION)
+    return buffer.getvalue().to_pybytes()
+
+
+def build_parquet_zip(tables):
+    """
+    Empaquetar tablas Arrow en un ZIP con un Parquet por tabla
+
+    Los Parquet ya van comprimidos, así que el ZIP se guarda sin compresión.
+
+    Args:
+        tables (dict): Nombre -> pyarrow.Table
+
+    Returns:
+        bytes: Contenido del archivo ZIP
+    """
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as zf:
+        for nombre, tabla in tables.items():
+            zf.writestr(f"{nombre}.parquet", parquet_bytes(tabla))
+    return zip_buffer.getvalue()
+
+
+def combine_tables(tables_by_client):
+    """
+    Unir las tablas de varios resultados en una tabla por tipo
+
+    Args:
+        tables_by_client (list): Diccionarios devueltos por result_tables con cliente
+
+    Returns:
+        dict: Nombre -> pyarrow.Table con las filas de todos los clientes
+    """
+    if not tables_by_client:
+        return {}
+    return {
+        nombre: pa.concat_tables([tablas[nombre] for tablas in tables_by_client], promote_options="default")
+        for nombre in PARQUET_TABLES
+    }
+
+
+def bases_display_table(result):
+    """
+    Tabla Arrow de bases preparada para st.dataframe
+
+    Las columnas numéricas y de categorías se comparten con bases_table; el mes
+    se formatea una vez por mes distinto y se guarda como diccionario.
+
+    Args:
+        result (dict): Resultado con bases_procesadas
+
+    Returns:
+        pyarrow.Table: Mes, Base, Base Original, Índice, Empresa, Régimen y Periodo
+    """
+    tabla = bases_table(result)
+    ordinales, codigos = np.unique(tabla["ordinal"].to_numpy(), return_inverse=True)
+    meses = pa.DictionaryArray.from_arrays(
+        pa.array(codigos.astype(np.int32)), pa.array([ordinal_to_mes_anyo(o) for o in ordinales.tolist()], pa.string())
+    )
+    return pa.table({
+        "Mes": meses,
+        "Base": tabla["base"],
+        "Base Original": tabla["base_original"],
+        "Índice": tabla["indice_revalorizacion"],
+        "Empresa": tabla["empresa"],
+        "Régimen": tabla["regimen"],
+        "Periodo": tabla["periodo"]
+    })
+
+
+if __name__ == "__main__":
+    import json
+
+    from .local_engine import TEMPLATE_PATH
+
+    with open(TEMPLATE_PATH, encoding="utf-8") as f:
+        plantilla = json.load(f)
+
+    # Un cliente con más de 128 empresas (códigos int16 en BasesTable) y otro pequeño
+    grande = {**plantilla, "bases_procesadas": [
+        {**base, "empresa": f"EMPRESA {i:03d}"} for i, base in enumerate(plantilla["bases_procesadas"])
+    ]}
+    pequenyo = {**plantilla, "bases_procesadas": plantilla["bases_procesadas"][:12]}
+    combinadas = combine_tables([result_tables(grande, "grande"), result_tables(pequenyo, "pequeño")])
+
+    bases = combinadas["bases_procesadas"]
+    assert bases.num_rows == len(grande["bases_procesadas"]) + 12, "Faltan filas al combinar"
+    assert bases.schema.field("empresa").type.index_type == pa.int32(), "Los índices del diccionario no son int32"
+    assert parquet_bytes(bases), "No se pudo escribir el Parquet combinado"
+    for nombre, tabla in combinadas.items():
+        print(f"{nombre}: {tabla.num_rows} filas")
+    print("✅ Se combinan clientes con distinto número de empresas")
+
@@ -0,0 +1,123 @@
+"""
+Módulo de artefactos de descarga memorizados
+Genera una sola vez por resultado el Excel, el JSON formateado y el Parquet que ofrecen los botones de descarga
+"""
+
+import hashlib
+import json
+import os
+
+from .lru_cache import LRUCache
+
+# Número máximo de artefactos (Excel, JSON, Parquet o tablas Arrow) guardados en memoria
+ARTIFACT_CACHE_ITEMS = int(os.environ.get("ARTIFACT_CACHE_ITEMS", "32"))
+
+_artifacts = LRUCache(ARTIFACT_CACHE_ITEMS)
+
+# Huellas por identidad de objeto: se guarda también el objeto para que su id no se reutilice
+_fingerprints = LRUCache(ARTIFACT_CACHE_ITEMS)
+
+
+def result_fingerprint(data):
+    """
+    Calcular la huella de un resultado
+
+    Un mismo objeto se serializa una única vez; en ejecuciones posteriores
+    la huella se obtiene por identidad.
+
+    Args:
+        data (dict): Resultado de la API o configuración
+
+    Returns:
+        str: Huella SHA-1 en hexadecimal
+    """
+    entry = _fingerprints.get(id(data))
+    if entry is not None and entry[0] is data:
+        return entry[1]
+
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    fingerprint = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+    _fingerprints.put(id(data), (data, fingerprint))
+    return fingerprint
+
+
+def get_excel_bytes(result, engine=None):
+    """
+    Obtener el Excel de un resultado, generándolo solo la primera vez
+
+    Args:
+        result (dict): Resultado del procesamiento completo
+        engine (str): Motor de generación (por defecto EXCEL_ENGINE)
+
+    Returns:
+        bytes or None: Contenido del archivo Excel
+    """
+    # openpyxl y xlsxwriter se cargan con el primer Excel, no al arrancar la app
+    from .excel_generator import generate_excel_from_process_result, EXCEL_ENGINE
+
+    engine = engine or EXCEL_ENGINE
+    key = ("xlsx", engine, result_fingerprint(result))
+    excel_data = _artifacts.get(key)
+    if excel_data is None:
+        excel_data = generate_excel_from_process_result(result, engine=engine)
+        if excel_data:
+            _artifacts.put(key, excel_data)
+    return excel_data
+
+
+def get_json_text(data):
+    """
+    Obtener el JSON formateado de un resultado, serializándolo solo la primera vez
+
+    Args:
+        data (dict): Resultado o configuración a descargar
+
+    Returns:
+        str: JSON con sangría de 2 espacios
+    """
+    key = ("json", result_fingerprint(data))
+    json_data = _artifacts.get(key)
+    if json_data is None:
+        json_data = json.dumps(data, indent=2, ensure_ascii=False)
+        _artifacts.put(key, json_data)
+    return json_data
+
+
+def get_parquet_zip(result):
+    """
+    Obtener el ZIP de Parquet de un resultado, generándolo solo la primera vez
+
+    Args:
+        result (dict): Resultado del procesamiento completo
+
+    Returns:
+        bytes: ZIP con bases_procesadas, estadisticas y comparativa_calculos en Parquet
+    """
+    from .arrow_export import result_tables, build_parquet_zip
+
+    key = ("parquet", result_fingerprint(result))
+    zip_data = _artifacts.get(key)
+    if zip_data is None:
+        zip_data = build_parquet_zip(result_tables(result))
+        _artifacts.put(key, zip_data)
+    return zip_data
+
+
+def get_bases_arrow(result):
+    """
+    Obtener la tabla Arrow de bases que muestra st.dataframe, construyéndola solo la primera vez
+
+    Args:
+        result (dict): Resultado con bases_procesadas
+
+    Returns:
+        pyarrow.Table: Tabla de arrow_export.bases_display_table
+    """
+    from .arrow_export import bases_display_table
+
+    key = ("arrow", result_fingerprint(result))
+    table = _artifacts.get(key)
+    if table is None:
+        table = bases_display_table(result)
+        _artifacts.put(key, table)
+    return table
@@ -0,0 +1,436 @@
+"""
+Módulo de representación columnar de bases_procesadas
+Guarda las bases como arrays NumPy (struct-of-arrays) con categorías codificadas por diccionario
+"""
+
+import json
+import sys
+
+import numpy as np
+
+from .local_engine import mes_anyo_mask, mes_anyo_to_ordinal, ordinal_to_mes_anyo, TEMPLATE_PATH
+
+# Campos con representación columnar; el resto se guarda aparte por fila
+_COLUMNAS = ("mes_anyo", "base", "empresa", "regimen", "periodo", "base_original", "indice_revalorizacion")
+_COLUMNAS_SET = frozenset(_COLUMNAS)
+_CATEGORIAS = ("empresa", "regimen", "periodo")
+
+# Bits de flags por fila: tipo entero en JSON y valor null explícito
+_BASE_INT = 1
+_ORIGINAL_INT = 2
+_INDICE_INT = 4
+_BASE_NULL = 8
+_ORIGINAL_NULL = 16
+_INDICE_NULL = 32
+
+# Columnas numéricas: (clave, bit de entero, bit de null)
+_NUMERICAS = (
+    ("base", _BASE_INT, _BASE_NULL),
+    ("base_original", _ORIGINAL_INT, _ORIGINAL_NULL),
+    ("indice_revalorizacion", _INDICE_INT, _INDICE_NULL)
+)
+
+
+def _code_dtype(categorias):
+    """Entero con signo más pequeño que admite un código por categoría (int8, int16 o int32)"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if categorias <= np.iinfo(dtype).max + 1:
+            return dtype
+    raise ValueError(f"Demasiadas categorías para codificar: {categorias}")
+
+
+def _encode(valores):
+    """
+    Codificar una lista de cadenas como (códigos, categorías)
+
+    Los valores que no son cadena (None, ausentes u otros tipos) reciben el
+    código -1; quien llama guarda aparte los que no son None.
+    """
+    # Factorizar con un diccionario y ordenar después las categorías (como np.unique, pero sin ordenar cada fila)
+    posiciones = {}
+    codigos = np.fromiter(
+        (posiciones.setdefault(v, len(posiciones)) if type(v) is str else -1 for v in valores),
+        dtype=np.int64, count=len(valores)
+    )
+    categorias = sorted(posiciones)
+    orden = np.empty(len(categorias) + 1, dtype=np.int64)
+    orden[[posiciones[c] for c in categorias]] = np.arange(len(categorias))
+    # La última posición recoge el código -1
+    orden[-1] = -1
+    return orden[codigos].astype(_code_dtype(len(categorias))), categorias
+
+
+class BasesTable:
+    """
+    Bases de cotización en formato columnar
+
+    La conversión desde y hacia la lista de la API es exacta: se conservan el
+    orden de las claves de cada fila, las claves ausentes y los valores null.
+
+    Atributos:
+        ordinal (np.ndarray[int32]): Mes como año * 12 + mes - 1
+        base, base_original, indice (np.ndarray[float64]): Importes e índices (NaN si no aplica)
+        empresa_codes, regimen_codes, periodo_codes: Códigos de categorías (-1 si no hay valor)
+        empresas, regimenes, periodos (list): Diccionarios de categorías
+        flags (np.ndarray[uint8]): Tipos enteros y valores null de las columnas numéricas
+        shape_codes (np.ndarray): Orden de claves de cada fila como índice en shapes
+        shapes (list): Tuplas de claves distintas, en el orden del JSON
+        extras (dict): Fila -> claves no columnares (p. ej. pluriactividad) y valores que
+            no caben en su columna (fechas no válidas, tipos inesperados)
+    """
+
+    __slots__ = (
+        "ordinal", "base", "base_original", "indice",
+        "empresa_codes", "empresas", "regimen_codes", "regimenes", "periodo_codes", "periodos",
+        "flags", "shape_codes", "shapes", "extras"
+    )
+
+    def __init__(self, ordinal, base, base_original, indice,
+                 empresa_codes, empresas, regimen_codes, regimenes, periodo_codes, periodos,
+                 flags, shape_codes, shapes, extras):
+        self.ordinal = ordinal
+        self.base = base
+        self.base_original = base_original
+        self.indice = indice
+        self.empresa_codes = empresa_codes
+        self.empresas = empresas
+        self.regimen_codes = regimen_codes
+        self.regimenes = regimenes
+        self.periodo_codes = periodo_codes
+        self.periodos = periodos
+        self.flags = flags
+        self.shape_codes = shape_codes
+        self.shapes = shapes
+        self.extras = extras
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Construir la tabla a partir de la lista de bases de la API
+
+        Args:
+            records (list): bases_procesadas
+
+        Returns:
+            BasesTable: Tabla columnar
+        """
+        n = len(records)
+        numericas = {campo: np.full(n, np.nan, dtype=np.float64) for campo, _, _ in _NUMERICAS}
+        flags = np.zeros(n, dtype=np.uint8)
+        formas = {}
+        shape_codes = []
+        extras = {}
+
+        for i, record in enumerate(records):
+            forma = tuple(record)
+            shape_codes.append(formas.setdefault(forma, len(formas)))
+            flag = 0
+            extra = None
+            for campo, bit_int, bit_null in _NUMERICAS:
+                valor = record.get(campo)
+                if type(valor) is float:
+                    numericas[campo][i] = valor
+                elif type(valor) is int:
+                    numericas[campo][i] = valor
+                    flag |= bit_int
+                elif valor is None:
+                    # None explícito frente a clave ausente (la ausencia la recoge la forma)
+                    if campo in record:
+                        flag |= bit_null
+                else:
+                    extra = extra or {}
+                    extra[campo] = valor
+            flags[i] = flag
+            if not _COLUMNAS_SET.issuperset(forma):
+                extra = extra or {}
+                extra.update((k, v) for k, v in record.items() if k not in _COLUMNAS_SET)
+            if extra:
+                extras[i] = extra
+
+        categorias = {}
+        for campo in _CATEGORIAS:
+            valores = [r.get(campo) for r in records]
+            codigos, nombres = _encode(valores)
+            categorias[campo] = (codigos, nombres)
+            for i in np.flatnonzero(codigos < 0).tolist():
+                if valores[i] is not None:
+                    extras.setdefault(i, {})[campo] = valores[i]
+
+        # Las fechas ausentes o no válidas se guardan aparte con ordinal 0
+        fechas = [r.get("mes_anyo") for r in records]
+        validas = mes_anyo_mask(fechas)
+        if validas.all():
+            ordinal = mes_anyo_to_ordinal(fechas) if n else np.empty(0, dtype=np.int32)
+        else:
+            ordinal = np.zeros(n, dtype=np.int32)
+            for i in np.flatnonzero(~validas).tolist():
+                if "mes_anyo" in records[i]:
+                    extras.setdefault(i, {})["mes_anyo"] = fechas[i]
+            if validas.any():
+                ordinal[validas] = mes_anyo_to_ordinal([f for f, valida in zip(fechas, validas.tolist()) if valida])
+
+        return cls(
+            ordinal, numericas["base"], numericas["base_original"], numericas["indice_revalorizacion"],
+            *categorias["empresa"], *categorias["regimen"], *categorias["periodo"],
+            flags, np.array(shape_codes, dtype=_code_dtype(len(formas))), list(formas), extras
+        )
+
+    def __len__(self):
+        return len(self.ordinal)
+
+    def mask_periodo(self, periodo):
+        """Máscara booleana de las filas de un periodo ("revalorizado" o "no_revalorizado")"""
+        if periodo not in self.periodos:
+            return np.zeros(len(self), dtype=bool)
+        return self.periodo_codes == self.periodos.index(periodo)
+
+    def take(self, mask):
+        """
+        Seleccionar filas con una máscara o array de posiciones
+
+        Las categorías se comparten con la tabla original (no se copian).
+
+        Returns:
+            BasesTable: Subconjunto de filas
+        """
+        posiciones = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+        extras = {}
+        if self.extras:
+            for nueva, antigua in enumerate(posiciones.tolist()):
+                if antigua in self.extras:
+                    extras[nueva] = self.extras[antigua]
+        return BasesTable(
+            self.ordinal[posiciones], self.base[posiciones], self.base_original[posiciones], self.indice[posiciones],
+            self.empresa_codes[posiciones], self.empresas,
+            self.regimen_codes[posiciones], self.regimenes,
+            self.periodo_codes[posiciones], self.periodos,
+            self.flags[posiciones], self.shape_codes[posiciones], self.shapes, extras
+        )
+
+    def filter_periodo(self, periodo):
+        """Filas de un periodo como nueva tabla"""
+        return self.take(self.mask_periodo(periodo))
+
+    def mes_anyo(self):
+        """Fechas MM/YYYY de cada fila"""
+        return [ordinal_to_mes_anyo(o) for o in self.ordinal.tolist()]
+
+    def empresa(self):
+        """Empresa de cada fila (None si no tiene)"""
+        return [self.empresas[c] if c >= 0 else None for c in self.empresa_codes.tolist()]
+
+    def regimen(self):
+        """Régimen de cada fila (None si no tiene)"""
+        return [self.regimenes[c] if c >= 0 else None for c in self.regimen_codes.tolist()]
+
+    def values(self, column, default=None):
+        """
+        Valores de una columna numérica con el tipo original del JSON
+
+        Args:
+            column (str): "base", "base_original" o "indice_revalorizacion"
+            default: Valor para las filas sin dato
+
+        Returns:
+            list: Un valor por fila
+        """
+        array, bit = {
+            "base": (self.base, _BASE_INT),
+            "base_original": (self.base_original, _ORIGINAL_INT),
+            "indice_revalorizacion": (self.indice, _INDICE_INT)
+        }[column]
+        valores = array.tolist()
+        for i in np.flatnonzero(self.flags & bit).tolist():
+            valores[i] = int(valores[i])
+        for i in np.flatnonzero(np.isnan(array)).tolist():
+            valores[i] = default
+        return valores
+
+    def _json_column(self, array, bit_int, bit_null):
+        """Valores de una columna numérica tal como estaban en el JSON (None para los null)"""
+        valores = array.tolist()
+        for i in np.flatnonzero(self.flags & bit_int).tolist():
+            valores[i] = int(valores[i])
+        for i in np.flatnonzero(self.flags & bit_null).tolist():
+            valores[i] = None
+        return valores
+
+    def to_records(self):
+        """
+        Reconstruir la lista de bases con el formato exacto de la API
+
+        Returns:
+            list: bases_procesadas
+        """
+        columnas = {
+            "mes_anyo": self.mes_anyo(),
+            "base": self._json_column(self.base, _BASE_INT, _BASE_NULL),
+            "base_original": self._json_column(self.base_original, _ORIGINAL_INT, _ORIGINAL_NULL),
+            "indice_revalorizacion": self._json_column(self.indice, _INDICE_INT, _INDICE_NULL),
+            "empresa": self.empresa(),
+            "regimen": self.regimen(),
+            "periodo": [self.periodos[c] if c >= 0 else None for c in self.periodo_codes.tolist()]
+        }
+
+        # Cada fila se reconstruye con sus claves en el orden original; extras tiene prioridad
+        records = []
+        for i, forma in enumerate(self.shape_codes.tolist()):
+            extra = self.extras.get(i)
+            if extra is None:
+                records.append({k: columnas[k][i] for k in self.shapes[forma]})
+            else:
+                records.append({k: extra[k] if k in extra else columnas[k][i] for k in self.shapes[forma]})
+        return records
+
+    def to_pandas(self):
+        """
+        Convertir a DataFrame sin copiar los arrays numéricos
+
+        Returns:
+            pd.DataFrame: Columnas numéricas y categóricas
+        """
+        import pandas as pd
+
+        return pd.DataFrame({
+            "ordinal": self.ordinal,
+            "base": self.base,
+            "base_original": self.base_original,
+            "indice_revalorizacion": self.indice,
+            "empresa": pd.Categorical.from_codes(self.empresa_codes, self.empresas),
+            "regimen": pd.Categorical.from_codes(self.regimen_codes, self.regimenes),
+            "periodo": pd.Categorical.from_codes(self.periodo_codes, self.periodos)
+        }, copy=False)
+
+    def to_arrow(self):
+        """
+        Convertir a tabla Arrow reutilizando los buffers NumPy
+
+        Returns:
+            pyarrow.Table: Columnas tipadas con categorías como diccionario (NaN y códigos -1 como null)
+        """
+        import pyarrow as pa
+
+        def categorica(codigos, categorias):
+            # Índices siempre int32 (como dictionary_encode), para que las tablas de varios
+            # resultados se puedan concatenar aunque sus códigos tengan distinto ancho;
+            # los códigos -1 (sin valor) quedan como null
+            return pa.DictionaryArray.from_arrays(
+                pa.array(codigos.astype(np.int32), mask=codigos < 0), pa.array(categorias, pa.string())
+            )
+
+        return pa.table({
+            "ordinal": pa.array(self.ordinal),
+            "base": pa.array(self.base, mask=np.isnan(self.base)),
+            "base_original": pa.array(self.base_original, mask=np.isnan(self.base_original)),
+            "indice_revalorizacion": pa.array(self.indice, mask=np.isnan(self.indice)),
+            "empresa": categorica(self.empresa_codes, self.empresas),
+            "regimen": categorica(self.regimen_codes, self.regimenes),
+            "periodo": categorica(self.periodo_codes, self.periodos)
+        })
+
+    @property
+    def nbytes(self):
+        """Memoria ocupada por la tabla (arrays, categorías y extras)"""
+        arrays = sum(getattr(self, name).nbytes for name in (
+            "ordinal", "base", "base_original", "indice",
+            "empresa_codes", "regimen_codes", "periodo_codes", "flags", "shape_codes"
+        ))
+        categorias = sum(deep_sizeof(c) for c in (self.empresas, self.regimenes, self.periodos, self.shapes))
+        return arrays + categorias + deep_sizeof(self.extras)
+
+
+def deep_sizeof(obj, _seen=None):
+    """
+    Tamaño en memoria de un objeto Python incluyendo su contenido
+
+    Args:
+        obj: Objeto a medir
+
+    Returns:
+        int: Bytes ocupados
+    """
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def compact_result(result):
+    """
+    Sustituir bases_procesadas por su tabla columnar
+
+    Args:
+        result (dict): Respuesta de /api/process
+
+    Returns:
+        dict: Resultado con "bases_procesadas" como BasesTable
+    """
+    bases = result.get("bases_procesadas")
+    if not isinstance(bases, list):
+        return result
+    return {**result, "bases_procesadas": BasesTable.from_records(bases)}
+
+
+def expand_result(result):
+    """Reconstruir un resultado compactado con el formato de la API"""
+    bases = result.get("bases_procesadas")
+    if not isinstance(bases, BasesTable):
+        return result
+    return {**result, "bases_procesadas": bases.to_records()}
+
+
+def memory_report(records):
+    """
+    Medir la memoria de las bases como lista de diccionarios y como tabla columnar
+
+    Args:
+        records (list): bases_procesadas
+
+    Returns:
+        dict: Bytes en cada formato y factor de reducción
+    """
+    table = BasesTable.from_records(records)
+    dicts = deep_sizeof(records)
+    return {
+        "rows": len(records),
+        "dict_bytes": dicts,
+        "table_bytes": table.nbytes,
+        "reduction": dicts / table.nbytes if table.nbytes else 0.0
+    }
+
+
+if __name__ == "__main__":
+    with open(TEMPLATE_PATH, encoding="utf-8") as f:
+        plantilla = json.load(f)
+
+    bases = plantilla["bases_procesadas"]
+    tabla = BasesTable.from_records(bases)
+    assert tabla.to_records() == bases, "La conversión de ida y vuelta no es exacta"
+    assert json.dumps(tabla.to_records()) == json.dumps(bases), "El JSON reconstruido no es idéntico"
+
+    # Casos límite: null, claves ausentes, NaN, fechas no válidas, tipos inesperados y otro orden de claves
+    raros = [
+        {"mes_anyo": "01/2020", "base": None, "empresa": None, "regimen": "GENERAL", "periodo": "revalorizado",
+         "base_original": None, "indice_revalorizacion": float("nan")},
+        {"mes_anyo": "02/2020", "empresa": "ACME", "periodo": None},
+        {"base": float("nan"), "mes_anyo": "13/2020", "regimen": 7, "empresa": "ACME", "pluriactividad": True},
+        {"periodo": "no_revalorizado", "base": 1200, "mes_anyo": None, "base_original": 1000.5, "indice_revalorizacion": 1},
+        {"mes_anyo": 202003, "base": "1500", "empresa": ""}
+    ]
+    reconstruidas = BasesTable.from_records(raros).to_records()
+    assert [list(r) for r in reconstruidas] == [list(r) for r in raros], "No se conserva el orden de las claves"
+    assert json.dumps(reconstruidas) == json.dumps(raros), "Los casos límite no se reconstruyen igual"
+    subconjunto = BasesTable.from_records(raros).take([4, 0]).to_records()
+    assert json.dumps(subconjunto) == json.dumps([raros[4], raros[0]]), "take no conserva los casos límite"
+
+    informe = memory_report(bases)
+    print(f"Filas: {informe['rows']}")
+    print(f"Lista de diccionarios: {informe['dict_bytes'] / 1024:.1f} KB")
+    print(f"Tabla columnar: {informe['table_bytes'] / 1024:.1f} KB")
+    print(f"Reducción: {informe['reduction']:.1f}x")
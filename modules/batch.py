@@ -0,0 +1,147 @@
+"""
+Módulo de procesamiento por lotes
+Ejecuta varias llamadas al backend en paralelo con un límite de concurrencia
+"""
+
+import csv
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .api_client import API_POOL_SIZE
+from .artifacts import get_excel_bytes
+from .result_cache import process_complete_cached
+
+# Número de llamadas simultáneas por defecto y máximo permitido en la interfaz; el máximo
+# no pasa de API_POOL_SIZE para que cada llamada reutilice una conexión keep-alive del pool
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", "4"))
+BATCH_WORKERS_LIMIT = min(int(os.environ.get("BATCH_WORKERS_LIMIT", "16")), API_POOL_SIZE)
+
+
+def run_parallel(tasks, worker, max_workers):
+    """
+    Ejecutar tareas en paralelo y devolverlas según van terminando
+
+    Las excepciones del worker se capturan y se devuelven como fallo,
+    de modo que una tarea errónea no interrumpe el resto del lote.
+
+    Args:
+        tasks (list): Tareas a ejecutar
+        worker (callable): Función que recibe una tarea y devuelve (success, result)
+        max_workers (int): Número máximo de llamadas simultáneas (acotado a BATCH_WORKERS_LIMIT)
+
+    Yields:
+        tuple: (task, success: bool, result: dict)
+    """
+    workers = max(1, min(max_workers, BATCH_WORKERS_LIMIT))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+        futures = {executor.submit(worker, task): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                success, result = future.result()
+            except Exception as e:
+                success, result = False, {"error": str(e)}
+            yield task, success, result
+
+
+def make_named_file(name, file_bytes):
+    """
+    Crear un archivo en memoria con nombre, reutilizable para cada llamada
+
+    Args:
+        name (str): Nombre del archivo PDF
+        file_bytes (bytes): Contenido del PDF
+
+    Returns:
+        io.BytesIO: Archivo en memoria con atributo name
+    """
+    buffer = io.BytesIO(file_bytes)
+    buffer.name = name
+    return buffer
+
+
+def process_batch_item(item):
+    """
+    Procesar un PDF del lote
+
+    Args:
+        item (dict): name, bytes, fecha_jubilacion, regimen_acceso y sexo
+
+    Returns:
+        tuple: (success: bool, result: dict)
+    """
+    return process_complete_cached(
+        make_named_file(item["name"], item["bytes"]),
+        item["fecha_jubilacion"],
+        item["regimen_acceso"],
+        item["sexo"]
+    )
+
+
+def _safe_stem(filename):
+    """Nombre de archivo sin extensión y sin caracteres problemáticos"""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return re.sub(r"[^\w\-]+", "_", stem).strip("_") or "cliente"
+
+
+def build_batch_zip(outcomes):
+    """
+    Empaquetar los resultados del lote en un ZIP con un Excel por cliente
+
+    Incluye además un resumen.csv con el estado de cada archivo y, en parquet/,
+    las bases, estadísticas y comparativas de todos los clientes en un Parquet
+    por tabla (columna "cliente" con el nombre de su Excel).
+
+    Args:
+        outcomes (list): Diccionarios con item, success y result
+
+    Returns:
+        bytes: Contenido del archivo ZIP
+    """
+    # pyarrow solo se carga al empaquetar el lote, no al abrir la página
+    from .arrow_export import result_tables, combine_tables, parquet_bytes
+
+    zip_buffer = io.BytesIO()
+    summary = io.StringIO()
+    writer = csv.writer(summary)
+    writer.writerow(["archivo", "fecha_jubilacion", "regimen_acceso", "sexo", "estado", "base_reguladora", "error"])
+
+    used_names = set()
+    tablas = []
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for outcome in outcomes:
+            item = outcome["item"]
+            result = outcome["result"]
+            base_reguladora = ""
+            error = ""
+
+            if outcome["success"]:
+                excel_data = get_excel_bytes(result)
+                if excel_data:
+                    stem = _safe_stem(item["name"])
+                    filename = f"{stem}_{item['fecha_jubilacion'].replace('/', '-')}.xlsx"
+                    suffix = 2
+                    while filename in used_names:
+                        filename = f"{stem}_{item['fecha_jubilacion'].replace('/', '-')}_{suffix}.xlsx"
+                        suffix += 1
+                    used_names.add(filename)
+                    # El xlsx ya está comprimido: se guarda sin volver a comprimir
+                    zf.writestr(filename, excel_data, compress_type=zipfile.ZIP_STORED)
+                    tablas.append(result_tables(result, cliente=os.path.splitext(filename)[0]))
+                base_reguladora = result.get("estadisticas", {}).get("base_reguladora", "")
+            else:
+                error = result.get("error", result.get("detail", "Error desconocido"))
+
+            writer.writerow([
+                item["name"], item["fecha_jubilacion"], item["regimen_acceso"], item["sexo"],
+                "OK" if outcome["success"] else "ERROR", base_reguladora, error
+            ])
+
+        zf.writestr("resumen.csv", summary.getvalue().encode("utf-8-sig"))
+        for nombre, tabla in combine_tables(tablas).items():
+            zf.writestr(f"parquet/{nombre}.parquet", parquet_bytes(tabla), compress_type=zipfile.ZIP_STORED)
+
+    return zip_buffer.getvalue()
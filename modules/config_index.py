@@ -0,0 +1,290 @@
+"""
+Módulo de índice de configuración
+Convierte índices, topes y parámetros en arrays densos por ordinal de mes o por año, una vez por versión
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .artifacts import result_fingerprint
+from .local_engine import is_mes_anyo, mes_anyo_to_ordinal, ordinal_to_mes_anyo
+from .lru_cache import LRUCache
+
+_ANYO_RE = re.compile(r"^\d{4}$")
+
+# Secciones de configuración: clave en get_configuration() y clave interna del cuerpo
+_SECTIONS = {
+    "parametros": "parametros_computo_anual",
+    "indices": "indices_revalorizacion",
+    "topes": "topes_cotizacion"
+}
+
+_indexes = LRUCache(8)
+
+
+def config_section(configs, name):
+    """
+    Obtener una sección de configuración tolerando ambos formatos de respuesta
+
+    Args:
+        configs (dict): Resultado de get_configuration()
+        name (str): parametros, indices o topes
+
+    Returns:
+        dict or None: Año o "MM/YYYY" -> datos
+    """
+    data = (configs.get(name) or {}).get("data")
+    if not data or not isinstance(data, dict):
+        return None
+    section = data.get(_SECTIONS[name], data)
+    return section if isinstance(section, dict) else None
+
+
+def _numero(valor):
+    """Convertir un valor de configuración en float (NaN si no es numérico)"""
+    return float(valor) if isinstance(valor, (int, float)) and not isinstance(valor, bool) else np.nan
+
+
+class _YearTable:
+    """Campos numéricos por año en arrays densos indexados por año - primer_año"""
+
+    def __init__(self, section, fields):
+        anyos = sorted(int(a) for a, d in (section or {}).items() if _ANYO_RE.match(str(a)) and isinstance(d, dict))
+        self.first = anyos[0] if anyos else 0
+        size = anyos[-1] - self.first + 1 if anyos else 0
+        self.present = np.zeros(size, dtype=bool)
+        self.columns = {name: np.full(size, np.nan, dtype=np.float64) for name in fields}
+        for anyo in anyos:
+            datos = section[str(anyo)]
+            self.present[anyo - self.first] = True
+            for name, claves in fields.items():
+                for clave in claves:
+                    if clave in datos:
+                        self.columns[name][anyo - self.first] = _numero(datos[clave])
+                        break
+        self.years = np.array(anyos, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.years)
+
+    def row(self, anyo):
+        """Datos de un año en O(1) (None si no existe)"""
+        posicion = int(anyo) - self.first
+        if not 0 <= posicion < len(self.present) or not self.present[posicion]:
+            return None
+        return {name: values[posicion] for name, values in self.columns.items()}
+
+    def lookup(self, anyos, column, default=np.nan):
+        """Valores de una columna para un array de años"""
+        posicion = np.asarray(anyos, dtype=np.int64) - self.first
+        dentro = (posicion >= 0) & (posicion < len(self.present))
+        valores = np.full(len(posicion), default, dtype=np.float64)
+        valores[dentro] = self.columns[column][posicion[dentro]]
+        return np.where(np.isnan(valores), default, valores)
+
+
+class ConfigIndex:
+    """
+    Configuración del backend en arrays densos
+
+    Atributos:
+        indices_inicio (int): Ordinal de mes del primer índice
+        indices (np.ndarray[float64]): Índice por ordinal - indices_inicio (NaN si falta)
+        indices_fechas (np.ndarray[int32]): Ordinales con índice, en orden cronológico
+        indices_stats (dict): total, mean, max, min, desde, hasta, latest, latest_value
+        topes (_YearTable): base_minima / base_maxima por año
+        parametros (_YearTable): bases_incluidas / periodo_meses / divisor por año
+    """
+
+    def __init__(self, configs):
+        self._frames = {}
+        indices = config_section(configs, "indices") or {}
+        fechas = [f for f, v in indices.items() if is_mes_anyo(f) and not np.isnan(_numero(v))]
+        if fechas:
+            ordinales = mes_anyo_to_ordinal(fechas)
+            self.indices_inicio = int(ordinales.min())
+            self.indices = np.full(int(ordinales.max()) - self.indices_inicio + 1, np.nan, dtype=np.float64)
+            self.indices[ordinales - self.indices_inicio] = [indices[f] for f in fechas]
+        else:
+            self.indices_inicio = 0
+            self.indices = np.empty(0, dtype=np.float64)
+        self.indices_fechas = (np.flatnonzero(~np.isnan(self.indices)) + self.indices_inicio).astype(np.int32)
+        self.indices_stats = self._stats()
+
+        self.topes = _YearTable(config_section(configs, "topes"), {
+            "base_minima": ("base_minima_mensual",),
+            "base_maxima": ("base_maxima_mensual",)
+        })
+        self.parametros = _YearTable(config_section(configs, "parametros"), {
+            "bases_incluidas": ("bases_incluidas", "numero_bases"),
+            "periodo_meses": ("periodo_meses",),
+            "divisor": ("divisor_base_reguladora", "divisor")
+        })
+
+    def _stats(self):
+        """Estadísticas precalculadas de los índices"""
+        if not len(self.indices_fechas):
+            return {"total": 0}
+        valores = self.indices[self.indices_fechas - self.indices_inicio]
+        return {
+            "total": len(valores),
+            "mean": float(valores.mean()),
+            "max": float(valores.max()),
+            "min": float(valores.min()),
+            "desde": ordinal_to_mes_anyo(self.indices_fechas[0]),
+            "hasta": ordinal_to_mes_anyo(self.indices_fechas[-1]),
+            "latest": ordinal_to_mes_anyo(self.indices_fechas[-1]),
+            "latest_value": float(valores[-1])
+        }
+
+    def indice(self, mes):
+        """
+        Índice de revalorización de un mes en O(1)
+
+        Args:
+            mes (str or int): Fecha MM/YYYY u ordinal de mes
+
+        Returns:
+            float or None: Índice, None si no existe
+        """
+        ordinal = int(mes_anyo_to_ordinal([mes])[0]) if isinstance(mes, str) else int(mes)
+        posicion = ordinal - self.indices_inicio
+        if not 0 <= posicion < len(self.indices) or np.isnan(self.indices[posicion]):
+            return None
+        return float(self.indices[posicion])
+
+    def indices_lookup(self, ordinales, default=1.0):
+        """
+        Índices de un array de ordinales de mes
+
+        Args:
+            ordinales (np.ndarray): Ordinales de mes
+            default (float): Valor para los meses sin índice
+
+        Returns:
+            np.ndarray: Índice por ordinal
+        """
+        posicion = np.asarray(ordinales, dtype=np.int64) - self.indices_inicio
+        dentro = (posicion >= 0) & (posicion < len(self.indices))
+        valores = np.full(len(posicion), default, dtype=np.float64)
+        valores[dentro] = self.indices[posicion[dentro]]
+        return np.where(np.isnan(valores), default, valores)
+
+    def indices_range(self, desde, hasta):
+        """
+        Índices entre dos meses (ambos incluidos)
+
+        Args:
+            desde (str or int): Primer mes (MM/YYYY u ordinal)
+            hasta (str or int): Último mes (MM/YYYY u ordinal)
+
+        Returns:
+            tuple: (ordinales: np.ndarray, indices: np.ndarray) de los meses con índice
+        """
+        inicio, fin = (int(mes_anyo_to_ordinal([m])[0]) if isinstance(m, str) else int(m) for m in (desde, hasta))
+        a = max(inicio - self.indices_inicio, 0)
+        b = min(fin - self.indices_inicio + 1, len(self.indices))
+        if a >= b:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        tramo = self.indices[a:b]
+        validos = ~np.isnan(tramo)
+        return (np.flatnonzero(validos) + a + self.indices_inicio).astype(np.int32), tramo[validos]
+
+    def tope(self, anyo):
+        """Topes de un año en O(1): {"base_minima", "base_maxima"} o None"""
+        return self.topes.row(anyo)
+
+    def topes_maximos(self, anyos):
+        """Base máxima mensual de cada año (inf si no hay tope)"""
+        return self.topes.lookup(anyos, "base_maxima", np.inf)
+
+    def parametros_anyo(self, anyo):
+        """Parámetros de cómputo de un año en O(1) o None"""
+        return self.parametros.row(anyo)
+
+    def _frame(self, name, builder):
+        """DataFrame construido una sola vez por índice (es decir, por versión de configuración)"""
+        if name not in self._frames:
+            self._frames[name] = builder()
+        return self._frames[name]
+
+    def parametros_frame(self):
+        """
+        Tabla de parámetros de cómputo, del año más reciente al más antiguo
+
+        Returns:
+            pd.DataFrame: Año, Bases Incluidas, Período (meses), Divisor Base Reguladora
+        """
+        def build():
+            posicion = (self.parametros.years - self.parametros.first)[::-1]
+            columnas = self.parametros.columns
+            return pd.DataFrame({
+                "Año": self.parametros.years[::-1],
+                "Bases Incluidas": pd.array(columnas["bases_incluidas"][posicion], dtype="Float64").astype("Int64"),
+                "Período (meses)": pd.array(columnas["periodo_meses"][posicion], dtype="Float64").astype("Int64"),
+                "Divisor Base Reguladora": columnas["divisor"][posicion]
+            })
+        return self._frame("parametros", build)
+
+    def indices_frame(self):
+        """
+        Tabla de índices de revalorización, del más reciente al más antiguo
+
+        Returns:
+            pd.DataFrame: Fecha (MM/YYYY), Índice de Revalorización
+        """
+        def build():
+            ordinales = pd.Series(self.indices_fechas[::-1])
+            fechas = (ordinales % 12 + 1).astype(str).str.zfill(2) + "/" + (ordinales // 12).astype(str)
+            return pd.DataFrame({
+                "Fecha (MM/YYYY)": fechas,
+                "Índice de Revalorización": self.indices[self.indices_fechas[::-1] - self.indices_inicio]
+            })
+        return self._frame("indices", build)
+
+    def topes_frame(self):
+        """
+        Tabla de topes de cotización, del año más reciente al más antiguo
+
+        Returns:
+            pd.DataFrame: Año, Base Mínima Mensual, Base Máxima Mensual, Diferencia
+        """
+        def build():
+            posicion = (self.topes.years - self.topes.first)[::-1]
+            minima = np.nan_to_num(self.topes.columns["base_minima"][posicion])
+            maxima = np.nan_to_num(self.topes.columns["base_maxima"][posicion])
+            return pd.DataFrame({
+                "Año": self.topes.years[::-1],
+                "Base Mínima Mensual": minima,
+                "Base Máxima Mensual": maxima,
+                "Diferencia": maxima - minima
+            })
+        return self._frame("topes", build)
+
+
+def _version(configs):
+    """Huella de la configuración por secciones (memorizada por identidad)"""
+    return tuple(
+        result_fingerprint(configs[name]) if isinstance(configs.get(name), dict) else None
+        for name in _SECTIONS
+    )
+
+
+def get_config_index(configs):
+    """
+    Obtener el índice de una configuración, construyéndolo una vez por versión
+
+    Args:
+        configs (dict): Resultado de get_configuration()
+
+    Returns:
+        ConfigIndex: Índice de la configuración
+    """
+    key = _version(configs)
+    index = _indexes.get(key)
+    if index is None:
+        index = ConfigIndex(configs)
+        _indexes.put(key, index)
+    return index
@@ -4,22 +4,98 @@ Contiene toda la lógica de creación del archivo Excel con bases de cotización
 """
 
 import io
+import logging
+import os
+import time
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 
+from . import metrics
+from .bases_table import BasesTable
+from .excel_streaming import generate_excel_streaming
 
-def generate_excel_from_process_result(result_data):
+logger = logging.getLogger(__name__)
+
+# Motor de generación por defecto: "xlsxwriter" (streaming) u "openpyxl" (modelo completo)
+EXCEL_ENGINE = os.environ.get("EXCEL_ENGINE", "xlsxwriter")
+EXCEL_ENGINES = ("xlsxwriter", "openpyxl")
+
+
+def _split_bases_por_periodo(bases_procesadas):
+    """
+    Separar las bases en revalorizadas y no revalorizadas en una sola pasada
+    
+    Args:
+        bases_procesadas (list): Bases devueltas por el backend
+        
+    Returns:
+        tuple: (bases_revalorizadas: list, bases_no_revalorizadas: list)
+    """
+    bases_revalorizadas = []
+    bases_no_revalorizadas = []
+    for base in bases_procesadas:
+        periodo = base.get("periodo")
+        if periodo == "revalorizado":
+            bases_revalorizadas.append(base)
+        elif periodo == "no_revalorizado":
+            bases_no_revalorizadas.append(base)
+    return bases_revalorizadas, bases_no_revalorizadas
+
+
+def generate_excel_from_process_result(result_data, engine=None):
     """
     Genera un archivo Excel con múltiples pestañas a partir del resultado del procesamiento
     
     Args:
         result_data (dict): Datos del procesamiento con bases_procesadas y otros campos
+        engine (str): Motor a usar ("xlsxwriter" u "openpyxl"); por defecto EXCEL_ENGINE
         
     Returns:
         bytes: Contenido del archivo Excel en formato binario
     """
+    engine = engine or EXCEL_ENGINE
+    if engine not in EXCEL_ENGINES:
+        logger.error("Error generando Excel: motor desconocido '%s' (válidos: %s)", engine, ", ".join(EXCEL_ENGINES))
+        return None
+    
+    inicio = time.perf_counter()
+    excel_data = _build_excel(result_data, engine)
+    if excel_data is None:
+        metrics.excel_failures.inc(engine=engine)
+    else:
+        metrics.excel_duration.observe(time.perf_counter() - inicio, engine=engine)
+        metrics.excel_rows.observe(len(result_data.get("bases_procesadas", [])), engine=engine)
+        metrics.excel_bytes.observe(len(excel_data), engine=engine)
+    return excel_data
+
+
+def _build_excel(result_data, engine):
+    """
+    Generar el Excel con el motor indicado
+    
+    Args:
+        result_data (dict): Datos del procesamiento
+        engine (str): "xlsxwriter" u "openpyxl"
+        
+    Returns:
+        bytes or None: Contenido del archivo Excel (None si falla)
+    """
     try:
+        bases_procesadas = result_data.get("bases_procesadas", [])
+        
+        if engine == "xlsxwriter":
+            # Filtrar bases por tipo sobre la tabla columnar
+            tabla = bases_procesadas if isinstance(bases_procesadas, BasesTable) else BasesTable.from_records(bases_procesadas)
+            return generate_excel_streaming(
+                result_data, tabla.filter_periodo("revalorizado"), tabla.filter_periodo("no_revalorizado")
+            )
+        
+        # Filtrar bases por tipo
+        if isinstance(bases_procesadas, BasesTable):
+            bases_procesadas = bases_procesadas.to_records()
+        bases_revalorizadas, bases_no_revalorizadas = _split_bases_por_periodo(bases_procesadas)
+        
         # Crear workbook
         wb = Workbook()
         
@@ -36,17 +112,6 @@ def generate_excel_from_process_result(result_data):
         # Eliminar hoja por defecto
         wb.remove(wb.active)
         
-        # Filtrar bases por tipo
-        bases_revalorizadas = [
-            base for base in result_data.get("bases_procesadas", [])
-            if base.get("periodo") == "revalorizado"
-        ]
-        
-        bases_no_revalorizadas = [
-            base for base in result_data.get("bases_procesadas", [])
-            if base.get("periodo") == "no_revalorizado"
-        ]
-        
         # Crear las tres pestañas
         _create_bases_revalorizadas_sheet(wb, bases_revalorizadas, header_font, header_fill, border)
         _create_bases_no_revalorizadas_sheet(wb, bases_no_revalorizadas, header_font, header_fill, border)
@@ -60,11 +125,32 @@ def generate_excel_from_process_result(result_data):
         return excel_buffer.getvalue()
         
     except Exception as e:
-        print(f"Error generando Excel: {str(e)}")
+        logger.exception("Error generando Excel: %s", e)
         return None
 
 
-def _create_bases_revalorizadas_sheet(wb, bases_revalorizadas, header_font, header_fill, border):
+def _autofit_columns(ws, limit=30):
+    """
+    Ajustar el ancho de cada columna a su valor más largo
+    
+    Args:
+        ws: Hoja de openpyxl
+        limit (int): Ancho máximo de columna
+    """
+    for column in ws.columns:
+        max_length = 0
+        column_letter = column[0].column_letter
+        for cell in column:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        adjusted_width = min(max_length + 2, limit)
+        ws.column_dimensions[column_letter].width = adjusted_width
+
+
+def _create_bases_revalorizadas_sheet(wb, bases_revalorizadas, header_font, header_fill, border, autofit=True):
     """Crear pestaña de Bases Revalorizadas"""
     ws_revalorizadas = wb.create_sheet("Bases Revalorizadas")
     
@@ -127,20 +213,13 @@ def _create_bases_revalorizadas_sheet(wb, bases_revalorizadas, header_font, head
         ws_revalorizadas.cell(row=suma_row+1, column=7).fill = PatternFill(start_color="FFE6CC", end_color="FFE6CC", fill_type="solid")
     
     # Ajustar ancho de columnas
-    for column in ws_revalorizadas.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 30)
-        ws_revalorizadas.column_dimensions[column_letter].width = adjusted_width
+    if autofit:
+        _autofit_columns(ws_revalorizadas)
+    
+    return ws_revalorizadas
 
 
-def _create_bases_no_revalorizadas_sheet(wb, bases_no_revalorizadas, header_font, header_fill, border):
+def _create_bases_no_revalorizadas_sheet(wb, bases_no_revalorizadas, header_font, header_fill, border, autofit=True):
     """Crear pestaña de Bases No Revalorizadas"""
     ws_no_revalorizadas = wb.create_sheet("Bases No Revalorizadas")
     
@@ -186,17 +265,10 @@ def _create_bases_no_revalorizadas_sheet(wb, bases_no_revalorizadas, header_font
         ws_no_revalorizadas.cell(row=suma_row, column=5).fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
     
     # Ajustar ancho de columnas
-    for column in ws_no_revalorizadas.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 30)
-        ws_no_revalorizadas.column_dimensions[column_letter].width = adjusted_width
+    if autofit:
+        _autofit_columns(ws_no_revalorizadas)
+    
+    return ws_no_revalorizadas
 
 
 def _create_resumen_sheet(wb, result_data, bases_revalorizadas, bases_no_revalorizadas, header_font, header_fill, border):
@@ -0,0 +1,278 @@
+"""
+Módulo de generación de Excel en streaming con xlsxwriter
+Produce el mismo libro que excel_generator escribiendo fila a fila en modo de memoria constante
+"""
+
+import io
+
+import xlsxwriter
+
+# Colores de relleno usados en las tres pestañas (mismos que la versión openpyxl)
+_FILLS = {
+    "header": "#4472C4",
+    "suma_rev": "#E2EFDA",
+    "ultimos_13": "#FFE6CC",
+    "suma_no_rev": "#FFF2CC",
+    "expediente": "#D9EAD3",
+    "estadisticas": "#FCE5CD",
+    "sumas": "#E1D5E7",
+    "suma_total": "#C9DAF8",
+    "dias_15": "#D5E8D4",
+    "parametros": "#F4CCCC",
+    "base_reguladora": "#FF0000",
+}
+
+
+class _ColumnWidths:
+    """Acumula la longitud máxima por columna mientras se escribe (una sola pasada)"""
+
+    def __init__(self):
+        self.max_lengths = {}
+
+    def track(self, col, value):
+        length = len(str(value))
+        if length > self.max_lengths.get(col, 0):
+            self.max_lengths[col] = length
+
+    def apply(self, ws, limit=30):
+        for col, length in self.max_lengths.items():
+            ws.set_column(col, col, min(length + 2, limit))
+
+
+def _build_formats(wb):
+    """Crear los formatos del libro una sola vez"""
+    formats = {
+        "header": wb.add_format({
+            "bold": True, "font_color": "#FFFFFF", "bg_color": _FILLS["header"],
+            "align": "center", "border": 1
+        }),
+        "border": wb.add_format({"border": 1}),
+        "bold": wb.add_format({"bold": True}),
+        "title": wb.add_format({"bold": True, "font_size": 14}),
+        "base_reguladora": wb.add_format({
+            "bold": True, "font_size": 12, "font_color": "#FFFFFF", "bg_color": _FILLS["base_reguladora"]
+        }),
+    }
+    for name in ("suma_rev", "ultimos_13", "suma_no_rev", "expediente", "estadisticas",
+                 "sumas", "suma_total", "dias_15", "parametros"):
+        formats[name] = wb.add_format({"bold": True, "bg_color": _FILLS[name]})
+    return formats
+
+
+def generate_excel_streaming(result_data, bases_revalorizadas, bases_no_revalorizadas):
+    """
+    Genera el Excel con xlsxwriter en modo de memoria constante
+
+    Args:
+        result_data (dict): Datos del procesamiento
+        bases_revalorizadas (BasesTable): Bases con periodo "revalorizado"
+        bases_no_revalorizadas (BasesTable): Bases con periodo "no_revalorizado"
+
+    Returns:
+        bytes: Contenido del archivo Excel en formato binario
+    """
+    excel_buffer = io.BytesIO()
+    wb = xlsxwriter.Workbook(excel_buffer, {"constant_memory": True, "in_memory": False})
+    formats = _build_formats(wb)
+
+    _write_bases_revalorizadas_sheet(wb, bases_revalorizadas, formats)
+    _write_bases_no_revalorizadas_sheet(wb, bases_no_revalorizadas, formats)
+    _write_resumen_sheet(wb, result_data, bases_revalorizadas, bases_no_revalorizadas, formats)
+
+    wb.close()
+    return excel_buffer.getvalue()
+
+
+def _write_header(ws, headers, widths, formats):
+    """Escribir la fila de cabecera de una pestaña de bases"""
+    for col, header in enumerate(headers):
+        ws.write_string(0, col, header, formats["header"])
+        widths.track(col, header)
+
+
+def _write_cell(ws, row, col, value, widths, cell_format=None):
+    """Escribir un valor numérico o de texto registrando su ancho"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        ws.write_number(row, col, value, cell_format)
+    elif value is None:
+        ws.write_blank(row, col, None, cell_format)
+    else:
+        ws.write_string(row, col, str(value), cell_format)
+    widths.track(col, value)
+
+
+def _write_formula(ws, row, col, formula, widths, cell_format=None):
+    """Escribir una fórmula registrando su ancho"""
+    ws.write_formula(row, col, formula, cell_format)
+    widths.track(col, formula)
+
+
+def _write_bases_revalorizadas_sheet(wb, bases_revalorizadas, formats):
+    """Escribir pestaña de Bases Revalorizadas"""
+    ws = wb.add_worksheet("Bases Revalorizadas")
+    widths = _ColumnWidths()
+    border = formats["border"]
+
+    _write_header(ws, ["Mes/Año", "Base €", "Base Original €", "Índice", "Empresa", "Régimen", "Días Cotizados"], widths, formats)
+
+    columnas = zip(
+        bases_revalorizadas.mes_anyo(),
+        bases_revalorizadas.values("base", 0),
+        bases_revalorizadas.values("base_original", 0),
+        bases_revalorizadas.values("indice_revalorizacion", 1),
+        bases_revalorizadas.empresa(),
+        bases_revalorizadas.regimen()
+    )
+    for row, valores in enumerate(columnas, 1):
+        for col, valor in enumerate(valores):
+            _write_cell(ws, row, col, valor, widths, border)
+        _write_cell(ws, row, 6, 30, widths, border)  # Días cotizados
+
+    if len(bases_revalorizadas):
+        total_bases = len(bases_revalorizadas)
+        suma_row = total_bases + 2
+
+        _write_cell(ws, suma_row, 0, "SUMA TOTAL REVALORIZADAS:", widths, formats["bold"])
+        _write_formula(ws, suma_row, 1, f"=SUM(B2:B{total_bases+1})", widths, formats["suma_rev"])
+        _write_cell(ws, suma_row, 5, "TOTAL DÍAS:", widths, formats["bold"])
+        _write_formula(ws, suma_row, 6, f"=SUM(G2:G{total_bases+1})", widths, formats["suma_rev"])
+
+        # Suma días últimos 13 años (156 meses más recientes)
+        ultima_fila = 157 if total_bases >= 156 else total_bases + 1
+        _write_cell(ws, suma_row + 1, 5, "ÚLTIMOS 13 AÑOS:", widths, formats["bold"])
+        _write_formula(ws, suma_row + 1, 6, f"=SUM(G2:G{ultima_fila})", widths, formats["ultimos_13"])
+
+    widths.apply(ws)
+
+
+def _write_bases_no_revalorizadas_sheet(wb, bases_no_revalorizadas, formats):
+    """Escribir pestaña de Bases No Revalorizadas"""
+    ws = wb.add_worksheet("Bases No Revalorizadas")
+    widths = _ColumnWidths()
+    border = formats["border"]
+
+    _write_header(ws, ["Mes/Año", "Base €", "Empresa", "Régimen", "Días Cotizados"], widths, formats)
+
+    columnas = zip(
+        bases_no_revalorizadas.mes_anyo(),
+        bases_no_revalorizadas.values("base", 0),
+        bases_no_revalorizadas.empresa(),
+        bases_no_revalorizadas.regimen()
+    )
+    for row, valores in enumerate(columnas, 1):
+        for col, valor in enumerate(valores):
+            _write_cell(ws, row, col, valor, widths, border)
+        _write_cell(ws, row, 4, 30, widths, border)  # Días cotizados
+
+    if len(bases_no_revalorizadas):
+        total_bases = len(bases_no_revalorizadas)
+        suma_row = total_bases + 2
+
+        _write_cell(ws, suma_row, 0, "SUMA TOTAL NO REVALORIZADAS:", widths, formats["bold"])
+        _write_formula(ws, suma_row, 1, f"=SUM(B2:B{total_bases+1})", widths, formats["suma_no_rev"])
+        _write_cell(ws, suma_row, 3, "TOTAL DÍAS:", widths, formats["bold"])
+        _write_formula(ws, suma_row, 4, f"=SUM(E2:E{total_bases+1})", widths, formats["suma_no_rev"])
+
+    widths.apply(ws)
+
+
+def _write_resumen_sheet(wb, result_data, bases_revalorizadas, bases_no_revalorizadas, formats):
+    """Escribir pestaña de Resumen y Cálculos (filas 0-based, en orden creciente)"""
+    ws = wb.add_worksheet("Resumen y Cálculos")
+    bold = formats["bold"]
+
+    ws.merge_range(0, 0, 0, 3, "RESUMEN DEL CÁLCULO DE BASE REGULADORA", formats["title"])
+
+    row = 2
+
+    # Datos del expediente
+    ws.write_string(row, 0, "DATOS DEL EXPEDIENTE", formats["expediente"])
+    row += 1
+    for label, key in (("Fecha de Jubilación:", "fecha_jubilacion"),
+                       ("Régimen de Acceso:", "regimen_acceso"),
+                       ("Sexo:", "sexo")):
+        ws.write_string(row, 0, label)
+        ws.write(row, 1, result_data.get(key, ""))
+        row += 1
+    row += 1
+
+    # Estadísticas
+    estadisticas = result_data.get("estadisticas", {})
+    ws.write_string(row, 0, "ESTADÍSTICAS DE BASES", formats["estadisticas"])
+    row += 1
+    for label, key in (("Total de Bases:", "total_bases"),
+                       ("Bases Revalorizadas:", "bases_revalorizadas"),
+                       ("Bases No Revalorizadas:", "bases_no_revalorizadas")):
+        ws.write_string(row, 0, label)
+        ws.write(row, 1, estadisticas.get(key, 0))
+        row += 1
+    row += 1
+
+    # Cálculos de sumas dinámicos (las fórmulas usan filas 1-based)
+    ws.write_string(row, 0, "CÁLCULOS DE SUMAS", formats["sumas"])
+    row += 1
+
+    ws.write_string(row, 0, "Suma Bases Revalorizadas:")
+    if len(bases_revalorizadas):
+        ws.write_formula(row, 1, f"='Bases Revalorizadas'!B{len(bases_revalorizadas) + 3}")
+    else:
+        ws.write_number(row, 1, 0)
+    suma_rev_row = row + 1
+    row += 1
+
+    ws.write_string(row, 0, "Suma Bases No Revalorizadas:")
+    if len(bases_no_revalorizadas):
+        ws.write_formula(row, 1, f"='Bases No Revalorizadas'!B{len(bases_no_revalorizadas) + 3}")
+    else:
+        ws.write_number(row, 1, 0)
+    suma_no_rev_row = row + 1
+    row += 1
+
+    ws.write_string(row, 0, "SUMA TOTAL:", bold)
+    ws.write_formula(row, 1, f"=B{suma_rev_row}+B{suma_no_rev_row}", formats["suma_total"])
+    suma_total_row = row + 1
+    row += 2
+
+    # Días cotizados últimos 15 años: todas las no revalorizadas + últimos 13 años de revalorizadas
+    ws.write_string(row, 0, "DÍAS COTIZADOS ÚLTIMOS 15 AÑOS:", bold)
+    if len(bases_revalorizadas) and len(bases_no_revalorizadas):
+        formula = (f"='Bases No Revalorizadas'!E{len(bases_no_revalorizadas) + 3}"
+                   f"+'Bases Revalorizadas'!G{len(bases_revalorizadas) + 4}")
+        nota = "(2 años no rev + 13 años rev)"
+    elif len(bases_no_revalorizadas):
+        formula = f"='Bases No Revalorizadas'!E{len(bases_no_revalorizadas) + 3}"
+        nota = "(solo no revalorizadas)"
+    elif len(bases_revalorizadas):
+        formula = f"='Bases Revalorizadas'!G{len(bases_revalorizadas) + 4}"
+        nota = "(solo últimos 13 años rev)"
+    else:
+        formula = None
+        nota = "(sin datos)"
+
+    if formula:
+        ws.write_formula(row, 1, formula, formats["dias_15"])
+    else:
+        ws.write_number(row, 1, 0, formats["dias_15"])
+    ws.write_string(row, 2, nota)
+    row += 2
+
+    # Parámetros de cómputo
+    parametros = result_data.get("parametros_computo", {})
+    ws.write_string(row, 0, "PARÁMETROS DE CÓMPUTO", formats["parametros"])
+    row += 1
+    for label, key in (("Bases Incluidas:", "bases_incluidas"),
+                       ("Período (meses):", "periodo_meses"),
+                       ("Divisor Base Reguladora:", "divisor_base_reguladora")):
+        ws.write_string(row, 0, label)
+        ws.write(row, 1, parametros.get(key, 0))
+        row += 1
+    divisor_row = row
+    row += 1
+
+    # Base reguladora final
+    ws.write_string(row, 0, "BASE REGULADORA:", formats["base_reguladora"])
+    ws.write_formula(row, 1, f"=B{suma_total_row}/B{divisor_row}", formats["base_reguladora"])
+
+    ws.set_column(0, 0, 30)
+    ws.set_column(1, 1, 20)
+    ws.set_column(2, 2, 25)
@@ -0,0 +1,203 @@
+"""
+Módulo de salud del backend
+Circuit breaker de las llamadas a la API y sondeo periódico de /health en segundo plano
+"""
+
+import logging
+import os
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Sondeo de /health en segundo plano (0 lo desactiva)
+HEALTH_PROBE_INTERVAL = float(os.environ.get("HEALTH_PROBE_INTERVAL", "30"))
+HEALTH_PROBE_TIMEOUT = float(os.environ.get("HEALTH_PROBE_TIMEOUT", "5"))
+
+# Circuit breaker: fallos consecutivos para abrir y segundos hasta permitir una prueba
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", "30"))
+
+# Estados del circuito
+CLOSED = "cerrado"
+OPEN = "abierto"
+HALF_OPEN = "semiabierto"
+
+
+class CircuitOpenError(Exception):
+    """Llamada rechazada sin contactar con el backend porque el circuito está abierto"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker compartido por todas las llamadas a la API
+
+    Cerrado: todas las llamadas pasan. Tras `failure_threshold` fallos seguidos
+    (errores de red, timeouts o 5xx) se abre y las llamadas fallan al instante.
+    Pasados `reset_timeout` segundos queda semiabierto y deja pasar una sola
+    llamada de prueba: si va bien se cierra y si falla vuelve a abrirse.
+
+    Args:
+        failure_threshold (int): Fallos consecutivos que abren el circuito
+        reset_timeout (float): Segundos abierto antes de permitir una prueba
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state):
+        if state != self.state:
+            self.state = state
+            metrics.api_circuit_transitions.inc(state=state)
+
+    def allow(self):
+        """
+        Decidir si una llamada puede salir hacia el backend
+
+        Returns:
+            bool: True si la llamada puede hacerse (o es la prueba semiabierta)
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Registrar una llamada correcta: cierra el circuito"""
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self._opened_at = None
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        """Registrar un fallo: abre el circuito al llegar al umbral o si falla la prueba"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def retry_in(self):
+        """Segundos hasta que se permita la siguiente prueba (0 si no está abierto)"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+
+breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+# Último resultado del sondeo, compartido por todas las sesiones
+_status = {"healthy": None, "checked_at": None, "latency": None, "services": None, "error": None}
+_status_lock = threading.Lock()
+_wake = threading.Event()
+
+_prober_lock = threading.Lock()
+_prober_started = False
+
+
+def probe_once():
+    """
+    Consultar /health y actualizar el estado compartido
+
+    La llamada no pasa por el circuito (se hace aunque esté abierto), pero su
+    resultado sí lo alimenta: un backend que vuelve a responder cierra el circuito.
+
+    Returns:
+        bool: True si el backend está sano
+    """
+    from .api_client import check_api_health
+
+    inicio = time.perf_counter()
+    healthy, data = check_api_health(timeout=HEALTH_PROBE_TIMEOUT)
+    with _status_lock:
+        _status.update({
+            "healthy": healthy,
+            "checked_at": time.time(),
+            "latency": time.perf_counter() - inicio,
+            "services": data.get("services") if healthy and isinstance(data, dict) else None,
+            "error": None if healthy else str(data or "Respuesta no válida")
+        })
+    return healthy
+
+
+def _probe_loop(interval):
+    while True:
+        try:
+            probe_once()
+        except Exception as e:
+            logger.exception("Error en el sondeo de salud: %s", e)
+        # Con el circuito abierto se sondea en cuanto se permitiría una prueba,
+        # para que sea /health y no una llamada de usuario quien lo cierre
+        espera = interval if breaker.state == CLOSED else min(interval, max(breaker.retry_in(), 1.0))
+        # request_probe() despierta el hilo antes de tiempo
+        _wake.wait(espera)
+        _wake.clear()
+
+
+def start_health_prober():
+    """
+    Arrancar el sondeo de /health una sola vez por proceso
+
+    Es seguro llamarla en cada ejecución de la app.
+
+    Returns:
+        bool: True si el sondeo está activo
+    """
+    global _prober_started
+    if not HEALTH_PROBE_INTERVAL:
+        return False
+    if _prober_started:
+        return True
+    with _prober_lock:
+        if not _prober_started:
+            threading.Thread(
+                target=_probe_loop, args=(HEALTH_PROBE_INTERVAL,), name="health-prober", daemon=True
+            ).start()
+            _prober_started = True
+    return True
+
+
+def request_probe():
+    """
+    Pedir un sondeo inmediato sin esperar su resultado
+
+    Returns:
+        bool: False si el sondeo en segundo plano está desactivado
+    """
+    if not _prober_started:
+        return False
+    _wake.set()
+    return True
+
+
+def get_health_status():
+    """
+    Obtener el estado de salud sin hacer ninguna petición
+
+    Returns:
+        dict: healthy (None si aún no se ha comprobado), checked_at, latency,
+              services, error, circuit (estado del circuito) y retry_in
+    """
+    with _status_lock:
+        status = dict(_status)
+    status["circuit"] = breaker.state
+    status["retry_in"] = breaker.retry_in()
+    status["prober"] = _prober_started
+    return status
@@ -0,0 +1,198 @@
+"""
+Módulo de trabajos en segundo plano
+Ejecuta las llamadas largas al backend en un pool de hilos y permite consultarlas y cancelarlas
+"""
+
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Configuración del motor de trabajos
+JOB_MAX_WORKERS = int(os.environ.get("JOB_MAX_WORKERS", "4"))
+JOB_RETENTION_SECONDS = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+JOB_LATENCY_WINDOW = 200
+
+# Estados posibles de un trabajo
+PENDING = "pendiente"
+RUNNING = "en curso"
+DONE = "completado"
+FAILED = "fallido"
+CANCELLED = "cancelado"
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """
+    Trabajo enviado al pool
+
+    Args:
+        job_id (str): Identificador del trabajo
+        label (str): Descripción legible (archivo y parámetros)
+    """
+
+    def __init__(self, job_id, label):
+        self.job_id = job_id
+        self.label = label
+        self.status = PENDING
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.success = None
+        self.result = None
+        self.future = None
+        self.upload_sent = 0
+        self.upload_total = None
+
+    def report_progress(self, sent, total):
+        """Callback de subida: bytes enviados del total del cuerpo multipart"""
+        self.upload_sent = sent
+        self.upload_total = total
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def uploading(self):
+        """True mientras el PDF se está enviando al backend"""
+        return self.upload_total is not None and self.upload_sent < self.upload_total
+
+    @property
+    def elapsed(self):
+        """Segundos desde el envío hasta el final (o hasta ahora si sigue activo)"""
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class JobManager:
+    """
+    Pool de trabajos compartido por todas las sesiones
+
+    Args:
+        max_workers (int): Número de trabajos ejecutándose a la vez
+    """
+
+    def __init__(self, max_workers):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._latencies = []
+        self._waits = []
+
+    def submit(self, label, fn, *args, track_progress=False):
+        """
+        Enviar un trabajo al pool
+
+        Args:
+            label (str): Descripción legible del trabajo
+            fn (callable): Función que devuelve (success, result)
+            *args: Argumentos de la función
+            track_progress (bool): Pasar progress=job.report_progress a la función
+
+        Returns:
+            str: Identificador del trabajo
+        """
+        self._purge()
+        job_id = f"job-{next(self._ids)}-{int(time.time())}"
+        job = Job(job_id, label)
+        with self._lock:
+            self._jobs[job_id] = job
+        kwargs = {"progress": job.report_progress} if track_progress else {}
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job.status == CANCELLED:
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+
+        try:
+            success, result = fn(*args, **kwargs)
+        except Exception as e:
+            success, result = False, {"error": str(e)}
+
+        with self._lock:
+            job.finished_at = time.time()
+            self._record(self._waits, job.started_at - job.submitted_at)
+            self._record(self._latencies, job.finished_at - job.started_at)
+            if job.status == CANCELLED:
+                # El usuario canceló mientras la llamada estaba en curso: se descarta el resultado
+                return
+            job.success = success
+            job.result = result
+            job.status = DONE if success else FAILED
+
+    @staticmethod
+    def _record(samples, value):
+        samples.append(value)
+        if len(samples) > JOB_LATENCY_WINDOW:
+            del samples[0]
+
+    def get(self, job_id):
+        """Obtener un trabajo por su identificador (None si no existe o ha caducado)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """
+        Cancelar un trabajo
+
+        Un trabajo pendiente no llega a ejecutarse; uno en curso no puede
+        interrumpir la petición HTTP, pero su resultado se descarta.
+
+        Returns:
+            bool: True si el trabajo ha quedado cancelado
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        job.future.cancel()
+        return True
+
+    def _purge(self):
+        """Eliminar trabajos terminados más antiguos que JOB_RETENTION_SECONDS"""
+        limit = time.time() - JOB_RETENTION_SECONDS
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and job.finished_at < limit
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def get_stats(self):
+        """
+        Obtener métricas del pool
+
+        Returns:
+            dict: Profundidad de cola, trabajos en curso y latencias (p50/p95)
+        """
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+            latencies = sorted(self._latencies)
+            waits = sorted(self._waits)
+
+        def percentile(samples, q):
+            if not samples:
+                return None
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "queue_depth": statuses.count(PENDING),
+            "running": statuses.count(RUNNING),
+            "completed": statuses.count(DONE) + statuses.count(FAILED),
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p95": percentile(latencies, 0.95),
+            "wait_p50": percentile(waits, 0.5)
+        }
+
+
+job_manager = JobManager(JOB_MAX_WORKERS)
@@ -0,0 +1,141 @@
+"""
+Módulo de latencias observadas de la API
+Ventana deslizante por endpoint para derivar timeouts adaptativos y el retardo de las peticiones duplicadas (hedging)
+"""
+
+import os
+import threading
+from collections import deque
+
+# Ventana de latencias por endpoint y muestras mínimas antes de adaptar nada
+API_LATENCY_WINDOW = int(os.environ.get("API_LATENCY_WINDOW", "200"))
+API_LATENCY_MIN_SAMPLES = int(os.environ.get("API_LATENCY_MIN_SAMPLES", "20"))
+
+# Timeout adaptativo: p99 observado x multiplicador x escala por tamaño, entre suelo y techo
+API_TIMEOUT_MULTIPLIER = float(os.environ.get("API_TIMEOUT_MULTIPLIER", "3"))
+API_TIMEOUT_FLOOR = float(os.environ.get("API_TIMEOUT_FLOOR", "5"))
+API_TIMEOUT_CEILING = float(os.environ.get("API_TIMEOUT_CEILING", "300"))
+
+# Hedging de GET idempotentes: duplicar la petición cuando supera este percentil
+API_HEDGING = os.environ.get("API_HEDGING", "1") != "0"
+API_HEDGE_PERCENTILE = float(os.environ.get("API_HEDGE_PERCENTILE", "0.95"))
+
+
+def _percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class LatencyTracker:
+    """
+    Latencias recientes por endpoint y contadores de hedging
+
+    Args:
+        window (int): Muestras guardadas por endpoint
+        min_samples (int): Muestras necesarias para usar la distribución observada
+    """
+
+    def __init__(self, window, min_samples):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._hedges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, seconds, upload_bytes=0):
+        """
+        Registrar la duración de una llamada (los timeouts se registran con su límite)
+
+        Args:
+            endpoint (str): Endpoint lógico
+            seconds (float): Duración de la llamada
+            upload_bytes (int): Tamaño del cuerpo enviado
+        """
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append((seconds, upload_bytes))
+
+    def _snapshot(self, endpoint):
+        with self._lock:
+            return list(self._samples.get(endpoint, ()))
+
+    def percentile(self, endpoint, q):
+        """Percentil q de la latencia del endpoint (None sin muestras suficientes)"""
+        samples = self._snapshot(endpoint)
+        if len(samples) < self.min_samples:
+            return None
+        return _percentile(sorted(seconds for seconds, _ in samples), q)
+
+    def size_scale(self, endpoint, upload_bytes):
+        """Factor por el que crece el timeout para una subida mayor que la mediana observada"""
+        if not upload_bytes:
+            return 1.0
+        sizes = sorted(size for _, size in self._snapshot(endpoint) if size)
+        if not sizes:
+            return 1.0
+        return max(upload_bytes / _percentile(sizes, 0.5), 1.0)
+
+    def timeout_for(self, endpoint, default, upload_bytes=0):
+        """
+        Timeout de una llamada según la latencia observada y el tamaño de la subida
+
+        Sin muestras suficientes se usa el timeout por defecto del endpoint.
+
+        Args:
+            endpoint (str): Endpoint lógico
+            default (float): Timeout fijo del endpoint
+            upload_bytes (int): Tamaño del cuerpo que se va a enviar
+
+        Returns:
+            float: Timeout en segundos
+        """
+        scale = self.size_scale(endpoint, upload_bytes)
+        p99 = self.percentile(endpoint, 0.99)
+        if p99 is None:
+            return min(default * scale, max(API_TIMEOUT_CEILING, default))
+        return min(max(p99 * API_TIMEOUT_MULTIPLIER * scale, API_TIMEOUT_FLOOR), API_TIMEOUT_CEILING)
+
+    def hedge_delay(self, endpoint):
+        """Segundos a esperar antes de duplicar un GET (None: no duplicar)"""
+        if not API_HEDGING:
+            return None
+        return self.percentile(endpoint, API_HEDGE_PERCENTILE)
+
+    def record_hedge(self, endpoint, hedged=False, won=False):
+        """Contar una llamada apta para hedging, si se duplicó y si ganó la copia"""
+        with self._lock:
+            stats = self._hedges.setdefault(endpoint, [0, 0, 0])
+            stats[0] += 1
+            stats[1] += hedged
+            stats[2] += won
+
+    def get_stats(self):
+        """
+        Obtener latencias, timeouts y hedging por endpoint
+
+        Returns:
+            dict: endpoint -> samples, p50, p95, p99, calls, hedged, wins, hedge_rate, win_rate
+        """
+        with self._lock:
+            endpoints = sorted(set(self._samples) | set(self._hedges))
+            hedges = {name: list(stats) for name, stats in self._hedges.items()}
+        stats = {}
+        for endpoint in endpoints:
+            latencias = sorted(seconds for seconds, _ in self._snapshot(endpoint))
+            calls, hedged, wins = hedges.get(endpoint, (0, 0, 0))
+            stats[endpoint] = {
+                "samples": len(latencias),
+                "p50": _percentile(latencias, 0.5) if latencias else None,
+                "p95": _percentile(latencias, 0.95) if latencias else None,
+                "p99": _percentile(latencias, 0.99) if latencias else None,
+                "calls": calls,
+                "hedged": hedged,
+                "wins": wins,
+                "hedge_rate": hedged / calls if calls else 0.0,
+                "win_rate": wins / hedged if hedged else 0.0
+            }
+        return stats
+
+
+tracker = LatencyTracker(API_LATENCY_WINDOW, API_LATENCY_MIN_SAMPLES)
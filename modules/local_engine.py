@@ -0,0 +1,257 @@
+"""
+Módulo de cálculo local de la base reguladora
+Recalcula con NumPy las estadísticas del backend a partir de bases_procesadas, sin llamadas de red
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+# Cálculos que devuelve el backend en comparativa_calculos
+CALCULO_REFORMA = "calculo_reforma_rd2_2023"
+CALCULO_PREREFORMA = "calculo_prereforma"
+
+# Ruta de la respuesta de referencia usada para validar el motor
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "template", "process_output.json")
+
+
+_MES_ANYO_RE = re.compile(r"^(0[1-9]|1[0-2])/\d{4}$")
+
+
+def is_mes_anyo(fecha):
+    """Comprobar que una fecha tiene formato MM/YYYY con un mes entre 01 y 12"""
+    return bool(_MES_ANYO_RE.match(str(fecha)))
+
+
+def _digit_matrix(fechas):
+    """Matriz (n, 7) de dígitos de fechas con 7 caracteres ASCII, o None si alguna no encaja"""
+    n = len(fechas)
+    if not n or not all(type(f) is str for f in fechas):
+        return None
+    texto = "".join(fechas)
+    if len(texto) != 7 * n or not texto.isascii():
+        return None
+    return np.frombuffer(texto.encode("ascii"), dtype=np.uint8).reshape(n, 7).astype(np.int32) - 48
+
+
+def mes_anyo_to_ordinal(fechas):
+    """
+    Convertir fechas MM/YYYY en ordinales de mes (año * 12 + mes - 1)
+
+    Args:
+        fechas (list): Fechas en formato MM/YYYY
+
+    Returns:
+        np.ndarray: Ordinales int32
+    """
+    # Camino rápido: todas las fechas con 7 caracteres ASCII se leen como una matriz de dígitos
+    digitos = _digit_matrix(fechas)
+    if digitos is not None:
+        cifras = digitos[:, [0, 1, 3, 4, 5, 6]]
+        if (digitos[:, 2] == ord("/") - 48).all() and ((cifras >= 0) & (cifras <= 9)).all():
+            mes = digitos[:, 0] * 10 + digitos[:, 1]
+            anyo = digitos[:, 3] * 1000 + digitos[:, 4] * 100 + digitos[:, 5] * 10 + digitos[:, 6]
+            return (anyo * 12 + mes - 1).astype(np.int32)
+    partes = np.char.partition(np.asarray(fechas, dtype=str), "/")
+    return (partes[:, 2].astype(np.int32) * 12 + partes[:, 0].astype(np.int32) - 1).astype(np.int32)
+
+
+def mes_anyo_mask(fechas):
+    """
+    Versión vectorizada de is_mes_anyo
+
+    Args:
+        fechas (list): Valores a comprobar (cadenas, None u otros tipos)
+
+    Returns:
+        np.ndarray: True en las posiciones con formato MM/YYYY y mes entre 01 y 12
+    """
+    digitos = _digit_matrix(fechas)
+    if digitos is None:
+        return np.fromiter((type(f) is str and is_mes_anyo(f) for f in fechas), dtype=bool, count=len(fechas))
+    mes = digitos[:, 0] * 10 + digitos[:, 1]
+    cifras = digitos[:, [0, 1, 3, 4, 5, 6]]
+    return (
+        (digitos[:, 2] == ord("/") - 48) & ((cifras >= 0) & (cifras <= 9)).all(axis=1) & (mes >= 1) & (mes <= 12)
+    )
+
+
+def ordinal_to_mes_anyo(ordinal):
+    """Convertir un ordinal de mes en fecha MM/YYYY"""
+    anyo, mes = divmod(int(ordinal), 12)
+    return f"{mes + 1:02d}/{anyo}"
+
+
+def _to_arrays(bases_procesadas):
+    """Extraer ordinales, bases y marca de revalorización de la lista de bases o de una BasesTable"""
+    from .bases_table import BasesTable
+
+    if isinstance(bases_procesadas, BasesTable):
+        # Las bases null o ausentes (NaN en la tabla) cuentan como 0, igual que en la lista
+        return bases_procesadas.ordinal, np.nan_to_num(bases_procesadas.base), bases_procesadas.mask_periodo("revalorizado")
+    ordinales = mes_anyo_to_ordinal([b.get("mes_anyo", "01/0") for b in bases_procesadas])
+    bases = np.fromiter((b.get("base", 0) for b in bases_procesadas), dtype=np.float64, count=len(bases_procesadas))
+    revalorizado = np.fromiter(
+        (b.get("periodo") == "revalorizado" for b in bases_procesadas), dtype=bool, count=len(bases_procesadas)
+    )
+    return ordinales, bases, revalorizado
+
+
+def compute_estadisticas(ordinales, bases, revalorizado, fecha_jubilacion, reglas):
+    """
+    Calcular las estadísticas de varias reglas de cómputo en una sola pasada vectorizada
+
+    Cada regla toma, dentro de los `periodo_meses` meses anteriores a la fecha de
+    jubilación, las `bases_incluidas` bases de mayor importe y las divide entre
+    `divisor`. Con el periodo igual al número de bases (régimen pre-reforma) se
+    suman todas las bases del periodo; con un periodo mayor (RD 2/2023) se
+    descartan las peores.
+
+    Args:
+        ordinales (np.ndarray): Ordinales de mes de cada base
+        bases (np.ndarray): Importe de cada base (ya revalorizado si procede)
+        revalorizado (np.ndarray): True si la base pertenece al periodo revalorizado
+        fecha_jubilacion (str): Fecha de jubilación MM/YYYY (None: mes siguiente a la última base)
+        reglas (dict): nombre -> {"bases_incluidas", "periodo_meses", "divisor"}
+
+    Returns:
+        dict: nombre -> estadísticas con el mismo formato que el backend
+    """
+    nombres = list(reglas)
+    if not nombres:
+        return {}
+
+    if fecha_jubilacion:
+        jubilacion = int(mes_anyo_to_ordinal([fecha_jubilacion])[0])
+    else:
+        jubilacion = int(ordinales.max()) + 1 if len(ordinales) else 0
+
+    incluidas = np.array([reglas[n]["bases_incluidas"] for n in nombres], dtype=np.int64)
+    periodos = np.array([reglas[n].get("periodo_meses") or reglas[n]["bases_incluidas"] for n in nombres], dtype=np.int64)
+    divisores = np.array([reglas[n]["divisor"] for n in nombres], dtype=np.float64)
+
+    # Bases ordenadas de mayor a menor importe; las reglas se evalúan como filas de una matriz
+    orden = np.argsort(-bases, kind="stable")
+    bases_ord = bases[orden]
+    rev_ord = revalorizado[orden]
+    ord_ord = ordinales[orden]
+
+    en_periodo = (ord_ord[None, :] >= (jubilacion - periodos)[:, None]) & (ord_ord[None, :] < jubilacion)
+    seleccion = en_periodo & (np.cumsum(en_periodo, axis=1) <= incluidas[:, None])
+
+    seleccion_f = seleccion.astype(np.float64)
+    suma_total = seleccion_f @ bases_ord
+    suma_rev = seleccion_f @ (bases_ord * rev_ord)
+    total = seleccion.sum(axis=1)
+    total_rev = (seleccion & rev_ord[None, :]).sum(axis=1)
+    base_reguladora = np.divide(suma_total, divisores, out=np.zeros_like(suma_total), where=divisores > 0)
+
+    return {
+        nombre: {
+            "total_bases": int(total[i]),
+            "bases_revalorizadas": int(total_rev[i]),
+            "bases_no_revalorizadas": int(total[i] - total_rev[i]),
+            "suma_periodo_revalorizado": round(float(suma_rev[i]), 2),
+            "suma_periodo_no_revalorizado": round(float(suma_total[i] - suma_rev[i]), 2),
+            "suma_total": round(float(suma_total[i]), 2),
+            "base_reguladora": round(float(base_reguladora[i]), 2)
+        }
+        for i, nombre in enumerate(nombres)
+    }
+
+
+def reglas_from_result(result):
+    """
+    Obtener las reglas de cómputo de una respuesta del backend
+
+    Args:
+        result (dict): Respuesta de /api/process
+
+    Returns:
+        dict: nombre -> {"bases_incluidas", "periodo_meses", "divisor"}
+    """
+    reglas = {}
+    for nombre, calculo in result.get("comparativa_calculos", {}).items():
+        parametros = calculo.get("parametros", {})
+        if "bases_incluidas" in parametros and "divisor" in parametros:
+            reglas[nombre] = {
+                "bases_incluidas": parametros["bases_incluidas"],
+                "periodo_meses": parametros.get("periodo_meses"),
+                "divisor": parametros["divisor"]
+            }
+
+    parametros = result.get("parametros_computo", {})
+    if "bases_incluidas" in parametros and "divisor_base_reguladora" in parametros:
+        reglas["elegido"] = {
+            "bases_incluidas": parametros["bases_incluidas"],
+            "periodo_meses": parametros.get("periodo_meses"),
+            "divisor": parametros["divisor_base_reguladora"]
+        }
+    return reglas
+
+
+def recompute_result(result, reglas=None):
+    """
+    Recalcular localmente las estadísticas de una respuesta del backend
+
+    Args:
+        result (dict): Respuesta de /api/process
+        reglas (dict): Reglas a aplicar (por defecto las de la propia respuesta)
+
+    Returns:
+        dict: nombre de regla -> estadísticas
+    """
+    bases_procesadas = result.get("bases_procesadas", [])
+    if not len(bases_procesadas):
+        return {}
+    ordinales, bases, revalorizado = _to_arrays(bases_procesadas)
+    return compute_estadisticas(
+        ordinales, bases, revalorizado,
+        result.get("fecha_jubilacion"),
+        reglas if reglas is not None else reglas_from_result(result)
+    )
+
+
+def verify_against_result(result, tolerance=0.01):
+    """
+    Comparar el cálculo local con las estadísticas devueltas por el backend
+
+    Args:
+        result (dict): Respuesta de /api/process
+        tolerance (float): Diferencia máxima admitida en importes
+
+    Returns:
+        list: Discrepancias (regla, campo, local, backend); vacía si coinciden
+    """
+    local = recompute_result(result)
+    esperado = {
+        nombre: calculo.get("estadisticas", {})
+        for nombre, calculo in result.get("comparativa_calculos", {}).items()
+    }
+    esperado["elegido"] = result.get("estadisticas", {})
+
+    discrepancias = []
+    for nombre, stats in local.items():
+        for campo, valor in stats.items():
+            if campo not in esperado.get(nombre, {}):
+                continue
+            if abs(valor - esperado[nombre][campo]) > tolerance:
+                discrepancias.append((nombre, campo, valor, esperado[nombre][campo]))
+    return discrepancias
+
+
+if __name__ == "__main__":
+    with open(TEMPLATE_PATH, encoding="utf-8") as f:
+        plantilla = json.load(f)
+
+    for nombre, stats in recompute_result(plantilla).items():
+        print(f"{nombre}: {stats}")
+
+    errores = verify_against_result(plantilla)
+    if errores:
+        for error in errores:
+            print("DISCREPANCIA:", error)
+        raise SystemExit(1)
+    print("✅ El motor local reproduce template/process_output.json")
@@ -0,0 +1,290 @@
+"""
+Módulo de extracción local de bases
+Lee la capa de texto del informe de bases de cotización página a página y devuelve la misma estructura que /api/extract
+"""
+
+import functools
+import importlib.util
+import logging
+import os
+import re
+import time
+import unicodedata
+
+from . import metrics
+from .local_engine import mes_anyo_to_ordinal, ordinal_to_mes_anyo
+
+logger = logging.getLogger(__name__)
+
+# LOCAL_EXTRACTION=1 activa el motor local; desactivado por defecto hasta compararlo
+# con la salida real de /api/extract (benchmarks/compare_extraction.py --backend).
+# Por debajo de la confianza mínima se usa el backend
+LOCAL_EXTRACTION = os.environ.get("LOCAL_EXTRACTION", "0") == "1"
+LOCAL_EXTRACTION_MIN_CONFIDENCE = float(os.environ.get("LOCAL_EXTRACTION_MIN_CONFIDENCE", "0.95"))
+
+# Importes en formato español (1.653,75) y límites de una base mensual plausible
+_IMPORTE = r"(\d{1,3}(?:\.\d{3})*,\d{2})"
+_BASE_MAXIMA_PLAUSIBLE = 50000.0
+
+_MESES = {
+    "ENE": 1, "FEB": 2, "MAR": 3, "ABR": 4, "MAY": 5, "JUN": 6,
+    "JUL": 7, "AGO": 8, "SEP": 9, "SET": 9, "OCT": 10, "NOV": 11, "DIC": 12
+}
+
+# Filas de bases: "MM/YYYY importe", "YYYY MM importe" o "YYYY MES importe"
+_FILA_MES_ANYO = re.compile(rf"^(\d{{2}})/(\d{{4}})\s+{_IMPORTE}\b")
+_FILA_ANYO_MES = re.compile(rf"^(\d{{4}})\s+(\d{{1,2}}|[A-Z]{{3,10}})\.?\s+{_IMPORTE}\b")
+
+# Cabeceras de sección; el régimen y la empresa se mantienen entre páginas
+_REGIMEN = re.compile(r"^REGIMEN\s*:?\s*(?:\d{4}\s+)?(.+)$")
+_EMPRESA = re.compile(r"^(?:EMPRESA|RAZ[OÓ]N SOCIAL)\s*:?\s*(.+?)(?:\s+C\.?\s?C\.?\s?C\.?\s*:.*)?$", re.IGNORECASE)
+
+# Cualquier línea con fecha e importe debería ser una fila de bases
+_CANDIDATA = re.compile(rf"(?:\b\d{{2}}/\d{{4}}\b|^\d{{4}}\s).*{_IMPORTE}")
+
+
+@functools.lru_cache(maxsize=None)
+def pypdf_installed():
+    """
+    True si pypdf está instalado
+
+    Se comprueba sin importarlo: pypdf se importa solo al leer un PDF, para no
+    añadir su tiempo de carga (~60 ms) al arranque de la aplicación.
+    """
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def is_available():
+    """True si el motor local puede usarse (pypdf instalado y LOCAL_EXTRACTION activo)"""
+    return LOCAL_EXTRACTION and pypdf_installed()
+
+
+def _sin_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+def _importe(texto):
+    return float(texto.replace(".", "").replace(",", "."))
+
+
+def _regimen(texto):
+    """Normalizar el régimen como lo devuelve el backend (GENERAL, AUTONOMO, ...)"""
+    texto = _sin_acentos(texto).upper().strip()
+    if "AUTONOMO" in texto:
+        return "AUTONOMO"
+    if "GENERAL" in texto:
+        return "GENERAL"
+    return texto.replace("REGIMEN ", "").replace("ESPECIAL ", "").strip()
+
+
+def iter_page_lines(file):
+    """
+    Recorrer las líneas de texto del PDF página a página
+
+    Solo se mantiene en memoria el texto de la página en curso.
+
+    Args:
+        file: PDF (UploadedFile o cualquier objeto archivo)
+
+    Yields:
+        tuple: (número de página, línea)
+    """
+    from pypdf import PdfReader
+
+    file.seek(0)
+    reader = PdfReader(file)
+    for numero, page in enumerate(reader.pages, start=1):
+        for linea in page_lines(page):
+            yield numero, linea
+
+
+def page_lines(page):
+    """Líneas no vacías de una página de pypdf, con los espacios normalizados"""
+    lineas = (" ".join(linea.split()) for linea in (page.extract_text() or "").splitlines())
+    return [linea for linea in lineas if linea]
+
+
+def opens_section(lines):
+    """
+    Comprobar si una página puede leerse sin las anteriores
+
+    Es así cuando declara régimen y empresa antes de su primera fila de bases;
+    sirve para cortar el PDF en fragmentos sin perder la cabecera de la sección.
+
+    Args:
+        lines (list): Líneas de la página
+
+    Returns:
+        bool: True si la página abre una sección
+    """
+    regimen = empresa = False
+    for linea in lines:
+        if _REGIMEN.match(_sin_acentos(linea).upper()):
+            regimen = True
+        elif _EMPRESA.match(linea):
+            empresa = True
+        elif _CANDIDATA.search(linea):
+            break
+    return regimen and empresa
+
+
+def parse_lines(lines):
+    """
+    Interpretar las líneas del informe de bases
+
+    Args:
+        lines (iterable): (página, línea) en orden de lectura
+
+    Returns:
+        tuple: (bases: list, info: dict con paginas, candidatas, reconocidas, descartadas y
+               duplicadas, es decir, filas que repiten mes, empresa y régimen)
+    """
+    bases = []
+    vistos = set()
+    regimen = empresa = None
+    paginas = candidatas = reconocidas = descartadas = duplicadas = 0
+
+    for pagina, linea in lines:
+        paginas = max(paginas, pagina)
+        cabecera = _sin_acentos(linea).upper()
+
+        coincidencia = _REGIMEN.match(cabecera)
+        if coincidencia:
+            regimen = _regimen(coincidencia.group(1))
+            continue
+        coincidencia = _EMPRESA.match(linea)
+        if coincidencia:
+            empresa = re.sub(r"\s*\(continuaci[oó]n\)$", "", coincidencia.group(1).strip(), flags=re.IGNORECASE)
+            continue
+
+        if not _CANDIDATA.search(linea):
+            continue
+        candidatas += 1
+
+        fila = _FILA_MES_ANYO.match(linea)
+        if fila:
+            mes, anyo, importe = int(fila.group(1)), int(fila.group(2)), fila.group(3)
+        else:
+            fila = _FILA_ANYO_MES.match(cabecera)
+            if not fila:
+                continue
+            anyo, mes_texto, importe = int(fila.group(1)), fila.group(2), fila.group(3)
+            mes = int(mes_texto) if mes_texto.isdigit() else _MESES.get(mes_texto[:3], 0)
+
+        base = _importe(importe)
+        if not (1 <= mes <= 12 and 1900 <= anyo <= 2100 and 0 < base < _BASE_MAXIMA_PLAUSIBLE) or not empresa:
+            descartadas += 1
+            continue
+
+        mes_anyo = f"{mes:02d}/{anyo}"
+        # Un mismo mes y empresa puede repetirse (varios contratos); se conserva y solo se cuenta
+        clave = (mes_anyo, empresa, regimen)
+        if clave in vistos:
+            duplicadas += 1
+        vistos.add(clave)
+        reconocidas += 1
+        bases.append({"mes_anyo": mes_anyo, "base": base, "empresa": empresa, "regimen": regimen or "GENERAL"})
+
+    info = {
+        "paginas": paginas,
+        "candidatas": candidatas,
+        "reconocidas": reconocidas,
+        "descartadas": descartadas,
+        "duplicadas": duplicadas
+    }
+    return bases, info
+
+
+def confidence(info):
+    """
+    Confianza de una extracción local
+
+    Proporción de líneas con fecha e importe que se reconocieron como bases;
+    0 si no hay ninguna (PDF escaneado o con otra disposición).
+
+    Args:
+        info (dict): Información devuelta por parse_lines
+
+    Returns:
+        float: Confianza entre 0 y 1
+    """
+    if not info["candidatas"] or not info["reconocidas"]:
+        return 0.0
+    return info["reconocidas"] / info["candidatas"]
+
+
+def build_extraction(bases, info, seconds=None):
+    """
+    Construir la respuesta con el formato de /api/extract
+
+    Args:
+        bases (list): Bases reconocidas
+        info (dict): Información devuelta por parse_lines
+        seconds (float): Duración de la extracción (opcional)
+
+    Returns:
+        dict: success, message, total_bases, bases y metadata
+    """
+    ordinales = mes_anyo_to_ordinal([b["mes_anyo"] for b in bases]) if bases else None
+    return {
+        "success": True,
+        "message": f"PDF procesado localmente: {len(bases)} bases extraídas",
+        "total_bases": len(bases),
+        "bases": bases,
+        "metadata": {
+            "total_empresas": len({b["empresa"] for b in bases}),
+            "periodo_bases": {
+                "desde": ordinal_to_mes_anyo(ordinales.min()),
+                "hasta": ordinal_to_mes_anyo(ordinales.max())
+            } if bases else {},
+            "extraccion_local": dict(info, confianza=round(confidence(info), 4), segundos=seconds)
+        }
+    }
+
+
+def extract_bases_local(file):
+    """
+    Extraer las bases de un PDF sin llamar al backend
+
+    Args:
+        file: PDF (UploadedFile o cualquier objeto archivo)
+
+    Returns:
+        tuple: (confianza: float, result: dict con el formato de /api/extract)
+    """
+    inicio = time.perf_counter()
+    bases, info = parse_lines(iter_page_lines(file))
+    file.seek(0)
+    segundos = time.perf_counter() - inicio
+    metrics.local_extraction_duration.observe(segundos)
+    return confidence(info), build_extraction(bases, info, seconds=round(segundos, 4))
+
+
+def extract_bases_with_fallback(file, progress=None):
+    """
+    Extraer localmente y recurrir al backend si la confianza es baja
+
+    En el backend, los PDF largos se envían en fragmentos de páginas en paralelo.
+
+    Args:
+        file: PDF subido
+        progress (callable): Progreso de la subida si se llega a usar el backend
+
+    Returns:
+        tuple: (success: bool, result: dict)
+    """
+    if is_available():
+        try:
+            confianza, result = extract_bases_local(file)
+            if confianza >= LOCAL_EXTRACTION_MIN_CONFIDENCE:
+                metrics.local_extractions.inc(outcome="local")
+                return True, result
+            metrics.local_extractions.inc(outcome="fallback")
+        except Exception as e:
+            metrics.local_extractions.inc(outcome="error")
+            logger.exception("Error en la extracción local: %s", e)
+            file.seek(0)
+
+    from .sharded_extraction import extract_bases_sharded
+
+    return extract_bases_sharded(file, progress=progress)
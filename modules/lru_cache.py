@@ -0,0 +1,57 @@
+"""
+Módulo de caché LRU en memoria
+Estructura acotada y segura entre hilos compartida por las cachés del frontend
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Caché LRU acotada por número de entradas y segura entre hilos
+    
+    Args:
+        max_items (int): Número máximo de entradas antes de expulsar la menos usada
+    """
+
+    def __init__(self, max_items=64):
+        self.max_items = max_items
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Obtener una entrada y marcarla como usada recientemente"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        """Guardar una entrada expulsando las menos usadas si se supera el límite"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        """Eliminar una entrada"""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Vaciar la caché"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
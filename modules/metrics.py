@@ -0,0 +1,290 @@
+"""
+Módulo de métricas en formato Prometheus
+Contadores e histogramas de llamadas a la API, generación de Excel y renderizado de páginas
+"""
+
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+# Exportación: puerto HTTP (/metrics) y/o volcado periódico a fichero; 0 o vacío lo desactiva
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+# Interfaz del servidor de /metrics (sin autenticación: solo local salvo que se indique otra)
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_DUMP_PATH = os.environ.get("METRICS_DUMP_PATH", "")
+METRICS_DUMP_INTERVAL = float(os.environ.get("METRICS_DUMP_INTERVAL", "60"))
+
+# Cubetas de los histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+ROW_BUCKETS = (100, 300, 1000, 3000, 10000, 30000, 100000, 300000)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """
+    Contador monótono con etiquetas
+
+    Args:
+        name (str): Nombre de la métrica
+        help_text (str): Descripción
+        labels (tuple): Nombres de las etiquetas
+    """
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    Histograma acumulativo con etiquetas
+
+    Args:
+        name (str): Nombre de la métrica
+        help_text (str): Descripción
+        labels (tuple): Nombres de las etiquetas
+        buckets (tuple): Límites superiores de las cubetas, en orden creciente
+    """
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        posicion = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            serie = self._series.get(key)
+            if serie is None:
+                serie = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][posicion] += 1
+            serie[1] += value
+            serie[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(c), s, n)) for key, (c, s, n) in self._series.items())
+        for key, (cuentas, suma, total) in items:
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets + ("+Inf",), cuentas):
+                acumulado += cuenta
+                etiquetas = _format_labels(self.labels + ("le",), key + (limite,))
+                lines.append(f"{self.name}_bucket{etiquetas} {acumulado}")
+            etiquetas = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{etiquetas} {suma}")
+            lines.append(f"{self.name}_count{etiquetas} {total}")
+        return lines
+
+
+# Llamadas a la API
+api_requests = Counter("pension_api_requests_total", "Llamadas a la API por endpoint y estado", ("endpoint", "status"))
+api_latency = Histogram("pension_api_request_duration_seconds", "Duración de las llamadas a la API", ("endpoint",))
+api_bytes_sent = Counter("pension_api_request_bytes_total", "Bytes enviados a la API", ("endpoint",))
+api_bytes_received = Counter("pension_api_response_bytes_total", "Bytes recibidos de la API", ("endpoint",))
+api_timeouts = Counter("pension_api_timeouts_total", "Llamadas a la API que agotaron el timeout", ("endpoint",))
+api_circuit_transitions = Counter(
+    "pension_api_circuit_transitions_total", "Cambios de estado del circuit breaker de la API", ("state",)
+)
+api_hedges = Counter("pension_api_hedged_requests_total", "GET duplicados por superar el p95", ("endpoint",))
+api_hedge_wins = Counter("pension_api_hedge_wins_total", "GET duplicados que respondieron antes que el original", ("endpoint",))
+api_phase = Histogram(
+    "pension_api_phase_duration_seconds", "Subida del PDF y procesamiento en el servidor", ("endpoint", "phase")
+)
+
+# Deduplicación de llamadas idénticas en curso
+singleflight_calls = Counter("pension_singleflight_calls_total", "Llamadas al backend ejecutadas", ("kind",))
+singleflight_coalesced = Counter(
+    "pension_singleflight_coalesced_total", "Llamadas que reutilizaron otra idéntica en curso", ("kind",)
+)
+
+# Extracción local de PDF
+local_extractions = Counter(
+    "pension_local_extractions_total", "Extracciones locales por resultado (local, fallback, error)", ("outcome",)
+)
+local_extraction_duration = Histogram("pension_local_extraction_duration_seconds", "Duración de la extracción local")
+
+# Extracción en fragmentos de páginas
+sharded_extractions = Counter(
+    "pension_sharded_extractions_total", "Extracciones en fragmentos por resultado (sharded, fallback)", ("outcome",)
+)
+extract_shards = Histogram("pension_extract_shards", "Fragmentos por extracción fragmentada", buckets=(2, 4, 8, 16, 32))
+
+# Generación de Excel
+excel_duration = Histogram("pension_excel_build_duration_seconds", "Duración de la generación de Excel", ("engine",))
+excel_rows = Histogram("pension_excel_rows", "Bases escritas por Excel generado", ("engine",), ROW_BUCKETS)
+excel_bytes = Histogram("pension_excel_output_bytes", "Tamaño de los Excel generados", ("engine",), SIZE_BUCKETS)
+excel_failures = Counter("pension_excel_failures_total", "Errores al generar Excel", ("engine",))
+
+# Renderizado de páginas (cada ejecución de Streamlit)
+page_duration = Histogram("pension_page_render_duration_seconds", "Duración del renderizado de cada página", ("page",))
+page_renders = Counter("pension_page_renders_total", "Ejecuciones de cada página (reruns incluidos)", ("page",))
+
+REGISTRY = (
+    api_requests, api_latency, api_bytes_sent, api_bytes_received, api_timeouts, api_phase,
+    api_circuit_transitions, api_hedges, api_hedge_wins,
+    singleflight_calls, singleflight_coalesced, local_extractions, local_extraction_duration,
+    sharded_extractions, extract_shards,
+    excel_duration, excel_rows, excel_bytes, excel_failures,
+    page_duration, page_renders
+)
+
+
+def render_metrics():
+    """
+    Obtener todas las métricas en formato de texto de Prometheus
+
+    Returns:
+        str: Exposición de texto (versión 0.0.4)
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def observe_api_call(endpoint, seconds, status, bytes_sent=0, bytes_received=0, timeout=False):
+    """
+    Registrar una llamada a la API
+
+    Args:
+        endpoint (str): Endpoint lógico (health, extract, process, config_*)
+        seconds (float): Duración de la llamada
+        status (str): Código HTTP o "error" / "timeout"
+        bytes_sent (int): Tamaño del cuerpo enviado
+        bytes_received (int): Tamaño del cuerpo recibido
+        timeout (bool): True si la llamada agotó el timeout
+    """
+    api_requests.inc(endpoint=endpoint, status=status)
+    api_latency.observe(seconds, endpoint=endpoint)
+    if bytes_sent:
+        api_bytes_sent.inc(bytes_sent, endpoint=endpoint)
+    if bytes_received:
+        api_bytes_received.inc(bytes_received, endpoint=endpoint)
+    if timeout:
+        api_timeouts.inc(endpoint=endpoint)
+
+
+def timed_page(page):
+    """
+    Decorador que mide el renderizado de una página
+
+    Las interrupciones de Streamlit (st.rerun, st.stop) también se registran.
+
+    Args:
+        page (str): Nombre de la página en las etiquetas
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                page_duration.observe(time.perf_counter() - inicio, page=page)
+                page_renders.inc(page=page)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _dump_loop(path, interval):
+    """Volcar las métricas a un fichero cada `interval` segundos (escritura atómica)"""
+    while True:
+        time.sleep(interval)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(render_metrics())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Error volcando métricas: %s", e)
+
+
+_exporter_lock = threading.Lock()
+_exporter_started = False
+
+
+def start_metrics_exporter():
+    """
+    Arrancar la exportación de métricas una sola vez por proceso
+
+    Con METRICS_PORT sirve /metrics en ese puerto (en METRICS_HOST, por defecto
+    solo en local); con METRICS_DUMP_PATH vuelca
+    el texto periódicamente. Es seguro llamarla en cada ejecución de la app.
+
+    Returns:
+        bool: True si hay algún exportador activo
+    """
+    global _exporter_started
+    if _exporter_started:
+        return True
+    with _exporter_lock:
+        if _exporter_started:
+            return True
+        if METRICS_PORT:
+            try:
+                server = ThreadingHTTPServer((METRICS_HOST, METRICS_PORT), _MetricsHandler)
+                server.daemon_threads = True
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            except OSError as e:
+                logger.error("Error arrancando el servidor de métricas en %s:%s: %s", METRICS_HOST, METRICS_PORT, e)
+        if METRICS_DUMP_PATH:
+            threading.Thread(
+                target=_dump_loop, args=(METRICS_DUMP_PATH, METRICS_DUMP_INTERVAL), name="metrics-dump", daemon=True
+            ).start()
+        _exporter_started = True
+    return bool(METRICS_PORT or METRICS_DUMP_PATH)
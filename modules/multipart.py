@@ -0,0 +1,104 @@
+"""
+Módulo de subida multipart en streaming
+Codifica formularios multipart/form-data leyendo el archivo por bloques e informa del progreso
+"""
+
+import io
+import os
+import time
+import uuid
+
+# Tamaño de los bloques leídos del archivo en cada envío
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", str(64 * 1024)))
+
+
+def _file_length(fileobj):
+    """Tamaño de un objeto archivo sin leerlo en memoria (getbuffer() copiaría un BytesIO compartido)"""
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    length = fileobj.tell()
+    fileobj.seek(position)
+    return length
+
+
+class MultipartEncoder:
+    """
+    Cuerpo multipart/form-data que se lee por bloques
+
+    Se pasa a requests como `data`: expone `read(n)` y `__len__`, de modo que la
+    petición lleva Content-Length y el archivo nunca se copia entero en memoria.
+
+    Args:
+        fields (dict): Campos de texto del formulario
+        files (dict): Nombre del campo -> (nombre de archivo, objeto archivo, content type)
+        callback (callable): progress(bytes_enviados, total) tras cada bloque (opcional)
+        chunk_size (int): Tamaño de bloque al leer los archivos
+    """
+
+    def __init__(self, fields=None, files=None, callback=None, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.callback = callback
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.finished_at = None
+
+        # Partes: bytes de cabecera/campos o (objeto archivo, tamaño)
+        self._parts = []
+        for name, value in (fields or {}).items():
+            self._parts.append(io.BytesIO(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+            ))
+        for name, (filename, fileobj, content_type) in (files or {}).items():
+            self._parts.append(io.BytesIO(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n".encode("utf-8")
+            ))
+            fileobj.seek(0)
+            self._parts.append(fileobj)
+            self._parts.append(io.BytesIO(b"\r\n"))
+        self._parts.append(io.BytesIO(f"--{self.boundary}--\r\n".encode("utf-8")))
+
+        self._length = sum(_file_length(part) for part in self._parts)
+        self._current = 0
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        """
+        Leer el siguiente bloque del cuerpo
+
+        Args:
+            size (int): Bytes máximos (-1 o None: un bloque de chunk_size)
+
+        Returns:
+            bytes: Siguiente fragmento (vacío al terminar)
+        """
+        if size is None or size < 0:
+            size = self.chunk_size
+        chunks = []
+        remaining = size
+        while remaining > 0 and self._current < len(self._parts):
+            chunk = self._parts[self._current].read(remaining)
+            if not chunk:
+                self._current += 1
+                continue
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        data = b"".join(chunks)
+        if data:
+            self.bytes_read += len(data)
+            if self.bytes_read >= self._length and self.finished_at is None:
+                self.finished_at = time.perf_counter()
+            if self.callback is not None:
+                self.callback(self.bytes_read, self._length)
+        return data
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
@@ -5,15 +5,45 @@ Contiene la lógica de cada página del simulador de pensiones
 
 import streamlit as st
 import pandas as pd
-import json
-import re
+import numpy as np
+import os
+import time
 from datetime import datetime
 
-from .api_client import extract_bases, process_complete, get_configuration
+from .api_client import get_configuration
+from .result_cache import extract_bases_cached, process_complete_cached, get_cache_stats
 from .ui_components import show_feature_card, show_success_message, show_error_message, show_info_message
-from .excel_generator import generate_excel_from_process_result
+from .artifacts import get_excel_bytes, get_json_text, get_parquet_zip, get_bases_arrow
+from .session_store import input_signature, store_result, get_stored_result, clear_result, track_job, get_tracked_jobs
+from .batch import run_parallel, process_batch_item, build_batch_zip, make_named_file, BATCH_MAX_WORKERS, BATCH_WORKERS_LIMIT
+from .jobs import job_manager, DONE, FAILED
+from .revaluation import build_local_result_cached
+from .local_engine import is_mes_anyo, recompute_result, reglas_from_result, verify_against_result
+from .local_extraction import pypdf_installed
+from .sharded_extraction import EXTRACT_SHARDING
+from .config_index import get_config_index
+from .metrics import timed_page
+from .sweep import month_range, build_sweep_items, sweep_frame, sweep_to_excel, SWEEP_MAX_WORKERS, SWEEP_MAX_SIMULATIONS
 
+# Segundos entre consultas de estado de los trabajos en curso
+JOB_POLL_INTERVAL = 1.5
 
+# Tamaño máximo del PDF en la extracción: 10 MB como en el resto de páginas, salvo que
+# la extracción en fragmentos esté activa y pueda enviar los PDF largos por partes
+# (por encima de 200 MB hay que subir también server.maxUploadSize de Streamlit)
+if EXTRACT_SHARDING and pypdf_installed():
+    MAX_EXTRACT_MB = int(os.environ.get("MAX_EXTRACT_MB", "200"))
+else:
+    MAX_EXTRACT_MB = 10
+
+# Límites de tamaño tal como se muestran en la ayuda
+if MAX_EXTRACT_MB == 10:
+    PDF_LIMITS_TEXT = "Máximo 10MB"
+else:
+    PDF_LIMITS_TEXT = f"Máximo {MAX_EXTRACT_MB}MB en extracción y 10MB en procesamiento y lotes"
+
+
+@timed_page("home")
 def show_home_page():
     """Mostrar la página de inicio con información general"""
     col1, col2, col3 = st.columns(3)
@@ -52,6 +82,7 @@ def show_home_page():
         )
 
 
+@timed_page("extract")
 def show_extract_page():
     """Mostrar la página de extracción de bases"""
     st.header("📄 Extracción de Bases de Cotización")
@@ -63,48 +94,125 @@ def show_extract_page():
     uploaded_file = st.file_uploader(
         "Selecciona un archivo PDF",
         type=['pdf'],
-        help="Archivo PDF con bases de cotización de la Seguridad Social (máximo 10MB)"
+        help=f"Archivo PDF con bases de cotización de la Seguridad Social (máximo {MAX_EXTRACT_MB}MB)"
     )
     
-    if uploaded_file is not None:
-        st.info(f"📁 Archivo: {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
-        
-        if st.button("🔍 Extraer Bases", key="extract"):
-            if uploaded_file.size > 10 * 1024 * 1024:  # 10MB
-                show_error_message("El archivo es demasiado grande. Máximo 10MB.")
+    if uploaded_file is None:
+        clear_result("extract")
+        return
+    
+    st.info(f"📁 Archivo: {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
+    signature = input_signature(uploaded_file)
+    
+    if st.button("🔍 Extraer Bases", key="extract"):
+        if uploaded_file.size > MAX_EXTRACT_MB * 1024 * 1024:
+            show_error_message(f"El archivo es demasiado grande. Máximo {MAX_EXTRACT_MB}MB.")
+        else:
+            barra = st.progress(0.0, text="Subiendo PDF...")
+            success, result = extract_bases_cached(uploaded_file, progress=_upload_progress(barra))
+            barra.empty()
+            
+            if success:
+                store_result("extract", signature, result)
             else:
-                with st.spinner("Extrayendo bases de cotización..."):
-                    success, result = extract_bases(uploaded_file)
-                
-                if success:
-                    show_success_message("Extracción completada exitosamente")
-                    
-                    # Mostrar estadísticas
-                    if "total_bases" in result:
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Total Bases", result["total_bases"])
-                        with col2:
-                            st.metric("Empresas", result.get("metadata", {}).get("total_empresas", "N/A"))
-                        with col3:
-                            periodo = result.get("metadata", {}).get("periodo_bases", {})
-                            if periodo:
-                                st.metric("Período", f"{periodo.get('desde', '')} - {periodo.get('hasta', '')}")
-                    
-                    # Botón de descarga
-                    json_data = json.dumps(result, indent=2, ensure_ascii=False)
-                    st.download_button(
-                        label="📥 Descargar Resultados (JSON)",
-                        data=json_data,
-                        file_name=f"bases_extraidas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                        mime="application/json",
-                        key="download_extract"
-                    )
-                else:
-                    error_msg = result.get('error', result.get('detail', 'Error desconocido'))
-                    show_error_message(f"Error en la extracción: {error_msg}")
+                clear_result("extract")
+                error_msg = result.get('error', result.get('detail', 'Error desconocido'))
+                show_error_message(f"Error en la extracción: {error_msg}")
+    
+    # El resultado se conserva entre reejecuciones mientras no cambie el PDF
+    result = get_stored_result("extract", signature)
+    if result is not None:
+        show_success_message("Extracción completada exitosamente")
+        _show_cache_stats()
+        local = result.get("metadata", {}).get("extraccion_local")
+        if local:
+            st.caption(
+                f"💻 Extraído localmente sin llamar al backend ({local['paginas']} páginas, "
+                f"confianza {local['confianza']:.0%})"
+            )
+        fragmentada = result.get("metadata", {}).get("extraccion_fragmentada")
+        if fragmentada:
+            st.caption(
+                f"🧩 Extraído en {fragmentada['fragmentos']} fragmentos en paralelo "
+                f"({fragmentada['paginas']} páginas, {fragmentada['segundos']:.1f} s)"
+            )
+        
+        # Mostrar estadísticas
+        if "total_bases" in result:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Bases", result["total_bases"])
+            with col2:
+                st.metric("Empresas", result.get("metadata", {}).get("total_empresas", "N/A"))
+            with col3:
+                periodo = result.get("metadata", {}).get("periodo_bases", {})
+                if periodo:
+                    st.metric("Período", f"{periodo.get('desde', '')} - {periodo.get('hasta', '')}")
+        
+        # Botón de descarga
+        json_data = get_json_text(result)
+        st.download_button(
+            label="📥 Descargar Resultados (JSON)",
+            data=json_data,
+            file_name=f"bases_extraidas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            key="download_extract"
+        )
+        
+        _show_local_revaluation(result)
 
 
+def _show_local_revaluation(extraction):
+    """Revalorizar localmente las bases extraídas con los índices cacheados"""
+    st.subheader("📈 Revalorización Local")
+    st.caption(
+        "Aplica los índices de revalorización de la configuración cacheada sin volver a subir el PDF. "
+        "No simula meses futuros ni integra lagunas: para el cálculo oficial usa el procesamiento completo."
+    )
+    
+    fecha_jubilacion = st.text_input(
+        "📅 Fecha de Jubilación",
+        placeholder="MM/YYYY",
+        help="Formato: MM/YYYY (ejemplo: 06/2025)",
+        key="extract_fecha"
+    )
+    if not fecha_jubilacion:
+        return
+    if not is_mes_anyo(fecha_jubilacion):
+        show_error_message("Formato de fecha incorrecto. Use MM/YYYY con un mes entre 01 y 12")
+        return
+    
+    success, configs = get_configuration()
+    if not success or not configs.get("indices"):
+        show_error_message("No se pudieron obtener los índices de revalorización")
+        return
+    
+    local = build_local_result_cached(extraction, configs, fecha_jubilacion)
+    if not local["bases_procesadas"]:
+        st.warning("⚠️ No hay bases anteriores a la fecha de jubilación")
+        return
+    
+    _show_process_results(local)
+    # Tabla Arrow: llega al navegador sin convertir cada base en una fila de pandas
+    st.dataframe(
+        get_bases_arrow(local),
+        use_container_width=True,
+        hide_index=True,
+        height=300
+    )
+    
+    excel_data = get_excel_bytes(local)
+    if excel_data:
+        st.download_button(
+            label="📊 Descargar Excel Revalorizado",
+            data=excel_data,
+            file_name=f"bases_revalorizadas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="download_extract_excel"
+        )
+
+
+@timed_page("process")
 def show_process_page():
     """Mostrar la página de procesamiento completo"""
     st.header("🚀 Procesamiento Completo")
@@ -113,6 +221,27 @@ def show_process_page():
         "Proceso completo en un solo paso: extrae bases del PDF y calcula automáticamente la base reguladora."
     )
     
+    modo = st.radio(
+        "Modo",
+        ["🎯 Simulación única", "📈 Barrido de fechas"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="process_mode"
+    )
+    
+    if modo == "📈 Barrido de fechas":
+        _show_sweep_form()
+    else:
+        _show_process_form()
+    
+    # Los trabajos siguen disponibles aunque se navegue a otra página y se vuelva
+    if _show_session_jobs():
+        time.sleep(JOB_POLL_INTERVAL)
+        st.rerun()
+
+
+def _show_process_form():
+    """Mostrar el formulario de procesamiento y el resultado de las entradas actuales"""
     uploaded_file = st.file_uploader(
         "Selecciona un archivo PDF",
         type=['pdf'],
@@ -142,33 +271,429 @@ def show_process_page():
             help="Necesario para el cálculo correcto de lagunas"
         )
     
-    if uploaded_file is not None and fecha_jubilacion:
-        # Validar formato de fecha
-        if not re.match(r'^\d{2}/\d{4}$', fecha_jubilacion):
-            show_error_message("Formato de fecha incorrecto. Use MM/YYYY")
+    if uploaded_file is None or not fecha_jubilacion:
+        clear_result("process")
+        return
+    
+    # Validar formato de fecha
+    if not is_mes_anyo(fecha_jubilacion):
+        clear_result("process")
+        show_error_message("Formato de fecha incorrecto. Use MM/YYYY con un mes entre 01 y 12")
+        return
+    
+    st.info(f"📁 Archivo: {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
+    signature = input_signature(
+        uploaded_file,
+        fecha_jubilacion=fecha_jubilacion,
+        regimen_acceso=regimen_acceso,
+        sexo=sexo
+    )
+    
+    if st.button("🚀 Procesar Completo", key="process"):
+        if uploaded_file.size > 10 * 1024 * 1024:  # 10MB
+            show_error_message("El archivo es demasiado grande. Máximo 10MB.")
         else:
-            st.info(f"📁 Archivo: {uploaded_file.name} ({uploaded_file.size / 1024:.1f} KB)")
-            
-            if st.button("🚀 Procesar Completo", key="process"):
-                if uploaded_file.size > 10 * 1024 * 1024:  # 10MB
-                    show_error_message("El archivo es demasiado grande. Máximo 10MB.")
-                else:
-                    with st.spinner("Procesando archivo completo... Esto puede tomar unos minutos."):
-                        success, result = process_complete(uploaded_file, fecha_jubilacion, regimen_acceso, sexo)
-                    
-                    if success:
-                        show_success_message("Procesamiento completado exitosamente")
-                        
-                        # Mostrar resultados principales
-                        _show_process_results(result)
-                        
-                        # Botones de descarga
-                        _show_download_buttons(result)
-                    else:
-                        error_msg = result.get('error', result.get('detail', 'Error desconocido'))
-                        show_error_message(f"Error en el procesamiento: {error_msg}")
+            label = f"{uploaded_file.name} · {fecha_jubilacion} · {regimen_acceso} · {sexo}"
+            job_id = job_manager.submit(
+                label,
+                process_complete_cached,
+                make_named_file(uploaded_file.name, uploaded_file.getvalue()),
+                fecha_jubilacion,
+                regimen_acceso,
+                sexo,
+                track_progress=True
+            )
+            track_job("process", signature, job_id, label)
+    
+    _sync_process_job(signature)
+    
+    # El resultado se conserva entre reejecuciones mientras no cambien el PDF ni los parámetros
+    result = get_stored_result("process", signature)
+    if result is not None:
+        show_success_message("Procesamiento completado exitosamente")
+        _show_cache_stats()
+        
+        # Mostrar resultados principales
+        _show_process_results(result)
+        
+        # Simulación local con parámetros editables (sin llamadas a la API)
+        _show_local_simulation(result)
+        
+        # Botones de descarga
+        _show_download_buttons(result)
+
+
+def _show_sweep_form():
+    """Mostrar el formulario de barrido de fechas de jubilación y su resultado"""
+    uploaded_file = st.file_uploader(
+        "Selecciona un archivo PDF",
+        type=['pdf'],
+        help="Archivo PDF con bases de cotización de la Seguridad Social (máximo 10MB)",
+        key="sweep_file"
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        desde = st.text_input("📅 Desde", placeholder="MM/YYYY", key="sweep_desde")
+        regimenes = st.multiselect("⚙️ Regímenes de Acceso", ["GENERAL", "AUTONOMO"], default=["GENERAL"])
+    with col2:
+        hasta = st.text_input("📅 Hasta", placeholder="MM/YYYY", key="sweep_hasta")
+        sexos = st.multiselect("👤 Sexo del Cotizante", ["MASCULINO", "FEMENINO"], default=["MASCULINO"])
+    
+    max_workers = st.slider(
+        "🔀 Simulaciones simultáneas",
+        min_value=1,
+        max_value=BATCH_WORKERS_LIMIT,
+        value=min(SWEEP_MAX_WORKERS, BATCH_WORKERS_LIMIT),
+        key="sweep_workers"
+    )
+    
+    if uploaded_file is None or not desde or not hasta or not regimenes or not sexos:
+        clear_result("sweep")
+        return
+    
+    if not is_mes_anyo(desde) or not is_mes_anyo(hasta):
+        clear_result("sweep")
+        show_error_message("Formato de fecha incorrecto. Use MM/YYYY con un mes entre 01 y 12")
+        return
+    
+    try:
+        fechas = month_range(desde, hasta)
+    except ValueError as e:
+        clear_result("sweep")
+        show_error_message(str(e))
+        return
+    total = len(fechas) * len(regimenes) * len(sexos)
+    if not fechas:
+        show_error_message("La fecha inicial debe ser anterior o igual a la final")
+        return
+    if total > SWEEP_MAX_SIMULATIONS:
+        show_error_message(f"El barrido tiene {total} simulaciones. Máximo {SWEEP_MAX_SIMULATIONS}.")
+        return
+    if uploaded_file.size > 10 * 1024 * 1024:  # 10MB
+        show_error_message("El archivo es demasiado grande. Máximo 10MB.")
+        return
+    
+    signature = input_signature(
+        uploaded_file,
+        desde=desde,
+        hasta=hasta,
+        regimenes=",".join(regimenes),
+        sexos=",".join(sexos)
+    )
+    
+    if st.button(f"📈 Ejecutar {total} simulaciones", key="sweep_run"):
+        items = build_sweep_items(uploaded_file.name, uploaded_file.getvalue(), fechas, regimenes, sexos)
+        progress = st.progress(0.0, text="Ejecutando barrido...")
+        outcomes = []
+        
+        for item, success, result in run_parallel(items, process_batch_item, max_workers):
+            outcomes.append({"item": item, "success": success, "result": result})
+            progress.progress(len(outcomes) / total, text=f"Simulaciones completadas: {len(outcomes)} de {total}")
+        
+        progress.empty()
+        df = sweep_frame(outcomes)
+        store_result("sweep", signature, {"grid": df, "excel": sweep_to_excel(df)})
+    
+    sweep = get_stored_result("sweep", signature)
+    if sweep is not None and not sweep["grid"].empty:
+        _show_sweep_results(sweep["grid"], sweep["excel"])
+
+
+def _show_sweep_results(df, excel_data):
+    """Mostrar gráficas y rejilla del barrido"""
+    validas = df.dropna(subset=["Base Reguladora"])
+    fallidas = len(df) - len(validas)
+    
+    if not validas.empty:
+        mejor = validas.loc[validas["Base Reguladora"].idxmax()]
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Simulaciones", len(df))
+        with col2:
+            st.metric("Mejor Base Reguladora", f"€{mejor['Base Reguladora']:.2f}")
+        with col3:
+            st.metric("Mejor Fecha", f"{mejor['Fecha Jubilación']} ({mejor['Combinación']})")
+        
+        st.subheader("📈 Base Reguladora por Fecha de Jubilación")
+        # altair es la importación más pesada de la app: solo se carga al dibujar el barrido
+        import altair as alt
+        chart = alt.Chart(validas).mark_line(point=True).encode(
+            x=alt.X("Ordinal:Q", title="Fecha de Jubilación", axis=alt.Axis(labelExpr="timeFormat(datetime(floor(datum.value / 12), datum.value % 12, 1), '%m/%Y')")),
+            y=alt.Y("Base Reguladora:Q", title="Base Reguladora (€)", scale=alt.Scale(zero=False)),
+            color=alt.Color("Combinación:N"),
+            shape=alt.Shape("Cálculo Elegido:N"),
+            tooltip=["Fecha Jubilación", "Combinación", "Base Reguladora", "Cálculo Elegido",
+                     "BR Reforma RD 2/2023", "BR Pre-reforma"]
+        )
+        st.altair_chart(chart, use_container_width=True)
+    
+    if fallidas:
+        show_error_message(f"{fallidas} simulaciones fallaron")
+    
+    st.dataframe(df.drop(columns=["Ordinal"]), use_container_width=True, hide_index=True)
+    
+    col_download1, col_download2 = st.columns(2)
+    with col_download1:
+        st.download_button(
+            label="📊 Descargar Rejilla (Excel)",
+            data=excel_data,
+            file_name=f"barrido_jubilacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="download_sweep_excel"
+        )
+    with col_download2:
+        st.download_button(
+            label="📄 Descargar Rejilla (CSV)",
+            data=df.drop(columns=["Ordinal"]).to_csv(index=False).encode("utf-8-sig"),
+            file_name=f"barrido_jubilacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            key="download_sweep_csv"
+        )
+
+
+def _upload_progress(barra):
+    """Callback de subida que actualiza una barra de progreso de Streamlit"""
+    def progress(sent, total):
+        if sent < total:
+            barra.progress(sent / total, text=f"📤 Subiendo PDF: {sent / 1024:.0f} de {total / 1024:.0f} KB")
+        else:
+            barra.progress(1.0, text="⏳ Extrayendo bases de cotización en el servidor...")
+    return progress
+
+
+def _sync_process_job(signature):
+    """Consultar el último trabajo de las entradas actuales y mostrar su estado"""
+    tracked = next(
+        (t for t in get_tracked_jobs("process") if t["signature"] == signature and not t["consumed"]),
+        None
+    )
+    if tracked is None:
+        return
+    
+    job = job_manager.get(tracked["job_id"])
+    if job is None:
+        tracked["consumed"] = True
+    elif not job.finished:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            if job.uploading:
+                st.progress(
+                    job.upload_sent / job.upload_total,
+                    text=f"📤 Subiendo PDF: {job.upload_sent / 1024:.0f} de {job.upload_total / 1024:.0f} KB"
+                )
+            else:
+                st.info(f"⏳ Procesando ({job.status}, {job.elapsed:.0f} s)... Esto puede tomar unos minutos. Puedes navegar por la aplicación mientras tanto.")
+        with col2:
+            if st.button("⛔ Cancelar", key=f"cancel_{job.job_id}"):
+                job_manager.cancel(job.job_id)
+                st.rerun()
+    else:
+        tracked["consumed"] = True
+        if job.status == DONE:
+            store_result("process", signature, job.result)
+        elif job.status == FAILED:
+            clear_result("process")
+            error_msg = job.result.get('error', job.result.get('detail', 'Error desconocido'))
+            show_error_message(f"Error en el procesamiento: {error_msg}")
+        else:
+            st.warning("⚠️ Procesamiento cancelado")
+
+
+def _show_session_jobs():
+    """
+    Mostrar los trabajos lanzados en esta sesión y las métricas del pool
+    
+    Returns:
+        bool: True si algún trabajo de la sesión sigue activo
+    """
+    tracked = get_tracked_jobs("process")
+    if not tracked:
+        return False
+    
+    jobs = [(t, job_manager.get(t["job_id"])) for t in tracked]
+    jobs = [(t, job) for t, job in jobs if job is not None]
+    if not jobs:
+        return False
+    
+    st.markdown("---")
+    st.subheader("🗂️ Trabajos de esta Sesión")
+    
+    stats = job_manager.get_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("En Cola", stats["queue_depth"])
+    with col2:
+        st.metric("En Curso", stats["running"])
+    with col3:
+        st.metric("Latencia p50", f"{stats['latency_p50']:.1f} s" if stats["latency_p50"] is not None else "N/A")
+    with col4:
+        st.metric("Latencia p95", f"{stats['latency_p95']:.1f} s" if stats["latency_p95"] is not None else "N/A")
+    
+    st.dataframe(
+        pd.DataFrame([
+            {"Trabajo": job.job_id, "Descripción": t["label"], "Estado": job.status, "Duración (s)": round(job.elapsed, 1)}
+            for t, job in jobs
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    terminados = {f"{t['label']} ({job.job_id})": job for t, job in jobs if job.status == DONE}
+    if terminados:
+        with st.expander("📂 Ver resultado de un trabajo terminado"):
+            seleccion = st.selectbox("Trabajo", list(terminados), key="session_job_select")
+            job = terminados[seleccion]
+            _show_process_results(job.result)
+            _show_download_buttons(job.result, key_suffix=f"_{job.job_id}")
+    
+    return any(not job.finished for _, job in jobs)
 
 
+@timed_page("batch")
+def show_batch_page():
+    """Mostrar la página de procesamiento por lotes"""
+    st.header("📦 Procesamiento por Lotes")
+    
+    show_info_message(
+        "Procesa varios PDFs a la vez. Las llamadas al backend se ejecutan en paralelo y al final puedes descargar un ZIP con un Excel por cliente."
+    )
+    
+    uploaded_files = st.file_uploader(
+        "Selecciona los archivos PDF",
+        type=['pdf'],
+        accept_multiple_files=True,
+        help="Archivos PDF con bases de cotización de la Seguridad Social (máximo 10MB cada uno)",
+        key="batch_files"
+    )
+    
+    if not uploaded_files:
+        clear_result("batch")
+        return
+    
+    usar_mismos = st.checkbox("Usar los mismos parámetros para todos los archivos", value=True)
+    
+    if usar_mismos:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            fecha_jubilacion = st.text_input("📅 Fecha de Jubilación", placeholder="MM/YYYY", key="batch_fecha")
+        with col2:
+            regimen_acceso = st.selectbox("⚙️ Régimen de Acceso", ["GENERAL", "AUTONOMO"], key="batch_regimen")
+        with col3:
+            sexo = st.selectbox("👤 Sexo del Cotizante", ["MASCULINO", "FEMENINO"], key="batch_sexo")
+        parametros = pd.DataFrame({
+            "Archivo": [f.name for f in uploaded_files],
+            "Fecha Jubilación": fecha_jubilacion,
+            "Régimen": regimen_acceso,
+            "Sexo": sexo
+        })
+    else:
+        parametros = st.data_editor(
+            pd.DataFrame({
+                "Archivo": [f.name for f in uploaded_files],
+                "Fecha Jubilación": "",
+                "Régimen": "GENERAL",
+                "Sexo": "MASCULINO"
+            }),
+            column_config={
+                "Archivo": st.column_config.TextColumn(disabled=True),
+                "Fecha Jubilación": st.column_config.TextColumn(help="Formato: MM/YYYY"),
+                "Régimen": st.column_config.SelectboxColumn(options=["GENERAL", "AUTONOMO"], required=True),
+                "Sexo": st.column_config.SelectboxColumn(options=["MASCULINO", "FEMENINO"], required=True)
+            },
+            hide_index=True,
+            use_container_width=True,
+            key="batch_params"
+        )
+    
+    max_workers = st.slider(
+        "🔀 Llamadas simultáneas",
+        min_value=1,
+        max_value=BATCH_WORKERS_LIMIT,
+        value=min(BATCH_MAX_WORKERS, BATCH_WORKERS_LIMIT),
+        help="Número máximo de archivos procesándose a la vez en el backend"
+    )
+    
+    items = []
+    errores = []
+    for uploaded_file, fila in zip(uploaded_files, parametros.itertuples(index=False)):
+        fecha = (fila[1] or "").strip()
+        if not is_mes_anyo(fecha):
+            errores.append(f"{uploaded_file.name}: fecha incorrecta, use MM/YYYY con un mes entre 01 y 12")
+        elif uploaded_file.size > 10 * 1024 * 1024:  # 10MB
+            errores.append(f"{uploaded_file.name}: el archivo es demasiado grande (máximo 10MB)")
+        else:
+            items.append({
+                "name": uploaded_file.name,
+                "bytes": uploaded_file.getvalue(),
+                "fecha_jubilacion": fecha,
+                "regimen_acceso": fila[2],
+                "sexo": fila[3]
+            })
+    
+    signature = input_signature(
+        archivos="|".join(f"{f.file_id}:{f.name}:{f.size}" for f in uploaded_files),
+        parametros=parametros.to_json()
+    )
+    
+    if errores:
+        show_error_message("Revisa los parámetros antes de procesar:<br>" + "<br>".join(errores))
+    elif st.button(f"📦 Procesar {len(items)} archivos", key="batch_process"):
+        progress = st.progress(0.0, text="Procesando lote...")
+        estado = st.empty()
+        outcomes = []
+        
+        for item, success, result in run_parallel(items, process_batch_item, max_workers):
+            outcomes.append({"item": item, "success": success, "result": result})
+            progress.progress(len(outcomes) / len(items), text=f"Procesados {len(outcomes)} de {len(items)}")
+            estado.dataframe(_batch_status_frame(outcomes), use_container_width=True, hide_index=True)
+        
+        progress.empty()
+        estado.empty()
+        store_result("batch", signature, {
+            "outcomes": [{**o, "item": {k: v for k, v in o["item"].items() if k != "bytes"}} for o in outcomes],
+            "zip": build_batch_zip(outcomes)
+        })
+    
+    batch = get_stored_result("batch", signature)
+    if batch is not None:
+        outcomes = batch["outcomes"]
+        fallidos = sum(1 for o in outcomes if not o["success"])
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Archivos", len(outcomes))
+        with col2:
+            st.metric("Correctos", len(outcomes) - fallidos)
+        with col3:
+            st.metric("Fallidos", fallidos)
+        
+        st.dataframe(_batch_status_frame(outcomes), use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            label="🗜️ Descargar ZIP con Excel por cliente",
+            data=batch["zip"],
+            file_name=f"lote_bases_cotizacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+            mime="application/zip",
+            key="download_batch"
+        )
+
+
+def _batch_status_frame(outcomes):
+    """Construir la tabla de estado por archivo del lote"""
+    return pd.DataFrame([
+        {
+            "Archivo": o["item"]["name"],
+            "Fecha Jubilación": o["item"]["fecha_jubilacion"],
+            "Estado": "✅ OK" if o["success"] else "❌ Error",
+            "Base Reguladora": o["result"].get("estadisticas", {}).get("base_reguladora") if o["success"] else None,
+            "Detalle": "" if o["success"] else str(o["result"].get("error", o["result"].get("detail", "Error desconocido")))
+        }
+        for o in outcomes
+    ])
+
+
+@timed_page("config")
 def show_config_page():
     """Mostrar la página de configuración"""
     st.header("⚙️ Configuración del Sistema")
@@ -177,30 +702,48 @@ def show_config_page():
         "Consulta los parámetros de configuración cargados en el sistema para cálculos y simulaciones."
     )
     
+    signature = input_signature()
+    
     if st.button("🔄 Cargar Configuración"):
         with st.spinner("Cargando configuración..."):
             success, configs = get_configuration()
         
         if success:
-            st.success("✅ Configuración cargada correctamente")
-            
-            # Mostrar cada tipo de configuración
-            _show_parametros_computo(configs)
-            _show_indices_revalorizacion(configs)
-            _show_topes_cotizacion(configs)
-            
-            # Botón para descargar toda la configuración
-            json_data = json.dumps(configs, indent=2, ensure_ascii=False)
-            st.download_button(
-                label="📥 Descargar Configuración Completa (JSON)",
-                data=json_data,
-                file_name=f"configuracion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                key="download_config"
-            )
+            store_result("config", signature, configs)
         else:
+            clear_result("config")
             error_msg = configs.get('error', 'Error desconocido')
             show_error_message(f"Error cargando configuración: {error_msg}")
+    
+    configs = get_stored_result("config", signature)
+    if configs is not None:
+        st.success("✅ Configuración cargada correctamente")
+        
+        # Mostrar cada tipo de configuración
+        _show_parametros_computo(configs)
+        _show_indices_revalorizacion(configs)
+        _show_topes_cotizacion(configs)
+        
+        # Botón para descargar toda la configuración
+        json_data = get_json_text(configs)
+        st.download_button(
+            label="📥 Descargar Configuración Completa (JSON)",
+            data=json_data,
+            file_name=f"configuracion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json",
+            key="download_config"
+        )
+
+
+def _show_cache_stats():
+    """Mostrar estadísticas de la caché de resultados"""
+    stats = get_cache_stats()
+    st.caption(
+        f"⚡ Caché de resultados: {stats['hit_rate']:.0%} de aciertos "
+        f"({stats['memory_hits'] + stats['disk_hits']} de {stats['memory_hits'] + stats['disk_hits'] + stats['misses']}) · "
+        f"{stats['bytes_saved'] / 1024:.1f} KB ahorrados"
+        + (f" · {stats['coalesced']} llamadas compartidas con otra idéntica en curso" if stats["coalesced"] else "")
+    )
 
 
 def _show_process_results(result):
@@ -237,77 +780,127 @@ def _show_process_results(result):
                 st.write(f"**Período:** {periodo.get('desde', '')} - {periodo.get('hasta', '')}")
 
 
-def _show_download_buttons(result):
+def _show_local_simulation(result):
+    """Mostrar el cálculo local de la base reguladora con parámetros editables"""
+    parametros = result.get("parametros_computo", {})
+    if not result.get("bases_procesadas") or "divisor_base_reguladora" not in parametros:
+        return
+    
+    with st.expander("🧮 Simulación local (sin llamadas a la API)"):
+        discrepancias = verify_against_result(result)
+        if discrepancias:
+            st.warning(f"⚠️ El cálculo local difiere del backend en {len(discrepancias)} valores")
+        else:
+            st.caption("✅ El cálculo local coincide con el del backend para ambas reglas (RD 2/2023 y pre-reforma)")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bases_incluidas = st.number_input(
+                "Bases Incluidas", min_value=1, value=int(parametros["bases_incluidas"]), step=1, key="local_bases"
+            )
+        with col2:
+            periodo_meses = st.number_input(
+                "Período (meses)", min_value=1, value=int(parametros.get("periodo_meses") or parametros["bases_incluidas"]),
+                step=1, key="local_periodo"
+            )
+        with col3:
+            divisor = st.number_input(
+                "Divisor", min_value=0.01, value=float(parametros["divisor_base_reguladora"]), step=1.0, key="local_divisor"
+            )
+        
+        reglas = reglas_from_result(result)
+        reglas["simulacion"] = {"bases_incluidas": bases_incluidas, "periodo_meses": periodo_meses, "divisor": divisor}
+        calculos = recompute_result(result, reglas)
+        simulacion = calculos["simulacion"]
+        base_backend = result.get("estadisticas", {}).get("base_reguladora", 0)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric(
+                "Base Reguladora Simulada",
+                f"€{simulacion['base_reguladora']:.2f}",
+                delta=f"{simulacion['base_reguladora'] - base_backend:+.2f} €"
+            )
+        with col2:
+            st.metric("Bases Usadas", simulacion["total_bases"])
+        with col3:
+            st.metric("Suma Total", f"€{simulacion['suma_total']:.2f}")
+        
+        st.dataframe(
+            pd.DataFrame.from_dict(calculos, orient="index"),
+            use_container_width=True
+        )
+
+
+def _show_download_buttons(result, key_suffix=""):
     """Mostrar botones de descarga"""
     st.subheader("📥 Descargar Resultados")
     
-    col_download1, col_download2 = st.columns(2)
+    col_download1, col_download2, col_download3 = st.columns(3)
     
     with col_download1:
         # Generar Excel
-        excel_data = generate_excel_from_process_result(result)
+        excel_data = get_excel_bytes(result)
         if excel_data:
             st.download_button(
                 label="📊 Descargar Excel Editable",
                 data=excel_data,
                 file_name=f"bases_cotizacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                key="download_excel",
+                key=f"download_excel{key_suffix}",
                 help="Excel con pestañas separadas y fórmulas dinámicas para edición"
             )
     
     with col_download2:
         # JSON para desarrollo
-        json_data = json.dumps(result, indent=2, ensure_ascii=False)
+        json_data = get_json_text(result)
         st.download_button(
             label="🔨 Descargar JSON (Debug)",
             data=json_data,
             file_name=f"procesamiento_completo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             mime="application/json",
-            key="download_process",
+            key=f"download_process{key_suffix}",
             help="Archivo JSON completo para desarrollo y depuración"
         )
+    
+    with col_download3:
+        st.download_button(
+            label="📦 Descargar Parquet",
+            data=get_parquet_zip(result),
+            file_name=f"procesamiento_parquet_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+            mime="application/zip",
+            key=f"download_parquet{key_suffix}",
+            help="Bases, estadísticas y comparativa en Parquet con columnas tipadas, para análisis"
+        )
 
 
 def _show_parametros_computo(configs):
     """Mostrar parámetros de cómputo"""
     if "parametros" in configs:
         st.subheader("📊 Parámetros de Cómputo")
-        params_data = configs["parametros"]["data"]
-        
-        params = None
-        if params_data:
-            if "parametros_computo_anual" in params_data:
-                params = params_data["parametros_computo_anual"]
-            else:
-                params = params_data
-        
-        if params and isinstance(params, dict):
-            df_params = []
-            for año, datos in params.items():
-                if isinstance(datos, dict):
-                    df_params.append({
-                        "Año": año,
-                        "Bases Incluidas": datos.get("bases_incluidas", datos.get("numero_bases", "N/A")),
-                        "Período (meses)": datos.get("periodo_meses", "N/A"),
-                        "Divisor Base Reguladora": datos.get("divisor_base_reguladora", datos.get("divisor", "N/A"))
-                    })
-            
-            if df_params:
-                df = pd.DataFrame(df_params)
-                df = df.sort_values('Año', ascending=False)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Años", len(df_params))
-                with col2:
-                    último_año = max(params.keys())
-                    st.metric("Último Año", último_año)
-                with col3:
-                    if df_params:
-                        primer_año = min(params.keys())
-                        st.metric("Primer Año", primer_año)
+        index = get_config_index(configs)
+        parametros = index.parametros
+
+        if len(parametros):
+            st.dataframe(
+                index.parametros_frame(),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Año": st.column_config.NumberColumn(format="%d"),
+                    "Bases Incluidas": st.column_config.NumberColumn(format="%d"),
+                    "Período (meses)": st.column_config.NumberColumn(format="%d"),
+                    "Divisor Base Reguladora": st.column_config.NumberColumn(format="%.2f")
+                }
+            )
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Años", len(parametros))
+            with col2:
+                st.metric("Último Año", str(parametros.years[-1]))
+            with col3:
+                st.metric("Primer Año", str(parametros.years[0]))
         else:
             st.warning("⚠️ No se pudieron procesar los parámetros de cómputo")
 
@@ -316,66 +909,40 @@ def _show_indices_revalorizacion(configs):
     """Mostrar índices de revalorización"""
     if "indices" in configs:
         st.subheader("📈 Índices de Revalorización")
-        indices_data = configs["indices"]["data"]
-        
-        indices = None
-        if indices_data:
-            if "indices_revalorizacion" in indices_data:
-                indices = indices_data["indices_revalorizacion"]
-            else:
-                indices = indices_data
-        
-        if indices and isinstance(indices, dict):
-            total_indices = len(indices)
-            fechas = list(indices.keys())
-            if fechas:
-                desde = min(fechas)
-                hasta = max(fechas)
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Índices", total_indices)
-                with col2:
-                    st.metric("Desde", desde)
-                with col3:
-                    st.metric("Hasta", hasta)
-            
-            # Mostrar tabla de índices
-            def sort_key(fecha):
-                try:
-                    mes, año = fecha.split('/')
-                    return (int(año), int(mes))
-                except:
-                    return (0, 0)
-            
-            sorted_dates = sorted(indices.keys(), key=sort_key, reverse=True)
-            
-            df_indices = []
-            for fecha in sorted_dates:
-                indice = indices[fecha]
-                df_indices.append({
-                    "Fecha (MM/YYYY)": fecha,
-                    "Índice de Revalorización": f"{indice:.6f}"
-                })
-            
-            if df_indices:
-                st.write(f"**📊 Todos los índices de revalorización ({len(df_indices)} registros):**")
-                df = pd.DataFrame(df_indices)
-                st.dataframe(df, use_container_width=True, hide_index=True, height=400)
-                
-                # Estadísticas básicas
-                valores = list(indices.values())
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Índice Promedio", f"{sum(valores)/len(valores):.6f}")
-                with col2:
-                    st.metric("Índice Máximo", f"{max(valores):.6f}")
-                with col3:
-                    st.metric("Índice Mínimo", f"{min(valores):.6f}")
-                
-                ultimo_fecha = sorted_dates[0]
-                ultimo_indice = indices[ultimo_fecha]
-                st.info(f"📅 **Último índice disponible**: {ultimo_fecha} - Valor: {ultimo_indice:.6f}")
+        index = get_config_index(configs)
+        stats = index.indices_stats
+
+        if stats["total"]:
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Índices", stats["total"])
+            with col2:
+                st.metric("Desde", stats["desde"])
+            with col3:
+                st.metric("Hasta", stats["hasta"])
+
+            # Mostrar tabla de índices (del más reciente al más antiguo)
+            st.write(f"**📊 Todos los índices de revalorización ({stats['total']} registros):**")
+            st.dataframe(
+                index.indices_frame(),
+                use_container_width=True,
+                hide_index=True,
+                height=400,
+                column_config={
+                    "Índice de Revalorización": st.column_config.NumberColumn(format="%.6f")
+                }
+            )
+
+            # Estadísticas básicas
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Índice Promedio", f"{stats['mean']:.6f}")
+            with col2:
+                st.metric("Índice Máximo", f"{stats['max']:.6f}")
+            with col3:
+                st.metric("Índice Mínimo", f"{stats['min']:.6f}")
+
+            st.info(f"📅 **Último índice disponible**: {stats['latest']} - Valor: {stats['latest_value']:.6f}")
         else:
             st.warning("⚠️ No se pudieron procesar los índices de revalorización")
 
@@ -384,47 +951,38 @@ def _show_topes_cotizacion(configs):
     """Mostrar topes de cotización"""
     if "topes" in configs:
         st.subheader("💰 Topes de Cotización")
-        topes_data = configs["topes"]["data"]
-        
-        topes = None
-        if topes_data:
-            if "topes_cotizacion" in topes_data:
-                topes = topes_data["topes_cotizacion"]
-            else:
-                topes = topes_data
-        
-        if topes and isinstance(topes, dict):
-            df_topes = []
-            for año, datos in topes.items():
-                if isinstance(datos, dict):
-                    base_min = datos.get('base_minima_mensual', 0)
-                    base_max = datos.get('base_maxima_mensual', 0)
-                    df_topes.append({
-                        "Año": año,
-                        "Base Mínima Mensual": f"€{base_min:.2f}",
-                        "Base Máxima Mensual": f"€{base_max:.2f}",
-                        "Diferencia": f"€{base_max - base_min:.2f}"
-                    })
-            
-            if df_topes:
-                df = pd.DataFrame(df_topes)
-                df = df.sort_values('Año', ascending=False)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                ultimo_año = max(topes.keys())
-                ultimo_datos = topes[ultimo_año]
-                
-                with col1:
-                    st.metric("Total Años", len(df_topes))
-                with col2:
-                    st.metric("Último Año", ultimo_año)
-                with col3:
-                    st.metric("Mínima Actual", f"€{ultimo_datos.get('base_minima_mensual', 0):.2f}")
-                with col4:
-                    st.metric("Máxima Actual", f"€{ultimo_datos.get('base_maxima_mensual', 0):.2f}")
-                
-                st.success(f"🎯 **Bases de cotización para {ultimo_año}**: Desde €{ultimo_datos.get('base_minima_mensual', 0):.2f} hasta €{ultimo_datos.get('base_maxima_mensual', 0):.2f} mensuales")
+        index = get_config_index(configs)
+        topes = index.topes
+
+        if len(topes):
+            st.dataframe(
+                index.topes_frame(),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Año": st.column_config.NumberColumn(format="%d"),
+                    "Base Mínima Mensual": st.column_config.NumberColumn(format="€%.2f"),
+                    "Base Máxima Mensual": st.column_config.NumberColumn(format="€%.2f"),
+                    "Diferencia": st.column_config.NumberColumn(format="€%.2f")
+                }
+            )
+
+            col1, col2, col3, col4 = st.columns(4)
+
+            ultimo_año = int(topes.years[-1])
+            ultimo_datos = topes.row(ultimo_año)
+            base_min = 0 if np.isnan(ultimo_datos["base_minima"]) else ultimo_datos["base_minima"]
+            base_max = 0 if np.isnan(ultimo_datos["base_maxima"]) else ultimo_datos["base_maxima"]
+
+            with col1:
+                st.metric("Total Años", len(topes))
+            with col2:
+                st.metric("Último Año", str(ultimo_año))
+            with col3:
+                st.metric("Mínima Actual", f"€{base_min:.2f}")
+            with col4:
+                st.metric("Máxima Actual", f"€{base_max:.2f}")
+
+            st.success(f"🎯 **Bases de cotización para {ultimo_año}**: Desde €{base_min:.2f} hasta €{base_max:.2f} mensuales")
         else:
-            st.warning("⚠️ No se pudieron procesar los topes de cotización") 
\ No newline at end of file
+            st.warning("⚠️ No se pudieron procesar los topes de cotización")
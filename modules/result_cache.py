@@ -0,0 +1,307 @@
+"""
+Módulo de caché de resultados por contenido
+Evita repetir extracciones y procesamientos de un mismo PDF con los mismos parámetros
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from .api_client import process_complete, get_configuration, get_config_version
+from .bases_table import compact_result, expand_result
+from .local_extraction import extract_bases_with_fallback
+from .lru_cache import LRUCache
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Configuración de la caché (el nivel en disco guarda datos personales: vacío lo desactiva)
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+RESULT_CACHE_MEMORY_ITEMS = int(os.environ.get("RESULT_CACHE_MEMORY_ITEMS", "64"))
+RESULT_CACHE_DISK_BYTES = int(os.environ.get("RESULT_CACHE_DISK_BYTES", str(200 * 1024 * 1024)))
+
+
+def get_file_bytes(file):
+    """
+    Obtener el contenido binario de un archivo subido
+
+    Args:
+        file: UploadedFile de Streamlit o cualquier objeto tipo archivo
+
+    Returns:
+        bytes: Contenido del archivo
+    """
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    position = file.tell()
+    file.seek(0)
+    data = file.read()
+    file.seek(position)
+    return data
+
+
+def compute_key(kind, file_bytes, **params):
+    """
+    Calcular la clave de caché de una llamada
+
+    Args:
+        kind (str): Tipo de llamada (extract, process)
+        file_bytes (bytes): Contenido del PDF
+        **params: Parámetros de la llamada que afectan al resultado
+
+    Returns:
+        str: Huella SHA-256 en hexadecimal
+    """
+    digest = hashlib.sha256()
+    digest.update(kind.encode())
+    digest.update(hashlib.sha256(file_bytes).digest())
+    for name in sorted(params):
+        digest.update(f"|{name}={params[name]}".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Caché de dos niveles: LRU en memoria y directorio en disco con expulsión por tamaño
+
+    En memoria, bases_procesadas se guarda en formato columnar (BasesTable) y se
+    reconstruye al leer. El directorio y sus ficheros solo son legibles por el
+    usuario del proceso.
+
+    Args:
+        directory (str): Directorio del nivel en disco (vacío o None: solo memoria)
+        max_items (int): Entradas máximas del nivel en memoria
+        max_disk_bytes (int): Tamaño máximo del nivel en disco
+    """
+
+    def __init__(self, directory, max_items, max_disk_bytes):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = LRUCache(max_items)
+        self._disk_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bytes_saved": 0}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _count(self, name, saved_bytes=0):
+        with self._stats_lock:
+            self.stats[name] += 1
+            self.stats["bytes_saved"] += saved_bytes
+
+    def get(self, key, upload_bytes=0, count_miss=True):
+        """
+        Buscar un resultado en memoria y, si no está, en disco
+
+        Args:
+            key (str): Clave de caché
+            upload_bytes (int): Bytes de subida que se ahorran en caso de acierto
+            count_miss (bool): Contar el fallo en las estadísticas (False al volver a mirar)
+
+        Returns:
+            dict or None: Resultado cacheado
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._count("memory_hits", upload_bytes + entry["size"])
+            return expand_result(entry["result"])
+
+        if not self.directory:
+            if count_miss:
+                self._count("misses")
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                raw = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            if count_miss:
+                self._count("misses")
+            return None
+
+        try:
+            result = json.loads(raw)
+        except ValueError as e:
+            # Fichero truncado o corrupto: se descarta y cuenta como fallo
+            logger.warning("Entrada de caché en disco corrupta (%s), se descarta: %s", key, e)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            if count_miss:
+                self._count("misses")
+            return None
+        self._memory.put(key, {"result": compact_result(result), "size": len(raw)})
+        self._count("disk_hits", upload_bytes + len(raw))
+        return result
+
+    def put(self, key, result):
+        """
+        Guardar un resultado en ambos niveles
+
+        Args:
+            key (str): Clave de caché
+            result (dict): Resultado a guardar
+        """
+        raw = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._memory.put(key, {"result": compact_result(result), "size": len(raw)})
+        if not self.directory:
+            return
+
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with self._disk_lock:
+                tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+                with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                    f.write(raw)
+                os.replace(tmp_path, self._path(key))
+                self._evict_disk()
+        except OSError as e:
+            logger.warning("Error escribiendo caché en disco: %s", e)
+
+    def _evict_disk(self):
+        """Eliminar los ficheros menos usados hasta respetar el tamaño máximo"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(".json"):
+                    info = item.stat()
+                    entries.append((info.st_mtime, info.st_size, item.path))
+                    total += info.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def get_stats(self):
+        """
+        Obtener estadísticas de la caché
+
+        Returns:
+            dict: Aciertos por nivel, fallos, tasa de aciertos y bytes ahorrados
+        """
+        with self._stats_lock:
+            stats = dict(self.stats)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["memory_items"] = len(self._memory)
+        return stats
+
+
+_cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MEMORY_ITEMS, RESULT_CACHE_DISK_BYTES)
+
+
+def _private_copy(outcome):
+    """Copia de (success, result) para cada sesión que esperaba la misma llamada"""
+    success, result = outcome
+    return success, copy.deepcopy(result)
+
+
+# Llamadas en curso compartidas entre sesiones, con la misma clave que la caché
+_flights = {
+    "extract": SingleFlight("extract", copy=_private_copy),
+    "process": SingleFlight("process", copy=_private_copy)
+}
+
+
+def _call_and_store(key, fn, *args, upload_bytes=0, progress=None):
+    """
+    Llamar al backend y guardar el resultado si es correcto (solo lo ejecuta el primero de cada clave)
+
+    Se vuelve a mirar la caché: la llamada anterior con la misma clave puede
+    haber terminado entre el fallo de caché y el inicio de esta.
+    """
+    result = _cache.get(key, upload_bytes=upload_bytes, count_miss=False)
+    if result is not None:
+        return True, result
+    success, result = fn(*args, progress=progress)
+    if success:
+        _cache.put(key, result)
+    return success, result
+
+
+def extract_bases_cached(file, progress=None):
+    """
+    Versión cacheada de extract_bases
+
+    Con LOCAL_EXTRACTION=1, el PDF se extrae primero en local y solo se envía al
+    backend cuando la confianza es baja (ver local_extraction).
+
+    Args:
+        file: Archivo PDF subido
+        progress (callable): progress(bytes_enviados, total) durante la subida (opcional)
+
+    Returns:
+        tuple: (success: bool, result: dict)
+    """
+    file_bytes = get_file_bytes(file)
+    key = compute_key("extract", file_bytes)
+
+    result = _cache.get(key, upload_bytes=len(file_bytes))
+    if result is not None:
+        return True, result
+
+    return _flights["extract"].do(
+        key, _call_and_store, key, extract_bases_with_fallback, file, upload_bytes=len(file_bytes), progress=progress
+    )
+
+
+def process_complete_cached(file, fecha_jubilacion, regimen_acceso, sexo, progress=None):
+    """
+    Versión cacheada de process_complete
+
+    La clave incluye la versión de configuración, de modo que un cambio de
+    índices o parámetros en el backend invalida los resultados anteriores.
+
+    Args:
+        file: Archivo PDF subido
+        fecha_jubilacion (str): Fecha en formato MM/YYYY
+        regimen_acceso (str): GENERAL o AUTONOMO
+        sexo (str): MASCULINO o FEMENINO
+        progress (callable): progress(bytes_enviados, total) durante la subida (opcional)
+
+    Returns:
+        tuple: (success: bool, result: dict)
+    """
+    config_version = get_config_version()
+    if config_version is None:
+        # Sin configuración cacheada todavía: se carga una vez para tener versión
+        get_configuration()
+        config_version = get_config_version()
+    file_bytes = get_file_bytes(file)
+    key = compute_key(
+        "process",
+        file_bytes,
+        fecha_jubilacion=fecha_jubilacion,
+        regimen_acceso=regimen_acceso,
+        sexo=sexo,
+        config_version=config_version
+    )
+
+    result = _cache.get(key, upload_bytes=len(file_bytes))
+    if result is not None:
+        return True, result
+
+    return _flights["process"].do(
+        key, _call_and_store, key, process_complete, file, fecha_jubilacion, regimen_acceso, sexo,
+        upload_bytes=len(file_bytes), progress=progress
+    )
+
+
+def get_cache_stats():
+    """Obtener estadísticas de la caché de resultados y de las llamadas deduplicadas"""
+    stats = _cache.get_stats()
+    stats["coalesced"] = sum(flight.get_stats()["coalesced"] for flight in _flights.values())
+    return stats
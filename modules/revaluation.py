@@ -0,0 +1,163 @@
+"""
+Módulo de revalorización local de bases
+Combina las bases extraídas con los índices de revalorización cacheados sin volver a llamar a /api/process
+"""
+
+import numpy as np
+
+from .api_client import get_config_version
+from .artifacts import result_fingerprint
+from .config_index import get_config_index
+from .local_engine import is_mes_anyo, mes_anyo_to_ordinal, ordinal_to_mes_anyo, compute_estadisticas
+from .lru_cache import LRUCache
+
+# Meses inmediatamente anteriores a la jubilación que no se revalorizan
+MESES_NO_REVALORIZADOS = 24
+
+_local_results = LRUCache(32)
+
+
+def revalue_bases(bases, index, fecha_jubilacion):
+    """
+    Revalorizar las bases extraídas respecto a una fecha de jubilación
+
+    Las bases del mismo mes se agrupan como pluriactividad (con el tope máximo del
+    año si está disponible). Los 24 meses anteriores a la jubilación quedan sin
+    revalorizar y el resto se multiplica por su índice. No se simulan meses
+    futuros ni se integran lagunas, a diferencia de /api/process.
+
+    Args:
+        bases (list): Bases de extract_bases (mes_anyo, base, empresa, regimen)
+        index (ConfigIndex): Índices y topes de la configuración
+        fecha_jubilacion (str): Fecha de jubilación MM/YYYY
+
+    Returns:
+        list: Filas con el formato de bases_procesadas, de la más reciente a la más antigua
+    """
+    validas = [b for b in bases if is_mes_anyo(b.get("mes_anyo", ""))]
+    if not validas:
+        return []
+
+    jubilacion = int(mes_anyo_to_ordinal([fecha_jubilacion])[0])
+    ordinales = mes_anyo_to_ordinal([b["mes_anyo"] for b in validas])
+    importes = np.array([b.get("base", 0) for b in validas], dtype=np.float64)
+
+    # Agrupar por mes (pluriactividad) en una sola operación
+    meses, primero, inversa, cuenta = np.unique(ordinales, return_index=True, return_inverse=True, return_counts=True)
+    base_bruta = np.bincount(inversa, weights=importes)
+    base_mes = base_bruta.copy()
+    topado = np.zeros(len(meses), dtype=bool)
+
+    # Posiciones de las bases agrupadas por mes: las del mes i son orden[inicio[i]:inicio[i] + cuenta[i]]
+    orden = np.argsort(inversa, kind="stable")
+    inicio = np.concatenate(([0], np.cumsum(cuenta)[:-1]))
+
+    pluri = np.flatnonzero(cuenta > 1)
+    if len(pluri):
+        maximos = index.topes_maximos(meses[pluri] // 12)
+        topado[pluri] = base_bruta[pluri] > maximos
+        base_mes[pluri] = np.minimum(base_bruta[pluri], maximos)
+
+    # Solo los meses anteriores a la jubilación, del más reciente al más antiguo
+    en_periodo = np.flatnonzero(meses < jubilacion)[::-1]
+    revalorizado = meses[en_periodo] < jubilacion - MESES_NO_REVALORIZADOS
+
+    indice = index.indices_lookup(meses[en_periodo])
+    indice[~revalorizado] = 1.0
+    base_final = np.round(base_mes[en_periodo] * indice, 2)
+
+    filas = []
+    for k, i in enumerate(en_periodo):
+        original = validas[primero[i]]
+        fila = {
+            "mes_anyo": ordinal_to_mes_anyo(meses[i]),
+            "base": float(base_final[k]),
+            "empresa": original.get("empresa", ""),
+            "regimen": original.get("regimen", ""),
+            "periodo": "revalorizado" if revalorizado[k] else "no_revalorizado"
+        }
+        if cuenta[i] > 1:
+            individuales = [validas[j] for j in orden[inicio[i]:inicio[i] + cuenta[i]]]
+            fila["empresa"] = f"PLURIACTIVIDAD_{cuenta[i]}_EMPRESAS"
+            fila["pluriactividad"] = {
+                "es_pluriactividad": True,
+                "bases_individuales": individuales,
+                "base_bruta": round(float(base_bruta[i]), 2),
+                "tope_aplicado": "maximo" if topado[i] else "ninguno",
+                "empresas_detalle": [b.get("empresa", "") for b in individuales]
+            }
+        if revalorizado[k]:
+            fila["base_original"] = round(float(base_mes[i]), 2)
+            fila["indice_revalorizacion"] = float(indice[k])
+        filas.append(fila)
+
+    return filas
+
+
+def build_local_result(extraction, configs, fecha_jubilacion):
+    """
+    Construir un resultado con el formato de /api/process a partir de una extracción
+
+    Los parámetros de cómputo se toman de la configuración del año de jubilación
+    a través del índice de configuración.
+
+    Args:
+        extraction (dict): Respuesta de extract_bases
+        configs (dict): Resultado de get_configuration()
+        fecha_jubilacion (str): Fecha de jubilación MM/YYYY
+
+    Returns:
+        dict: bases_procesadas, estadisticas, parametros_computo y metadatos
+    """
+    index = get_config_index(configs)
+    filas = revalue_bases(extraction.get("bases", []), index, fecha_jubilacion)
+
+    result = {
+        "bases_procesadas": filas,
+        "fecha_jubilacion": fecha_jubilacion,
+        "regimen_acceso": "",
+        "sexo": "",
+        "calculo_elegido": "local",
+        "metadata_extraccion": {
+            "total_bases_extraidas": extraction.get("total_bases", len(extraction.get("bases", []))),
+            "total_empresas": extraction.get("metadata", {}).get("total_empresas"),
+            "periodo_extraido": extraction.get("metadata", {}).get("periodo_bases", {})
+        }
+    }
+
+    datos = index.parametros_anyo(fecha_jubilacion.split("/")[1])
+    if datos and filas and datos["bases_incluidas"] > 0 and datos["divisor"] > 0:
+        parametros_computo = {
+            "bases_incluidas": int(datos["bases_incluidas"]),
+            "periodo_meses": None if np.isnan(datos["periodo_meses"]) else int(datos["periodo_meses"]),
+            "divisor_base_reguladora": int(datos["divisor"]) if datos["divisor"].is_integer() else datos["divisor"]
+        }
+        result["parametros_computo"] = parametros_computo
+        ordinales = mes_anyo_to_ordinal([f["mes_anyo"] for f in filas])
+        importes = np.array([f["base"] for f in filas], dtype=np.float64)
+        revalorizadas = np.array([f["periodo"] == "revalorizado" for f in filas])
+        result["estadisticas"] = compute_estadisticas(
+            ordinales, importes, revalorizadas, fecha_jubilacion,
+            {"local": {
+                "bases_incluidas": parametros_computo["bases_incluidas"],
+                "periodo_meses": parametros_computo["periodo_meses"],
+                "divisor": parametros_computo["divisor_base_reguladora"]
+            }}
+        )["local"]
+
+    return result
+
+
+def build_local_result_cached(extraction, configs, fecha_jubilacion):
+    """
+    Versión memorizada de build_local_result por extracción, configuración y fecha
+
+    Returns:
+        dict: Resultado con el formato de /api/process
+    """
+    key = (result_fingerprint(extraction), get_config_version(), fecha_jubilacion)
+    result = _local_results.get(key)
+    if result is None:
+        result = build_local_result(extraction, configs, fecha_jubilacion)
+        _local_results.put(key, result)
+    return result
@@ -0,0 +1,120 @@
+"""
+Módulo de almacenamiento de resultados por sesión
+Conserva los resultados de cada página entre reejecuciones de Streamlit
+"""
+
+import hashlib
+import time
+
+import streamlit as st
+
+_STORE_KEY = "_result_store"
+_JOBS_KEY = "_session_jobs"
+
+
+def input_signature(file=None, **params):
+    """
+    Calcular la firma de las entradas de una página
+
+    Args:
+        file: Archivo subido (UploadedFile) o None
+        **params: Parámetros del formulario que afectan al resultado
+
+    Returns:
+        str: Firma de las entradas
+    """
+    digest = hashlib.sha1()
+    if file is not None:
+        file_id = getattr(file, "file_id", None)
+        if file_id:
+            digest.update(f"{file_id}:{getattr(file, 'name', '')}:{getattr(file, 'size', '')}".encode())
+        else:
+            digest.update(hashlib.sha256(file.getvalue()).digest())
+    for name in sorted(params):
+        digest.update(f"|{name}={params[name]}".encode())
+    return digest.hexdigest()
+
+
+def _get_store():
+    if _STORE_KEY not in st.session_state:
+        st.session_state[_STORE_KEY] = {}
+    return st.session_state[_STORE_KEY]
+
+
+def store_result(page, signature, result):
+    """
+    Guardar el resultado de una página para la sesión actual
+
+    Args:
+        page (str): Identificador de la página (extract, process, config)
+        signature (str): Firma de las entradas que produjeron el resultado
+        result (dict): Resultado a conservar
+    """
+    _get_store()[page] = {
+        "signature": signature,
+        "result": result,
+        "stored_at": time.time()
+    }
+
+
+def get_stored_result(page, signature):
+    """
+    Obtener el resultado guardado de una página si sigue siendo válido
+
+    Si las entradas han cambiado desde que se guardó, el resultado se invalida.
+
+    Args:
+        page (str): Identificador de la página
+        signature (str): Firma de las entradas actuales
+
+    Returns:
+        dict or None: Resultado guardado
+    """
+    store = _get_store()
+    entry = store.get(page)
+    if entry is None:
+        return None
+    if entry["signature"] != signature:
+        del store[page]
+        return None
+    return entry["result"]
+
+
+def clear_result(page):
+    """Invalidar explícitamente el resultado guardado de una página"""
+    _get_store().pop(page, None)
+
+
+def track_job(page, signature, job_id, label):
+    """
+    Registrar un trabajo en segundo plano lanzado desde la sesión actual
+
+    Args:
+        page (str): Página que lanzó el trabajo
+        signature (str): Firma de las entradas del trabajo
+        job_id (str): Identificador devuelto por el motor de trabajos
+        label (str): Descripción legible del trabajo
+    """
+    if _JOBS_KEY not in st.session_state:
+        st.session_state[_JOBS_KEY] = []
+    st.session_state[_JOBS_KEY].append({
+        "page": page,
+        "signature": signature,
+        "job_id": job_id,
+        "label": label,
+        "consumed": False
+    })
+
+
+def get_tracked_jobs(page=None):
+    """
+    Obtener los trabajos lanzados desde la sesión actual (más recientes primero)
+
+    Args:
+        page (str): Filtrar por página (opcional)
+
+    Returns:
+        list: Registros de trabajos
+    """
+    jobs = st.session_state.get(_JOBS_KEY, [])
+    return [job for job in reversed(jobs) if page is None or job["page"] == page]
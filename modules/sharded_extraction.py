@@ -0,0 +1,235 @@
+"""
+Módulo de extracción en fragmentos
+Divide los PDF largos en rangos de páginas que /api/extract procesa en paralelo y une los resultados
+"""
+
+import io
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import metrics
+from .api_client import extract_bases
+from .local_engine import mes_anyo_to_ordinal, ordinal_to_mes_anyo
+from .local_extraction import opens_section, page_lines, pypdf_installed
+
+logger = logging.getLogger(__name__)
+
+# EXTRACT_SHARDING=1 activa la fragmentación; los cortes dependen de la disposición que
+# reconoce local_extraction, así que está desactivada hasta validarla con informes reales
+# (benchmarks/compare_extraction.py --sharded)
+EXTRACT_SHARDING = os.environ.get("EXTRACT_SHARDING", "0") == "1"
+
+# Páginas mínimas por fragmento (0 desactiva la fragmentación) y fragmentos máximos por PDF
+EXTRACT_SHARD_MIN_PAGES = int(os.environ.get("EXTRACT_SHARD_MIN_PAGES", "10"))
+EXTRACT_MAX_SHARDS = int(os.environ.get("EXTRACT_MAX_SHARDS", "4"))
+
+# Fragmentos en vuelo a la vez entre todas las sesiones (debe caber en API_POOL_SIZE)
+EXTRACT_SHARD_WORKERS = int(os.environ.get("EXTRACT_SHARD_WORKERS", "8"))
+
+# Cada cuánto se informa del progreso agregado de la subida
+_PROGRESS_INTERVAL = 0.2
+
+_executor = ThreadPoolExecutor(max_workers=EXTRACT_SHARD_WORKERS, thread_name_prefix="extract-shard")
+
+
+def plan_shards(pages, can_start=None):
+    """
+    Repartir las páginas en rangos consecutivos de tamaño parecido
+
+    Cada corte se desplaza a la página más cercana desde la que el fragmento
+    puede leerse sin las anteriores; si no hay ninguna en su tramo, se omite.
+
+    Args:
+        pages (int): Páginas del PDF
+        can_start (callable): can_start(índice) -> bool, si un fragmento puede
+                              empezar en esa página (None: en cualquiera)
+
+    Returns:
+        list: Rangos (inicio, fin) con índices de página desde 0 y fin excluido;
+              un solo rango si el PDF no es lo bastante largo o no admite cortes
+    """
+    shards = min(EXTRACT_MAX_SHARDS, pages // EXTRACT_SHARD_MIN_PAGES) if EXTRACT_SHARD_MIN_PAGES else 1
+    ideales = [round(i * pages / shards) for i in range(1, shards)]
+    cortes = []
+    for i, objetivo in enumerate(ideales):
+        inferior = (cortes[-1] if cortes else 0) + 1
+        superior = ideales[i + 1] - 1 if i + 1 < len(ideales) else pages - 1
+        for pagina in sorted(range(inferior, superior + 1), key=lambda p: abs(p - objetivo)):
+            if can_start is None or can_start(pagina):
+                cortes.append(pagina)
+                break
+    limites = [0] + cortes + [pages]
+    return list(zip(limites[:-1], limites[1:]))
+
+
+def split_pdf(reader, ranges, name="documento.pdf"):
+    """
+    Crear un PDF en memoria por cada rango de páginas
+
+    Args:
+        reader (PdfReader): PDF ya abierto
+        ranges (list): Rangos (inicio, fin) devueltos por plan_shards
+        name (str): Nombre del PDF original
+
+    Returns:
+        list: Archivos io.BytesIO con atributo name
+    """
+    from pypdf import PdfWriter
+
+    nombre = os.path.splitext(os.path.basename(name))[0]
+    fragmentos = []
+    for inicio, fin in ranges:
+        writer = PdfWriter()
+        for page in reader.pages[inicio:fin]:
+            writer.add_page(page)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        buffer.seek(0)
+        buffer.name = f"{nombre}_p{inicio + 1}-{fin}.pdf"
+        fragmentos.append(buffer)
+    return fragmentos
+
+
+def merge_metadata(metadatas):
+    """
+    Combinar los metadatos de las respuestas de cada fragmento
+
+    Los recuentos enteros se suman, los demás campos con el mismo valor en todos
+    los fragmentos se conservan y el resto (p. ej. el nombre de cada fragmento)
+    solo queda en la lista por fragmento.
+
+    Args:
+        metadatas (list): metadata de cada respuesta, en orden de páginas
+
+    Returns:
+        tuple: (metadata combinada, metadata de cada fragmento)
+    """
+    combinada = {}
+    for campo in dict.fromkeys(campo for metadata in metadatas for campo in metadata):
+        valores = [metadata.get(campo) for metadata in metadatas]
+        if all(isinstance(valor, int) and not isinstance(valor, bool) for valor in valores):
+            combinada[campo] = sum(valores)
+        elif all(valor == valores[0] for valor in valores):
+            combinada[campo] = valores[0]
+    return combinada, [dict(metadata) for metadata in metadatas]
+
+
+def merge_extractions(partials):
+    """
+    Unir las respuestas de /api/extract de cada fragmento, en orden de páginas
+
+    Los fragmentos son rangos de páginas sin solape, así que cada fila pertenece
+    a uno solo y se conservan todas, también las que repiten mes, empresa e
+    importe (varios contratos en el mismo mes).
+
+    Args:
+        partials (list): Respuestas de cada fragmento
+
+    Returns:
+        dict: Respuesta única con total_bases y metadata recalculados a partir de
+              todos los fragmentos (los de cada uno en metadata.extraccion_fragmentada)
+    """
+    bases = [base for parcial in partials for base in parcial.get("bases", [])]
+    metadata, por_fragmento = merge_metadata([parcial.get("metadata", {}) for parcial in partials])
+    ordinales = mes_anyo_to_ordinal([b["mes_anyo"] for b in bases]) if bases else None
+    metadata.update({
+        "total_empresas": len({b["empresa"] for b in bases}),
+        "periodo_bases": {
+            "desde": ordinal_to_mes_anyo(ordinales.min()),
+            "hasta": ordinal_to_mes_anyo(ordinales.max())
+        } if bases else {},
+        "extraccion_fragmentada": {"fragmentos": len(partials), "metadata_fragmentos": por_fragmento}
+    })
+    return {
+        "success": True,
+        "message": f"PDF procesado en {len(partials)} fragmentos: {len(bases)} bases extraídas",
+        "total_bases": len(bases),
+        "bases": bases,
+        "metadata": metadata
+    }
+
+
+def _extract_shard(fragmento, indice, enviados, totales, lock):
+    def progress(sent, total):
+        with lock:
+            enviados[indice], totales[indice] = sent, total
+
+    inicio = time.perf_counter()
+    success, result = extract_bases(fragmento, progress=progress)
+    return success, result, time.perf_counter() - inicio
+
+
+def extract_bases_sharded(file, progress=None):
+    """
+    Extraer las bases enviando el PDF en fragmentos de páginas en paralelo
+
+    Sin EXTRACT_SHARDING o sin pypdf, y con PDF cortos o sin capa de texto donde
+    cortar, el PDF se envía entero como siempre. Si algún fragmento falla se
+    repite la extracción con el PDF completo.
+
+    Args:
+        file: PDF subido
+        progress (callable): progress(bytes_enviados, total) de todos los fragmentos,
+                             llamado siempre desde el hilo que invoca esta función
+
+    Returns:
+        tuple: (success: bool, result: dict)
+    """
+    # Sin pypdf el PDF se envía entero
+    if not EXTRACT_SHARDING or not pypdf_installed():
+        return extract_bases(file, progress=progress)
+    from pypdf import PdfReader
+
+    try:
+        file.seek(0)
+        reader = PdfReader(file)
+        paginas = len(reader.pages)
+        # Solo se corta donde empieza una sección, para no separar filas de su empresa
+        rangos = plan_shards(paginas, lambda p: opens_section(page_lines(reader.pages[p])))
+        fragmentos = split_pdf(reader, rangos, getattr(file, "name", "") or "documento.pdf") if len(rangos) > 1 else None
+    except Exception as e:
+        logger.warning("Error al fragmentar el PDF, se envía entero: %s", e)
+        fragmentos = None
+    if not fragmentos:
+        file.seek(0)
+        return extract_bases(file, progress=progress)
+
+    inicio = time.perf_counter()
+    lock = threading.Lock()
+    enviados = [0] * len(fragmentos)
+    totales = [fragmento.getbuffer().nbytes for fragmento in fragmentos]
+    futures = [
+        _executor.submit(_extract_shard, fragmento, i, enviados, totales, lock)
+        for i, fragmento in enumerate(fragmentos)
+    ]
+
+    # El progreso se agrega aquí para que Streamlit lo reciba desde el hilo de la sesión
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=_PROGRESS_INTERVAL)
+        if progress:
+            with lock:
+                sent, total = sum(enviados), sum(totales)
+            progress(sent, total)
+
+    resultados = [future.result() for future in futures]
+    fallidos = [i for i, (success, _, _) in enumerate(resultados) if not success]
+    if fallidos:
+        metrics.sharded_extractions.inc(outcome="fallback")
+        logger.warning("Fragmentos %s fallidos, se envía el PDF completo", [rangos[i] for i in fallidos])
+        file.seek(0)
+        return extract_bases(file, progress=progress)
+
+    metrics.sharded_extractions.inc(outcome="sharded")
+    metrics.extract_shards.observe(len(fragmentos))
+    result = merge_extractions([parcial for _, parcial, _ in resultados])
+    result["metadata"]["extraccion_fragmentada"].update({
+        "paginas": paginas,
+        "rangos": [f"{a + 1}-{b}" for a, b in rangos],
+        "segundos_fragmentos": [round(segundos, 4) for _, _, segundos in resultados],
+        "segundos": round(time.perf_counter() - inicio, 4)
+    })
+    return True, result
@@ -3,8 +3,13 @@ Módulo de barra lateral
 Maneja la navegación y estado de la API
 """
 
+import time
+
 import streamlit as st
-from .api_client import check_api_health
+from .api_client import get_pool_stats
+from .health import get_health_status, request_probe, probe_once, OPEN, HALF_OPEN
+from .latency import tracker as latency
+from .pages import PDF_LIMITS_TEXT
 
 
 def show_sidebar():
@@ -22,7 +27,7 @@ def show_sidebar():
         st.markdown("---")
         option = st.selectbox(
             "🎛️ Selecciona una opción:",
-            ["🏠 Inicio", "📄 Extraer Bases", "🚀 Procesar Completo", "⚙️ Configuración"]
+            ["🏠 Inicio", "📄 Extraer Bases", "🚀 Procesar Completo", "📦 Procesamiento por Lotes", "⚙️ Configuración"]
         )
         
         # Información adicional
@@ -32,24 +37,58 @@ def show_sidebar():
 
 
 def _show_api_status():
-    """Mostrar el estado de la API en la barra lateral"""
+    """Mostrar el estado de la API en la barra lateral (sin bloquear: lee el último sondeo)"""
     st.header("🔗 Estado de la API")
     
+    status = get_health_status()
+    if status["healthy"] is None:
+        st.info("⏳ Comprobando la conexión con la API...")
+    elif status["healthy"]:
+        st.success("✅ API conectada correctamente")
+        services = status.get("services") or {}
+        if services:
+            # Mostrar servicios disponibles si los hay
+            with st.expander("Servicios"):
+                st.json(services)
+    else:
+        st.error("❌ Error de conexión con la API")
+        if status["error"]:
+            st.caption(status["error"])
+    
+    if status["circuit"] == OPEN:
+        st.warning(f"⚡ Llamadas en pausa: nuevo intento en {status['retry_in']:.0f} s")
+    elif status["circuit"] == HALF_OPEN:
+        st.info("🔁 Probando de nuevo la conexión con la API...")
+    
+    if status["checked_at"] is not None:
+        st.caption(
+            f"🕒 Comprobado hace {time.time() - status['checked_at']:.0f} s "
+            f"({status['latency'] * 1000:.0f} ms)"
+        )
+    
+    pool = get_pool_stats()
+    if pool["requests"]:
+        st.caption(
+            f"🔌 Conexiones reutilizadas: {pool['hits']}/{pool['requests']} "
+            f"({pool['hit_rate']:.0%}) · nuevas: {pool['misses']}"
+        )
+    
+    # Carga extra del hedging: GET duplicados y cuántos respondieron antes que el original
+    stats = latency.get_stats().values()
+    calls = sum(s["calls"] for s in stats)
+    hedged = sum(s["hedged"] for s in stats)
+    if hedged:
+        wins = sum(s["wins"] for s in stats)
+        st.caption(f"🪃 GET duplicados: {hedged}/{calls} ({hedged / calls:.0%}) · ganan: {wins / hedged:.0%}")
+    
     if st.button("🔄 Verificar Conexión"):
-        with st.spinner("Verificando conexión..."):
-            is_healthy, health_data = check_api_health()
-        
-        if is_healthy:
-            st.success("✅ API conectada correctamente")
-            if health_data:
-                # Mostrar servicios disponibles si los hay
-                services = health_data.get("services", {})
-                if services:
-                    st.json(services)
+        if request_probe():
+            st.caption("Comprobación solicitada; el estado se actualiza en la próxima interacción")
         else:
-            st.error("❌ Error de conexión con la API")
-            if health_data:
-                st.error(health_data)
+            # Sin sondeo en segundo plano (HEALTH_PROBE_INTERVAL=0): comprobación directa
+            with st.spinner("Verificando conexión..."):
+                probe_once()
+            st.rerun()
 
 
 def _show_additional_info():
@@ -78,22 +117,23 @@ def _show_additional_info():
         st.markdown("""
         1. **Extracción**: Sube un PDF y obtén las bases
         2. **Procesamiento**: Cálculo completo con parámetros
-        3. **Configuración**: Consulta índices y parámetros
-        4. **Descarga**: Excel editable con fórmulas
+        3. **Lotes**: Varios PDFs en paralelo con ZIP de Excel
+        4. **Configuración**: Consulta índices y parámetros
+        5. **Descarga**: Excel editable con fórmulas
         """)
     
     with st.expander("📄 Formatos soportados"):
-        st.markdown("""
-        - **PDF**: Máximo 10MB
+        st.markdown(f"""
+        - **PDF**: {PDF_LIMITS_TEXT}
         - **Fecha**: MM/YYYY (ej: 06/2025)
         - **Régimen**: GENERAL o AUTONOMO
-        - **Exportación**: Excel (.xlsx) y JSON
+        - **Exportación**: Excel (.xlsx), JSON y Parquet
         """)
     
     with st.expander("⚠️ Solución de problemas"):
-        st.markdown("""
+        st.markdown(f"""
         - **Error de conexión**: Verifica el estado de la API
-        - **Archivo muy grande**: Máximo 10MB
+        - **Archivo muy grande**: {PDF_LIMITS_TEXT}
         - **Formato incorrecto**: Usa MM/YYYY
         - **Fórmulas Excel**: Usa comas en lugar de punto y coma
         """) 
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Módulo de deduplicación de llamadas en curso (single-flight)
+Las llamadas idénticas y simultáneas de cualquier sesión comparten una sola petición al backend
+"""
+
+import threading
+
+from . import metrics
+
+
+class _Call:
+    """Llamada en curso y su resultado"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Grupo de llamadas deduplicadas por clave, compartido por todo el proceso
+
+    La primera llamada con una clave ejecuta la función; las que llegan mientras
+    sigue en curso esperan y reciben su resultado o la misma excepción. Sin
+    `copy` todas reciben el mismo objeto, que debe tratarse como de solo lectura;
+    con `copy`, si alguna llamada esperaba, cada una (también la primera) recibe
+    su propia copia y el original no se entrega a nadie.
+
+    Args:
+        kind (str): Tipo de llamada en las métricas (extract, process, config)
+        copy (callable): copy(resultado) -> copia propia para cada llamada que
+                         esperaba (opcional)
+    """
+
+    def __init__(self, kind, copy=None):
+        self.kind = kind
+        self.copy = copy
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Ejecutar fn(*args, **kwargs) una sola vez por clave en curso
+
+        Args:
+            key: Clave hashable de la llamada
+            fn (callable): Función a ejecutar
+
+        Returns:
+            Resultado de fn (propio o de la llamada en curso)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.stats["calls"] += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.stats["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            metrics.singleflight_coalesced.inc(kind=self.kind)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return self.copy(call.result) if self.copy else call.result
+
+        metrics.singleflight_calls.inc(kind=self.kind)
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                # Sin la clave en _calls ya no se une nadie más: waiters es definitivo
+                shared = call.waiters > 0
+            call.done.set()
+        return self.copy(call.result) if self.copy and shared else call.result
+
+    def get_stats(self):
+        """
+        Obtener contadores del grupo
+
+        Returns:
+            dict: Llamadas ejecutadas, llamadas que se unieron a otra y proporción ahorrada
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats["in_flight"] = len(self._calls)
+        total = stats["calls"] + stats["coalesced"]
+        stats["coalesced_rate"] = stats["coalesced"] / total if total else 0.0
+        return stats
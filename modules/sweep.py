@@ -0,0 +1,114 @@
+"""
+Módulo de barrido de fechas de jubilación
+Lanza en paralelo una simulación por cada fecha y combinación de régimen y sexo
+"""
+
+import io
+import itertools
+import os
+
+import pandas as pd
+
+from .local_engine import is_mes_anyo, mes_anyo_to_ordinal, ordinal_to_mes_anyo
+
+# Límites del barrido
+SWEEP_MAX_WORKERS = int(os.environ.get("SWEEP_MAX_WORKERS", "8"))
+SWEEP_MAX_SIMULATIONS = int(os.environ.get("SWEEP_MAX_SIMULATIONS", "240"))
+
+
+def month_range(desde, hasta):
+    """
+    Generar todas las fechas MM/YYYY entre dos meses, ambos incluidos
+
+    Args:
+        desde (str): Primer mes (MM/YYYY)
+        hasta (str): Último mes (MM/YYYY)
+
+    Returns:
+        list: Fechas en orden cronológico
+
+    Raises:
+        ValueError: Si alguna fecha no es MM/YYYY con un mes entre 01 y 12
+    """
+    for fecha in (desde, hasta):
+        if not is_mes_anyo(fecha):
+            raise ValueError(f"Fecha incorrecta: {fecha}. Use MM/YYYY con un mes entre 01 y 12")
+    inicio, fin = mes_anyo_to_ordinal([desde, hasta]).tolist()
+    return [ordinal_to_mes_anyo(ordinal) for ordinal in range(inicio, fin + 1)]
+
+
+def build_sweep_items(file_name, file_bytes, fechas, regimenes, sexos):
+    """
+    Construir las simulaciones del barrido reutilizando los mismos bytes del PDF
+
+    Args:
+        file_name (str): Nombre del PDF
+        file_bytes (bytes): Contenido del PDF (compartido por todas las simulaciones)
+        fechas (list): Fechas de jubilación MM/YYYY
+        regimenes (list): Regímenes de acceso
+        sexos (list): Sexos del cotizante
+
+    Returns:
+        list: Elementos compatibles con batch.process_batch_item
+    """
+    return [
+        {
+            "name": file_name,
+            "bytes": file_bytes,
+            "fecha_jubilacion": fecha,
+            "regimen_acceso": regimen,
+            "sexo": sexo
+        }
+        for fecha, regimen, sexo in itertools.product(fechas, regimenes, sexos)
+    ]
+
+
+def sweep_frame(outcomes):
+    """
+    Construir la rejilla de resultados del barrido
+
+    Args:
+        outcomes (list): Diccionarios con item, success y result
+
+    Returns:
+        pd.DataFrame: Una fila por simulación, ordenada por fecha
+    """
+    rows = []
+    for outcome in outcomes:
+        item = outcome["item"]
+        result = outcome["result"]
+        comparativa = result.get("comparativa_calculos", {}) if outcome["success"] else {}
+        rows.append({
+            "Fecha Jubilación": item["fecha_jubilacion"],
+            "Régimen": item["regimen_acceso"],
+            "Sexo": item["sexo"],
+            "Combinación": f"{item['regimen_acceso']} · {item['sexo']}",
+            "Base Reguladora": result.get("estadisticas", {}).get("base_reguladora") if outcome["success"] else None,
+            "Cálculo Elegido": result.get("calculo_elegido") if outcome["success"] else None,
+            "BR Reforma RD 2/2023": comparativa.get("calculo_reforma_rd2_2023", {}).get("estadisticas", {}).get("base_reguladora"),
+            "BR Pre-reforma": comparativa.get("calculo_prereforma", {}).get("estadisticas", {}).get("base_reguladora"),
+            "Suma Total": result.get("estadisticas", {}).get("suma_total") if outcome["success"] else None,
+            "Error": "" if outcome["success"] else str(result.get("error", result.get("detail", "Error desconocido")))
+        })
+
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return df
+    df.insert(1, "Ordinal", mes_anyo_to_ordinal(df["Fecha Jubilación"].tolist()))
+    return df.sort_values(["Ordinal", "Régimen", "Sexo"]).reset_index(drop=True)
+
+
+def sweep_to_excel(df):
+    """
+    Exportar la rejilla del barrido a Excel
+
+    Args:
+        df (pd.DataFrame): Rejilla devuelta por sweep_frame
+
+    Returns:
+        bytes: Contenido del archivo Excel
+    """
+    excel_buffer = io.BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine="xlsxwriter") as writer:
+        df.drop(columns=["Ordinal"]).to_excel(writer, sheet_name="Barrido", index=False)
+    return excel_buffer.getvalue()
@@ -3,8 +3,12 @@ Módulo de componentes de interfaz de usuario
 Contiene estilos CSS y componentes reutilizables
 """
 
+import html
+
 import streamlit as st
 
+from .api_client import API_BASE_URL
+
 
 def apply_custom_css():
     """Aplicar estilos CSS personalizados a la aplicación"""
@@ -138,10 +142,10 @@ def show_info_message(message):
 def show_footer():
     """Mostrar el footer de la aplicación"""
     st.markdown("---")
-    st.markdown("""
+    st.markdown(f"""
     <div style="text-align: center; color: #666; padding: 1rem;">
         <p>🏢 API Bases de Cotización | Desarrollado con ❤️ usando Streamlit</p>
-        <p>API actual: <strong>https://pension-bases-api-e707c1384c99.herokuapp.com</strong></p>
+        <p>API actual: <strong>{html.escape(API_BASE_URL)}</strong></p>
         <p>💡 <em>Frontend modularizado para mejor mantenimiento</em></p>
     </div>
     """, unsafe_allow_html=True) 
\ No newline at end of file